@@ -1,7 +1,8 @@
 #!/bin/bash
 # Create per-mode iris-engine2 databases and apply schema.
 # eyed (prod) is already created by POSTGRES_DB / 01-init.sql.
-# This script adds eyed_dev and eyed_test.
+# This script adds eyed_dev and eyed_test, and creates pg_stat_statements
+# in all three.
 # Runs as part of PostgreSQL's /docker-entrypoint-initdb.d/ on first startup.
 set -e
 
@@ -17,3 +18,11 @@ EOSQL
         -f /docker-entrypoint-initdb.d/01-init.sql
     echo "$DB database ready."
 done
+
+# pg_stat_statements for the V&V profiler (scripts/vnv/profile.py --postgres).
+# Creating the extension is harmless without the library; its view only works
+# where shared_preload_libraries has it (docker-compose.dev.yml).
+for DB in "${POSTGRES_DB:-eyed}" eyed_dev eyed_test; do
+    psql -v ON_ERROR_STOP=1 --username "$PGUSER" -d "$DB" \
+        -c "CREATE EXTENSION IF NOT EXISTS pg_stat_statements"
+done
@@ -2,8 +2,9 @@
 """Export curated training datasets from the EyeD archive.
 
 Queries the match_log database for high-confidence frames and copies the
-corresponding raw images + metadata from the archive directory into a
-self-contained training export.
+corresponding raw images + metadata from the archive (a local directory or an
+s3:// bucket) into a self-contained training export: loose files, WebDataset
+shards, blob store references or preprocessed tensors (--format).
 
 Usage:
     python scripts/export_training.py \
@@ -12,24 +13,78 @@ Usage:
         --output-dir ./data/training-export/export-001 \
         --min-confidence 0.8 \
         --max-frames 10000
+
+    # Frames matched in September only
+    python scripts/export_training.py ... --since 2026-09-01 --until 2026-10-01
+
+    # High-quality left-eye frames of two devices in a Hamming distance band
+    python scripts/export_training.py ... --min-confidence 0.7 --eye-side left \\
+        --devices cam-01,cam-02 --hd-min 0.25 --hd-max 0.35
+
+    # Balanced 100k sample from 5% of match_log's pages, per device and match/non-match
+    python scripts/export_training.py ... --max-frames 100000 --strata device,match \\
+        --sample-percent 5 --seed 7
+
+    # Pack into 1 GB WebDataset shards
+    python scripts/export_training.py ... --format shards --shard-size-mb 1024
+
+    # Deduplicated export referencing ./data/training-export/blobs
+    python scripts/export_training.py ... --format refs
+
+    # Preprocessed 320x240 grayscale tensors for a dataloader
+    python scripts/export_training.py ... --format tensors --tensor-size 320x240
+
+    # Nightly delta on top of the newest export in ./data/training-export
+    python scripts/export_training.py ... \
+        --output-dir ./data/training-export/$(date +%F) --incremental
+
+    # Export straight from a MinIO bucket through a 50 GB local cache
+    python scripts/export_training.py ... --archive-root s3://eyed-archive \\
+        --s3-endpoint http://localhost:9000 --cache-max-gb 50
+
+    # Refresh the archive index only (e.g. from cron, no database needed)
+    python scripts/export_training.py --archive-root ./data/archive --index-only
 """
 
 from __future__ import annotations
 
 import argparse
+import errno
+import fcntl
+import hashlib
+import io
 import json
 import os
+import queue
+import re
 import shutil
+import sqlite3
 import sys
-from datetime import datetime, timezone
+import tarfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
 try:
     import psycopg2
     import psycopg2.extras
 except ImportError:
-    print("Error: psycopg2 not installed. Run: pip install psycopg2-binary", file=sys.stderr)
-    sys.exit(1)
+    psycopg2 = None  # only needed for exporting; --index-only and iter_shards() work without
+
+try:
+    import boto3
+    import botocore.config
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    boto3 = None  # only needed for s3:// archives
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    np = None  # only needed for --format tensors and load_tensors()
 
 
 def parse_args() -> argparse.Namespace:
@@ -38,137 +93,1465 @@ def parse_args() -> argparse.Namespace:
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=__doc__,
     )
-    p.add_argument("--db-url", required=True, help="PostgreSQL connection URL")
-    p.add_argument("--archive-root", required=True, help="Path to archive root directory")
-    p.add_argument("--output-dir", required=True, help="Output directory for export")
+    p.add_argument("--db-url", help="PostgreSQL connection URL")
+    p.add_argument("--archive-root", required=True,
+                   help="Archive root directory, or s3://bucket/prefix")
+    p.add_argument("--output-dir", help="Output directory for export")
     p.add_argument("--min-confidence", type=float, default=0.0,
                    help="Minimum quality score filter (from metadata, default: 0.0)")
+    p.add_argument("--devices", type=lambda v: [d for d in v.split(",") if d], default=None,
+                   help="Only frames archived under these device ids (comma-separated)")
+    p.add_argument("--eye-side", choices=["left", "right"], default=None,
+                   help="Only frames whose metadata has this eye_side")
+    p.add_argument("--captured-since", type=lambda v: date.fromisoformat(v).isoformat(),
+                   default=None, help="Only frames archived on or after this date (YYYY-MM-DD)")
+    p.add_argument("--captured-until", type=lambda v: date.fromisoformat(v).isoformat(),
+                   default=None, help="Only frames archived before this date (YYYY-MM-DD)")
+    p.add_argument("--hd-min", type=float, default=None,
+                   help="Only match_log rows with hamming_distance >= this")
+    p.add_argument("--hd-max", type=float, default=None,
+                   help="Only match_log rows with hamming_distance <= this")
     p.add_argument("--max-frames", type=int, default=0,
-                   help="Maximum frames to export (0 = unlimited)")
+                   help="Export a stratified sample of this many frames (0 = all)")
+    p.add_argument("--strata", type=parse_strata, default=list(STRATA),
+                   help="Sampling strata for --max-frames, comma-separated from "
+                        f"{','.join(STRATA)} or 'none' (default: all)")
+    p.add_argument("--hd-bins", type=int, default=10,
+                   help="Hamming distance bins for the hd stratum (default: 10)")
+    p.add_argument("--sample-percent", type=float, default=100.0,
+                   help="Read only this percentage of match_log pages (TABLESAMPLE SYSTEM) "
+                        "before sampling with --max-frames")
+    p.add_argument("--seed", type=int, default=None,
+                   help="Seed for a reproducible --max-frames sample")
     p.add_argument("--matches-only", action="store_true",
                    help="Only export frames that had a match")
     p.add_argument("--no-match-only", action="store_true",
                    help="Only export frames that had no match (hard negatives)")
+    p.add_argument("--since", type=parse_timestamp, default=None,
+                   help="Only frames matched at or after this ISO date/timestamp (UTC if naive)")
+    p.add_argument("--until", type=parse_timestamp, default=None,
+                   help="Only frames matched before this ISO date/timestamp (UTC if naive)")
+    p.add_argument("--watermark-column", choices=WATERMARK_COLUMNS, default="log_id",
+                   help="match_log column recorded as the export's watermark (default: log_id)")
+    p.add_argument("--parent", default=None,
+                   help="Export only rows above this previous export's watermark (delta export)")
+    p.add_argument("--incremental", action="store_true",
+                   help="Like --parent, using the newest export next to --output-dir")
+    p.add_argument("--batch-size", type=int, default=10_000,
+                   help="Rows fetched from match_log per round trip")
     p.add_argument("--dry-run", action="store_true",
                    help="Print what would be exported without copying files")
-    return p.parse_args()
+    p.add_argument("--format", choices=["files", "shards", "refs", "tensors"], default="files",
+                   help="files: loose images/ and metadata/; shards: WebDataset tar shards; "
+                        "refs: references into a content-addressed blob store; "
+                        "tensors: preprocessed uint8 image array + labels")
+    p.add_argument("--tensor-size", type=parse_tensor_size, default=(320, 240),
+                   help="WIDTHxHEIGHT images are resized to for --format tensors (default: 320x240)")
+    p.add_argument("--tensor-normalize", choices=["minmax", "none"], default="minmax",
+                   help="Per-image contrast stretch to 0..255 for --format tensors")
+    p.add_argument("--tensor-workers", type=int, default=os.cpu_count() or 4,
+                   help="Decoder processes for --format tensors")
+    p.add_argument("--blob-store", default=None,
+                   help="Blob store for --format refs (default: blobs/ next to --output-dir)")
+    p.add_argument("--shard-size-mb", type=float, default=1024,
+                   help="Target shard size for --format shards (default: 1024)")
+    p.add_argument("--shard-writers", type=int, default=4,
+                   help="Shards written in parallel for --format shards")
+    p.add_argument("--transfer", choices=TRANSFER_MODES, default="auto",
+                   help="How files are transferred (default: auto = reflink, then "
+                        "copy_file_range, then buffered copy)")
+    p.add_argument("--copy-workers", type=int, default=8,
+                   help="Concurrent file transfers (bound this by the archive's I/O capacity)")
+    p.add_argument("--max-mb-per-sec", type=float, default=0.0,
+                   help="Cap on transfer throughput in MB/s (0 = unlimited)")
+    p.add_argument("--s3-endpoint", default=None,
+                   help="Endpoint URL of an S3-compatible store (default: AWS / $AWS_ENDPOINT_URL)")
+    p.add_argument("--cache-dir", default=None,
+                   help="Read-through cache for s3:// archives "
+                        "(default: ~/.cache/eyed-export/<bucket>/<prefix>); also holds the "
+                        "index of a local archive on --dry-run or a read-only archive root")
+    p.add_argument("--cache-max-gb", type=float, default=0.0,
+                   help="Trim the cache to this size after an export, least recently used "
+                        "first (0 = unbounded)")
+    p.add_argument("--fetch-workers", type=int, default=32,
+                   help="Concurrent GETs against an s3:// archive")
+    p.add_argument("--fetch-retries", type=int, default=5,
+                   help="Retries per GET against an s3:// archive")
+    p.add_argument("--settled-days", type=int, default=2,
+                   help="Indexed dates of an s3:// archive older than this many days are not "
+                        "listed again (0 = list every date each run; --rebuild-index lists all)")
+    p.add_argument("--index", default=None,
+                   help=f"Archive index path (default: <archive-root>/{ARCHIVE_INDEX_FILE}, "
+                        "or in the cache directory for s3://, --dry-run and read-only roots)")
+    p.add_argument("--index-workers", type=int, default=min(32, (os.cpu_count() or 4) * 4),
+                   help="Parallel directory scanners for the index update")
+    p.add_argument("--rebuild-index", action="store_true",
+                   help="Rescan every date directory instead of only the changed ones")
+    p.add_argument("--index-only", action="store_true",
+                   help="Update the archive index and exit")
+    args = p.parse_args()
+    if not args.index_only and not (args.db_url and args.output_dir):
+        p.error("--db-url and --output-dir are required unless --index-only is given")
+    if args.parent and args.incremental:
+        p.error("--parent and --incremental are mutually exclusive")
+    return args
+
+
+# ---------------------------------------------------------------------------
+# Archive backends
+# ---------------------------------------------------------------------------
+# Mirrors the storage service's ObjectStore (object_store.h) on the read side.
+# A backend is a dict of functions over paths relative to the archive root:
+#   list_dates()      date directories under raw/
+#   signature(date)   changes whenever objects under raw/{date}/ change
+#   list_date(date)   (device, file name) of every object under raw/{date}/
+#   read(rel)         object contents (FileNotFoundError if absent)
+#   path(rel)         local path the export reads the object from
+#   prefetch(paths)   make those local paths exist (no-op for a local store)
+#   settled_before    dates before this (YYYY-MM-DD) that are already indexed
+#                     are taken as unchanged without a signature (None: sign all)
+# The S3 backend (--archive-root s3://bucket/prefix, --s3-endpoint for MinIO
+# and the like; needs boto3) fetches the frames of each match_log batch with
+# --fetch-workers concurrent GETs (retried, --fetch-retries) into a
+# read-through cache (--cache-dir, trimmed to --cache-max-gb), so everything
+# past the index works on local files for both.
+
+S3_URL_RE = re.compile(r"^s3://([^/]+)/?(.*)$")
+S3_RETRY_BACKOFF = 0.2
+S3_RETRY_BACKOFF_MAX = 5.0
+
+
+def make_local_store(root: Path) -> dict:
+    raw = root / "raw"
+
+    def list_dates() -> list[str]:
+        if not raw.exists():
+            return []
+        with os.scandir(raw) as it:
+            return sorted(e.name for e in it if e.is_dir() and DATE_DIR_RE.match(e.name))
 
+    def list_date(date: str) -> list[tuple[str, str]]:
+        objects = []
+        with os.scandir(raw / date) as devices:
+            for device in devices:
+                if device.is_dir(follow_symlinks=False):
+                    with os.scandir(device.path) as files:
+                        objects.extend((device.name, f.name) for f in files)
+        return objects
 
-def find_archive_files(archive_root: Path, frame_id: str) -> tuple[Path | None, Path | None]:
-    """Search the archive for a frame's JPEG and metadata files.
+    return {
+        "kind": "local",
+        "url": str(root),
+        "list_dates": list_dates,
+        "signature": lambda date: date_signature(raw / date),
+        "list_date": list_date,
+        "read": lambda rel: (root / rel).read_bytes(),
+        "path": lambda rel: root / rel,
+        "prefetch": lambda paths: None,
+        "index_path": root / ARCHIVE_INDEX_FILE,
+        "settled_before": None,  # a date signature is one scandir; always check
+        "close": lambda: None,
+    }
 
-    Archive layout: raw/{YYYY-MM-DD}/{device_id}/{frame_id}.jpg
-    We need to search because we don't know the date/device upfront.
+
+def make_s3_store(url: str, endpoint: str | None, cache_dir: Path | None,
+                  workers: int, retries: int, settled_days: int = 2) -> dict:
+    """
+    S3 has no directory mtimes, so a date's signature is a full listing of
+    its objects: one LIST request per 1000 objects. Signing every date would
+    list the whole archive on every export. Dates older than settled_days
+    (the storage service only writes to the current date) are therefore
+    signed only until they are first indexed.
     """
-    raw_dir = archive_root / "raw"
-    if not raw_dir.exists():
-        return None, None
+    bucket, prefix = S3_URL_RE.match(url).groups()
+    prefix = prefix.strip("/")
+    base = f"{prefix}/" if prefix else ""
+    cache_dir = cache_dir or Path.home() / ".cache" / "eyed-export" / bucket / prefix
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    client = boto3.client("s3", endpoint_url=endpoint, config=botocore.config.Config(
+        max_pool_connections=max(1, workers), retries={"max_attempts": 3, "mode": "adaptive"}))
+    listings = {}  # date -> objects listed by signature(), reused by list_date()
+    lock = threading.Lock()
 
-    for date_dir in sorted(raw_dir.iterdir(), reverse=True):
-        if not date_dir.is_dir():
-            continue
-        for device_dir in date_dir.iterdir():
-            if not device_dir.is_dir():
-                continue
-            jpg = device_dir / f"{frame_id}.jpg"
-            meta = device_dir / f"{frame_id}.meta.json"
-            if jpg.exists():
-                return jpg, meta if meta.exists() else None
+    def list_objects(key_prefix: str, delimiter: str = "") -> list:
+        objects = []
+        for page in client.get_paginator("list_objects_v2").paginate(
+                Bucket=bucket, Prefix=key_prefix, Delimiter=delimiter):
+            if delimiter:
+                objects.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+            else:
+                objects.extend((o["Key"], o["Size"], o["ETag"]) for o in page.get("Contents", []))
+        return objects
 
-    return None, None
+    def list_dates() -> list[str]:
+        names = (p[len(base) + 4:].rstrip("/") for p in list_objects(f"{base}raw/", "/"))
+        return sorted(n for n in names if DATE_DIR_RE.match(n))
 
+    def signature(date: str) -> str:
+        objects = list_objects(f"{base}raw/{date}/")
+        with lock:
+            listings[date] = objects
+        return hashlib.sha1("\n".join(f"{k} {size} {etag}" for k, size, etag in objects)
+                            .encode()).hexdigest()
 
-def export(args: argparse.Namespace) -> None:
-    archive_root = Path(args.archive_root)
-    output_dir = Path(args.output_dir)
+    def list_date(date: str) -> list[tuple[str, str]]:
+        with lock:
+            objects = listings.pop(date, None)
+        if objects is None:
+            objects = list_objects(f"{base}raw/{date}/")
+        skip = len(f"{base}raw/{date}/")
+        result = []
+        for key, _, _ in objects:
+            device, sep, name = key[skip:].partition("/")
+            if sep and "/" not in name:
+                result.append((device, name))
+        return result
 
+    def read(rel: str) -> bytes:
+        # botocore retries the request; this also covers a body read that
+        # fails halfway
+        for attempt in range(retries + 1):
+            try:
+                return client.get_object(Bucket=bucket, Key=base + rel)["Body"].read()
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                    raise FileNotFoundError(rel) from None
+                if attempt == retries:
+                    raise
+            except BotoCoreError:
+                if attempt == retries:
+                    raise
+            time.sleep(min(S3_RETRY_BACKOFF * 2 ** attempt, S3_RETRY_BACKOFF_MAX))
+
+    def fetch(path: Path) -> None:
+        if path.exists():
+            os.utime(path)  # recency for trim_cache()
+            return
+        try:
+            data = read(path.relative_to(cache_dir).as_posix())
+        except FileNotFoundError:
+            return  # purged; the export counts it as no_file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    return {
+        "kind": "s3",
+        "url": url,
+        "list_dates": list_dates,
+        "signature": signature,
+        "list_date": list_date,
+        "read": read,
+        "path": lambda rel: cache_dir / rel,
+        "prefetch": lambda paths: list(pool.map(fetch, paths)),
+        "index_path": cache_dir / ARCHIVE_INDEX_FILE,
+        "settled_before": ((datetime.now(timezone.utc).date() - timedelta(days=settled_days)).isoformat()
+                           if settled_days > 0 else None),
+        "cache_dir": cache_dir,
+        "close": pool.shutdown,
+    }
+
+
+def open_archive(args: argparse.Namespace) -> dict:
+    if S3_URL_RE.match(args.archive_root):
+        if boto3 is None:
+            print("Error: boto3 not installed. Run: pip install boto3", file=sys.stderr)
+            sys.exit(1)
+        return make_s3_store(args.archive_root, args.s3_endpoint,
+                             Path(args.cache_dir) if args.cache_dir else None,
+                             args.fetch_workers, args.fetch_retries, args.settled_days)
+    archive_root = Path(args.archive_root)
     if not archive_root.exists():
         print(f"Error: Archive root not found: {archive_root}", file=sys.stderr)
         sys.exit(1)
+    return make_local_store(archive_root)
+
+
+def trim_cache(cache_dir: Path, max_bytes: float) -> tuple[int, int]:
+    """Delete least recently used cached objects until the cache fits; (files, bytes) removed."""
+    entries = []
+    total = 0
+    for dirpath, _, names in os.walk(cache_dir / "raw"):
+        for name in names:
+            st = os.stat(os.path.join(dirpath, name))
+            entries.append((st.st_mtime, st.st_size, os.path.join(dirpath, name)))
+            total += st.st_size
+    removed = [0, 0]
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.unlink(path)
+        total -= size
+        removed[0] += 1
+        removed[1] += size
+    return removed[0], removed[1]
+
+
+# ---------------------------------------------------------------------------
+# Archive index
+# ---------------------------------------------------------------------------
+# The storage service writes raw/{YYYY-MM-DD}/{device_id}/{frame_id}.jpg and
+# .meta.json, with device and frame ids passed through sanitize_path(). The
+# index maps the sanitized frame_id to its date and device directory. A date
+# directory is rescanned only when its signature (device directories and
+# their mtimes -- adding a file bumps its directory's mtime) changed.
+# Metadata columns come from the frame's .meta.json, read once: a rescan
+# keeps the values of frames it already knows. They are NULL when the
+# metadata is missing or unreadable, and such frames pass the quality filter.
+# The SHA-256 columns are filled in by --format refs exports as they hash
+# frames; archive files are write-once, so a cached hash stays valid.
+# The index lives at <archive-root>/.frame_index.sqlite (in the cache
+# directory for s3://, and for --dry-run or a read-only archive root).
+# --min-confidence, --devices, --eye-side and --captured-since/-until are
+# evaluated against it for a whole batch of match_log rows at a time, before
+# any archive file is opened; --hd-min/--hd-max go into the match_log query.
+
+ARCHIVE_INDEX_FILE = ".frame_index.sqlite"
+ARCHIVE_INDEX_VERSION = "3"
+DATE_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS dates (
+    date      TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    frames    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS frames (
+    frame_id TEXT PRIMARY KEY,
+    date     TEXT NOT NULL,
+    device   TEXT NOT NULL,
+    has_jpg  INTEGER NOT NULL,
+    has_meta INTEGER NOT NULL,
+    quality_score REAL,
+    eye_side      TEXT,
+    captured_at   TEXT,
+    jpg_sha256    TEXT,
+    meta_sha256   TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_frames_date ON frames(date);
+"""
+
+
+def sanitize_path(s: str) -> str:
+    """Same mapping as the storage service's sanitize_path() (archive_handler.cpp)."""
+    out = re.sub(r"[/\\:\x00-\x1f\x7f]+", "_", s)
+    return "_" if out in ("", ".", "..") else out
+
+
+def default_index_path(archive: dict, args: argparse.Namespace) -> Path:
+    """
+    Where the index lives unless --index is given. A local archive keeps it
+    in its root, except on --dry-run (which must not write to the archive) or
+    when the root is not writable: then it goes to the cache directory,
+    seeded from the archive's index so only changed dates are rescanned.
+    """
+    path = archive["index_path"]
+    if archive["kind"] != "local":
+        return path
+    writable = os.access(path.parent, os.W_OK) and (not path.exists() or os.access(path, os.W_OK))
+    if writable and not args.dry_run:
+        return path
+    cache_dir = (Path(args.cache_dir) if args.cache_dir else
+                 Path.home() / ".cache" / "eyed-export" / "local" / str(path.parent.resolve()).lstrip("/"))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cached = cache_dir / ARCHIVE_INDEX_FILE
+    reason = "--dry-run" if args.dry_run else f"{path.parent} is not writable"
+    print(f"{reason}: using archive index {cached} instead of {path}")
+    if path.exists() and not cached.exists():
+        try:
+            # immutable: no -wal/-shm files or locks in the archive root
+            src = sqlite3.connect(f"file:{path}?immutable=1", uri=True)
+            dst = sqlite3.connect(cached)
+            src.backup(dst)
+            dst.close()
+            src.close()
+        except sqlite3.Error as e:
+            print(f"  Could not copy {path} ({e}); building the index from scratch")
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{cached}{suffix}").unlink(missing_ok=True)
+    return cached
+
+
+def open_archive_index(path: Path, rebuild: bool = False) -> sqlite3.Connection:
+    """Open (or create) the index; a schema version mismatch starts it over."""
+    if rebuild:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(INDEX_SCHEMA)
+    row = conn.execute("SELECT value FROM info WHERE key = 'version'").fetchone()
+    if row is None or row[0] != ARCHIVE_INDEX_VERSION:
+        conn.executescript("DROP TABLE frames; DROP TABLE dates;" + INDEX_SCHEMA)
+        conn.execute("INSERT OR REPLACE INTO info VALUES ('version', ?)", (ARCHIVE_INDEX_VERSION,))
+        conn.commit()
+    return conn
+
+
+def date_signature(date_dir: Path) -> str:
+    """Device directories of a date with their mtimes (ns)."""
+    parts = []
+    with os.scandir(date_dir) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                parts.append(f"{entry.name}:{entry.stat(follow_symlinks=False).st_mtime_ns}")
+    return ";".join(sorted(parts))
+
+
+def read_frame_metadata(archive: dict, rel: str) -> tuple:
+    """(quality_score, eye_side, captured_at) from a .meta.json; all None if unreadable."""
+    try:
+        meta = json.loads(archive["read"](rel))
+    except (OSError, ValueError):
+        return None, None, None
+    if not isinstance(meta, dict):
+        return None, None, None
+    quality = meta.get("quality_score", 0.0)
+    return (float(quality) if isinstance(quality, (int, float)) else None,
+            meta.get("eye_side") or None, meta.get("timestamp") or None)
 
-    # Connect to database
-    print(f"Connecting to database...")
-    conn = psycopg2.connect(args.db_url)
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    # Query match_log for frames to export
-    query = "SELECT DISTINCT probe_frame_id, hamming_distance, is_match, device_id FROM match_log"
+def scan_date_dir(archive: dict, date: str, known: dict) -> tuple[list[tuple], int]:
+    """
+    Index rows (frame_id, device, has_jpg, has_meta, quality_score, eye_side,
+    captured_at, jpg_sha256, meta_sha256) for every frame under one date
+    directory, and the number of metadata files read. known maps
+    (frame_id, device) to (has_meta, metadata columns..., hashes...) as
+    already indexed for this date.
+    """
+    frames = {}
+    for device, name in archive["list_date"](date):
+        if name.endswith(".jpg"):
+            key, slot = name[:-4], 0
+        elif name.endswith(".meta.json"):
+            key, slot = name[:-10], 1
+        else:
+            continue  # .tmp files of in-flight writes
+        frames.setdefault((key, device), [0, 0])[slot] = 1
+    rows, meta_read = [], 0
+    for (frame_id, device), (jpg, meta) in frames.items():
+        prev = known.get((frame_id, device))
+        columns = (None, None, None)
+        if meta:
+            if prev and prev[0]:
+                columns = prev[1:4]
+            else:
+                columns = read_frame_metadata(archive, f"raw/{date}/{device}/{frame_id}.meta.json")
+                meta_read += 1
+        hashes = (prev[4] if jpg else None, prev[5] if meta else None) if prev else (None, None)
+        rows.append((frame_id, device, jpg, meta, *columns, *hashes))
+    return rows, meta_read
+
+
+def known_metadata(conn: sqlite3.Connection, date: str) -> dict:
+    return {(frame_id, device): rest
+            for frame_id, device, *rest in conn.execute(
+                "SELECT frame_id, device, has_meta, quality_score, eye_side, captured_at, "
+                "jpg_sha256, meta_sha256 FROM frames WHERE date = ?", (date,))}
+
+
+def update_archive_index(conn: sqlite3.Connection, archive: dict, workers: int) -> dict:
+    """
+    Bring the index up to date with raw/: drop purged dates, rescan dates
+    whose signature changed (in parallel), keep unchanged ones and indexed
+    dates before the backend's settled_before (not even signed). A frame id
+    present under several dates resolves to the newest, as the old
+    newest-first directory search did.
+    """
+    on_disk = archive["list_dates"]()
+    indexed = dict(conn.execute("SELECT date, signature FROM dates"))
+
+    removed = sorted(set(indexed) - set(on_disk))
+    for date in removed:
+        conn.execute("DELETE FROM frames WHERE date = ?", (date,))
+        conn.execute("DELETE FROM dates WHERE date = ?", (date,))
+    conn.commit()
+
+    def signature(date: str) -> tuple[str, str | None]:
+        try:
+            return date, archive["signature"](date)
+        except OSError:
+            return date, None  # purged meanwhile
+
+    def scan(date: str, signature: str, known: dict) -> tuple[str, str, list, int] | None:
+        # Signature taken before the scan: files landing during the scan
+        # change it, so the date is picked up again next time.
+        try:
+            return date, signature, *scan_date_dir(archive, date, known)
+        except OSError:
+            return None  # purged while scanning
+
+    settled = archive.get("settled_before")
+    to_sign = [date for date in on_disk
+               if not (settled and date < settled and date in indexed)]
+    stats = {"dates": len(on_disk), "rescanned": 0, "removed": len(removed),
+             "settled": len(on_disk) - len(to_sign), "frames_scanned": 0, "meta_read": 0}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        changed = [(date, sig) for date, sig in pool.map(signature, to_sign)
+                   if sig is not None and indexed.get(date) != sig]
+        futures = [pool.submit(scan, date, sig, known_metadata(conn, date))
+                   for date, sig in changed]
+        for future in futures:
+            result = future.result()
+            if result is None:
+                continue
+            date, signature, rows, meta_read = result
+            conn.execute("DELETE FROM frames WHERE date = ?", (date,))
+            conn.executemany(
+                "INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(frame_id) DO UPDATE SET date = excluded.date, device = excluded.device, "
+                "has_jpg = excluded.has_jpg, has_meta = excluded.has_meta, "
+                "quality_score = excluded.quality_score, eye_side = excluded.eye_side, "
+                "captured_at = excluded.captured_at, jpg_sha256 = excluded.jpg_sha256, "
+                "meta_sha256 = excluded.meta_sha256 "
+                "WHERE excluded.date >= frames.date",
+                ((frame_id, date, *rest) for frame_id, *rest in rows))
+            conn.execute("INSERT OR REPLACE INTO dates VALUES (?, ?, ?)", (date, signature, len(rows)))
+            conn.commit()
+            stats["rescanned"] += 1
+            stats["frames_scanned"] += len(rows)
+            stats["meta_read"] += meta_read
+    stats["frames"] = conn.execute("SELECT COUNT(*) FROM frames").fetchone()[0]
+    return stats
+
+
+def frame_filter_sql(args: argparse.Namespace) -> tuple[str, list]:
+    """Expression over index columns that is true for frames passing the metadata filters."""
     conditions = []
+    params = []
+    if args.min_confidence > 0:
+        conditions.append("(quality_score IS NULL OR quality_score >= ?)")
+        params.append(args.min_confidence)
+    if args.devices:
+        conditions.append(f"device IN ({', '.join('?' * len(args.devices))})")
+        params.extend(sanitize_path(d) for d in args.devices)
+    if args.eye_side:
+        conditions.append("eye_side = ?")
+        params.append(args.eye_side)
+    if args.captured_since:
+        conditions.append("date >= ?")
+        params.append(args.captured_since)
+    if args.captured_until:
+        conditions.append("date < ?")
+        params.append(args.captured_until)
+    return " AND ".join(conditions) or "1", params
+
+
+def lookup_frames(index: sqlite3.Connection, archive: dict, frame_ids: list[str],
+                  filter_sql: str, filter_params: list) -> dict:
+    """
+    Look up a batch of frames in the archive index in one query. Returns
+    sanitized frame_id -> (jpg, meta | None, passes_filters, (jpg_sha256,
+    meta_sha256), eye_side) for the frames that have a JPEG.
+    """
+    names = list({sanitize_path(f) for f in frame_ids})
+    rows = index.execute(
+        f"SELECT frame_id, date, device, has_meta, jpg_sha256, meta_sha256, eye_side, "
+        f"{filter_sql} FROM frames WHERE has_jpg AND frame_id IN (SELECT value FROM json_each(?))",
+        [*filter_params, json.dumps(names)])
+    found = {}
+    for name, date, device, has_meta, jpg_sha256, meta_sha256, eye_side, passes in rows:
+        rel = f"raw/{date}/{device}/{name}"
+        found[name] = (archive["path"](f"{rel}.jpg"),
+                       archive["path"](f"{rel}.meta.json") if has_meta else None, bool(passes),
+                       (jpg_sha256, meta_sha256), eye_side)
+    return found
+
+
+def cache_frame_hashes(index: sqlite3.Connection, hashes: list[tuple]) -> None:
+    """Store (jpg_sha256, meta_sha256, frame_id) hashes computed during an export."""
+    index.executemany(
+        "UPDATE frames SET jpg_sha256 = ?, meta_sha256 = coalesce(?, meta_sha256) "
+        "WHERE frame_id = ? AND jpg_sha256 IS NULL", hashes)
+    index.commit()
+
+
+# ---------------------------------------------------------------------------
+# match_log streaming
+# ---------------------------------------------------------------------------
+# Rows come through a server-side (named) cursor in batches and the frame
+# list is written to manifest.jsonl as it goes (manifest.json describes the
+# export), so client memory stays flat however large match_log is.
+# --since/--until bound matched_at, which idx_match_log_time serves.
+
+MANIFEST_FRAMES_FILE = "manifest.jsonl"
+PROGRESS_EVERY = 100_000
+
+
+def parse_timestamp(value: str) -> datetime:
+    """ISO date or timestamp; naive values are taken as UTC."""
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def match_log_query(args: argparse.Namespace, bounds: tuple | None = None) -> tuple[str, list]:
+    """
+    SELECT over match_log for the export filters, with its parameters.
+    bounds = (column, lower, upper) restricts to lower < column <= upper
+    (lower None = no lower bound). With --max-frames the rows are a
+    stratified sample (see stratified_sample_query).
+    """
+    query = ("SELECT DISTINCT probe_frame_id, hamming_distance, is_match, device_id, "
+             "matched_identity_id FROM match_log")
+    conditions = []
+    params = []
+
+    if args.max_frames > 0 and args.sample_percent < 100:
+        query += " TABLESAMPLE SYSTEM (%s)"
+        params.append(args.sample_percent)
+        if args.seed is not None:
+            query += " REPEATABLE (%s)"
+            params.append(args.seed)
 
     if args.matches_only:
         conditions.append("is_match = true")
     elif args.no_match_only:
         conditions.append("is_match = false")
+    if args.hd_min is not None:
+        conditions.append("hamming_distance >= %s")
+        params.append(args.hd_min)
+    if args.hd_max is not None:
+        conditions.append("hamming_distance <= %s")
+        params.append(args.hd_max)
+
+    if args.since:
+        conditions.append("matched_at >= %s")
+        params.append(args.since)
+    if args.until:
+        conditions.append("matched_at < %s")
+        params.append(args.until)
+    if bounds is not None:
+        column, lower, upper = bounds  # column is one of WATERMARK_COLUMNS
+        if lower is not None:
+            conditions.append(f"{column} > %s")
+            params.append(lower)
+        conditions.append(f"{column} <= %s")
+        params.append(upper)
 
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
 
-    query += " ORDER BY probe_frame_id"
-
     if args.max_frames > 0:
-        query += f" LIMIT {args.max_frames}"
+        return stratified_sample_query(args, query, params)
+    return query, params
 
-    cur.execute(query)
-    rows = cur.fetchall()
-    print(f"Found {len(rows)} frames in match_log")
 
-    if not rows:
-        print("No frames to export.")
-        return
+# ---------------------------------------------------------------------------
+# Stratified sampling
+# ---------------------------------------------------------------------------
+# --max-frames N draws N rows spread evenly over the strata (--strata: any of
+# device_id, Hamming distance bin and match/non-match): every row is ranked
+# within its stratum in a pseudo-random order, and ranks are taken 1, 2, ...
+# across all strata until N rows are in. A stratum with fewer rows than its
+# share simply runs out and the others fill in. The order is md5(frame_id ||
+# seed), so a given --seed draws the same sample again. --sample-percent adds
+# TABLESAMPLE SYSTEM in front, so only that share of match_log's pages is read
+# at all -- for logs too large to rank in full.
+
+STRATA = ("device", "hd", "match")
+
 
-    # Create output directory structure
-    if not args.dry_run:
-        (output_dir / "images").mkdir(parents=True, exist_ok=True)
-        (output_dir / "metadata").mkdir(parents=True, exist_ok=True)
+def parse_strata(value: str) -> list[str]:
+    strata = [s for s in value.split(",") if s and s != "none"]
+    unknown = set(strata) - set(STRATA)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown strata: {', '.join(sorted(unknown))} "
+                                         f"(choose from {', '.join(STRATA)} or none)")
+    return strata
+
+
+def stratified_sample_query(args: argparse.Namespace, candidates: str,
+                            params: list) -> tuple[str, list]:
+    hd_low = args.hd_min if args.hd_min is not None else 0.0
+    hd_high = args.hd_max if args.hd_max is not None else 1.0
+    expressions = {
+        "device": "device_id",
+        # Values at hd_high land in bin hd_bins + 1, a bin of their own
+        "hd": f"width_bucket(hamming_distance, {float(hd_low)!r}, {float(hd_high)!r}, "
+              f"{int(args.hd_bins)})",
+        "match": "is_match",
+    }
+    partition = ", ".join(expressions[s] for s in args.strata)
+    over = f"PARTITION BY {partition} " if partition else ""
+    query = (
+        "SELECT probe_frame_id, hamming_distance, is_match, device_id, matched_identity_id FROM ("
+        "SELECT *, row_number() OVER ("
+        f"{over}ORDER BY md5(probe_frame_id || %s)) AS stratum_rank "
+        f"FROM ({candidates}) AS candidates"
+        ") AS ranked ORDER BY stratum_rank, md5(probe_frame_id || %s) LIMIT %s"
+    )
+    seed = str(args.seed if args.seed is not None else "")
+    return query, [seed, *params, seed, args.max_frames]
 
-    exported = 0
-    skipped_no_file = 0
-    skipped_quality = 0
-    manifest_entries = []
 
-    for row in rows:
-        frame_id = row["probe_frame_id"]
-        device_id = row["device_id"] or "unknown"
+def stream_match_log(conn, query: str, params: list, batch_size: int):
+    """Yield batches of batch_size rows from a server-side cursor, one per round trip."""
+    with conn.cursor(name="export_match_log", cursor_factory=psycopg2.extras.DictCursor) as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
 
-        # Find archive files
-        jpg_path, meta_path = find_archive_files(archive_root, frame_id)
 
-        if jpg_path is None:
-            skipped_no_file += 1
+# ---------------------------------------------------------------------------
+# Incremental exports
+# ---------------------------------------------------------------------------
+# Every export records a watermark in manifest.json: the highest log_id (or
+# matched_at, --watermark-column) value when the export started; rows above
+# it are left for the next delta. A delta (--parent DIR, or --incremental for
+# the newest export next to --output-dir) fetches only the rows above its
+# parent's watermark and links its manifest to the parent, so the full
+# dataset is the chain root -> ... -> latest delta. An export limited by
+# --max-frames (or by --until with a log_id watermark) does not cover
+# everything below its high-water mark, so it records no watermark and
+# cannot be a parent.
+
+WATERMARK_COLUMNS = ("log_id", "matched_at")
+CHAINED_FILTERS = ("min_confidence", "matches_only", "no_match_only", "devices", "eye_side",
+                   "captured_since", "captured_until", "hd_min", "hd_max")
+
+
+def load_manifest(export_dir: Path) -> dict | None:
+    try:
+        return json.loads((export_dir / "manifest.json").read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def newest_export(exports_root: Path, exclude: Path) -> Path | None:
+    """The sibling export with a watermark and the latest export_date."""
+    best = None
+    if not exports_root.is_dir():
+        return None
+    for d in exports_root.iterdir():
+        if not d.is_dir() or d.resolve() == exclude.resolve():
             continue
+        manifest = load_manifest(d)
+        if manifest and manifest.get("watermark"):
+            if best is None or manifest["export_date"] > best[0]:
+                best = (manifest["export_date"], d)
+    return best[1] if best else None
 
-        # Check quality filter from metadata
-        if args.min_confidence > 0 and meta_path:
-            try:
-                meta = json.loads(meta_path.read_text())
-                quality = meta.get("quality_score", 0.0)
-                if quality < args.min_confidence:
-                    skipped_quality += 1
+
+def manifest_chain(export_dir: Path) -> list[Path]:
+    """Export directories from the chain root to export_dir, following parent links."""
+    chain = []
+    current = export_dir
+    while current is not None and current.resolve() not in {c.resolve() for c in chain}:
+        chain.append(current)
+        manifest = load_manifest(current)
+        parent = manifest.get("parent") if manifest else None
+        current = (current / parent["path"]) if parent else None
+    return chain[::-1]
+
+
+def parse_watermark(watermark: dict):
+    """Watermark value from manifest.json as a query parameter."""
+    if watermark["column"] == "matched_at":
+        return datetime.fromisoformat(watermark["value"])
+    return int(watermark["value"])
+
+
+def high_water_mark(conn, column: str, until: datetime | None):
+    """Current maximum of the watermark column (capped by --until for matched_at)."""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT max({column}) FROM match_log")  # column from WATERMARK_COLUMNS
+        value = cur.fetchone()[0]
+    if column == "matched_at" and until is not None and value is not None:
+        value = min(value, until - timedelta(microseconds=1))
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Copy engine
+# ---------------------------------------------------------------------------
+# Frames are transferred by a bounded thread pool (--copy-workers; file copies
+# release the GIL). --transfer picks the chain: reflink (FICLONE), then
+# copy_file_range, then a buffered copy (auto), or hardlink (the export shares
+# the archive's inodes). A mode the filesystems reject (cross-device,
+# unsupported) is disabled for the rest of the run and the next one is used.
+# --max-mb-per-sec caps the read rate so an export does not starve the archive.
+
+TRANSFER_MODES = ("auto", "reflink", "copy-file-range", "hardlink", "copy")
+FICLONE = 0x40049409  # _IOW(0x94, 9, int) from linux/fs.h
+COPY_BUFFER_SIZE = 1024 * 1024
+FALLBACK_ERRNOS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL,
+                   errno.ENOSYS, errno.ENOTTY, errno.EPERM}
+
+
+def _transfer_reflink(src: Path, dst: Path) -> None:
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def _transfer_copy_file_range(src: Path, dst: Path) -> None:
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if n == 0:
+                break
+            remaining -= n
+
+
+def _transfer_hardlink(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        os.unlink(dst)
+        os.link(src, dst)
+
+
+def _transfer_copy(src: Path, dst: Path) -> None:
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+
+
+TRANSFERS = {
+    "reflink": _transfer_reflink,
+    "copy-file-range": _transfer_copy_file_range,
+    "hardlink": _transfer_hardlink,
+    "copy": _transfer_copy,
+}
+
+
+def make_copy_engine(mode: str, max_mb_per_sec: float = 0.0) -> dict:
+    """Shared state of the copy threads: transfer chain, counters, rate limit."""
+    if mode == "auto":
+        chain = ["reflink", "copy-file-range", "copy"]
+    elif mode == "copy":
+        chain = ["copy"]
+    else:
+        chain = [mode, "copy"]
+    if not hasattr(os, "copy_file_range") and "copy-file-range" in chain:
+        chain.remove("copy-file-range")
+    return {
+        "chain": chain,
+        "disabled": set(),
+        "lock": threading.Lock(),
+        "start": time.monotonic(),
+        "bytes": 0,
+        "files": 0,
+        "by_mode": {},
+        "limit_bytes_per_sec": max_mb_per_sec * 1024 * 1024,
+    }
+
+
+def transfer_file(src: Path, dst: Path, engine: dict) -> None:
+    """
+    Transfer one file with the first working mode of the engine's chain and
+    keep copy2 semantics (mtime/permissions) for non-hardlinks. Raises
+    FileNotFoundError when src is gone.
+    """
+    size = os.stat(src).st_size
+    for mode in engine["chain"]:
+        if mode in engine["disabled"]:
+            continue
+        try:
+            TRANSFERS[mode](src, dst)
+        except OSError as e:
+            if mode != "copy" and e.errno in FALLBACK_ERRNOS:
+                engine["disabled"].add(mode)
+                continue
+            raise
+        if mode != "hardlink":
+            shutil.copystat(src, dst)
+        break
+    account_transfer(engine, size, mode)
+
+
+def account_transfer(engine: dict, size: int, mode: str) -> None:
+    """Count a transferred file and sleep as needed to hold --max-mb-per-sec."""
+    with engine["lock"]:
+        engine["bytes"] += size
+        engine["files"] += 1
+        engine["by_mode"][mode] = engine["by_mode"].get(mode, 0) + 1
+        delay = 0.0
+        if engine["limit_bytes_per_sec"] > 0:
+            due = engine["start"] + engine["bytes"] / engine["limit_bytes_per_sec"]
+            delay = due - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def engine_throughput(engine: dict) -> str:
+    elapsed = max(time.monotonic() - engine["start"], 1e-6)
+    return (f"{engine['files'] / elapsed:.0f} files/s, "
+            f"{engine['bytes'] / elapsed / 1024 / 1024:.1f} MB/s")
+
+
+def export_frame(jpg_path: Path, meta_path: Path | None, output_dir: Path, safe_frame_id: str,
+                 engine: dict) -> str:
+    """Transfer one frame: 'exported' or 'no_file'."""
+    try:
+        transfer_file(jpg_path, output_dir / "images" / f"{safe_frame_id}.jpg", engine)
+    except FileNotFoundError:
+        return "no_file"  # purged since the index was updated
+    if meta_path:
+        try:
+            transfer_file(meta_path, output_dir / "metadata" / f"{safe_frame_id}.meta.json", engine)
+        except FileNotFoundError:
+            pass
+    return "exported"
+
+
+# ---------------------------------------------------------------------------
+# Sharded output (WebDataset)
+# ---------------------------------------------------------------------------
+# ~--shard-size-mb tar shards in the WebDataset layout ({key}.jpg,
+# {key}.meta.json, {key}.json labels), each with a shard-NNNNNN.idx.jsonl of
+# member offsets. Training jobs stream them with iter_shards():
+#     from export_training import iter_shards
+#     for key, sample in iter_shards(Path("data/training-export/export-001")):
+#         jpg, labels = sample["jpg"], json.loads(sample["json"])
+# --shard-writers shards are open at once, each owned by one thread at a
+# time: copy threads read a frame, take a free shard from the queue, append
+# the sample and hand the shard back. A shard past --shard-size-mb is closed
+# and the next one is opened in its slot. Shards and their indexes are
+# written under a .tmp name and renamed when complete.
+
+SHARD_NAME = "shard-{:06d}.tar"
+SHARD_INDEX_SUFFIX = ".idx.jsonl"
+SHARD_READ_BUFFER = 8 * 1024 * 1024
+TAR_BLOCK = 512
+
+
+def sample_key(frame_id: str) -> str:
+    """WebDataset key: the extension starts at the first dot, so keys have none."""
+    return re.sub(r"[^A-Za-z0-9_-]", "_", frame_id)
+
+
+def make_shard_set(output_dir: Path, writers: int, shard_size_mb: float) -> dict:
+    free = queue.Queue()
+    for _ in range(max(1, writers)):
+        free.put(None)  # a slot; its shard is opened on first use
+    return {
+        "dir": output_dir,
+        "limit": shard_size_mb * 1024 * 1024,
+        "lock": threading.Lock(),
+        "next": 0,
+        "free": free,
+        "done": [],
+    }
+
+
+def _open_shard(sset: dict) -> dict:
+    with sset["lock"]:
+        name = SHARD_NAME.format(sset["next"])
+        sset["next"] += 1
+    path = sset["dir"] / name
+    f = open(f"{path}.tmp", "wb")
+    return {
+        "name": name,
+        "path": path,
+        "file": f,
+        "tar": tarfile.open(fileobj=f, mode="w", format=tarfile.PAX_FORMAT),
+        "index": open(f"{path}{SHARD_INDEX_SUFFIX}.tmp", "w"),
+        "samples": 0,
+    }
+
+
+def _close_shard(sset: dict, shard: dict) -> None:
+    shard["tar"].close()
+    size = shard["file"].tell()
+    shard["file"].close()
+    shard["index"].close()
+    path = shard["path"]
+    os.replace(f"{path}.tmp", path)
+    os.replace(f"{path}{SHARD_INDEX_SUFFIX}.tmp", f"{path}{SHARD_INDEX_SUFFIX}")
+    with sset["lock"]:
+        sset["done"].append({"name": shard["name"], "samples": shard["samples"], "bytes": size})
+
+
+def append_sample(sset: dict, key: str, frame_id: str, members: list[tuple[str, bytes]],
+                  mtime: float) -> str:
+    """Write one sample's members into a free shard; returns the shard name."""
+    shard = sset["free"].get()
+    try:
+        if shard is None:
+            shard = _open_shard(sset)
+        tar = shard["tar"]
+        offsets = {}
+        for ext, data in members:
+            info = tarfile.TarInfo(f"{key}.{ext}")
+            info.size = len(data)
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(data))
+            # addfile leaves tar.offset after the member's padded data
+            offsets[ext] = [tar.offset - -(-len(data) // TAR_BLOCK) * TAR_BLOCK, len(data)]
+        shard["index"].write(json.dumps({"key": key, "frame_id": frame_id,
+                                         "members": offsets}) + "\n")
+        shard["samples"] += 1
+        name = shard["name"]
+        if shard["file"].tell() >= sset["limit"]:
+            _close_shard(sset, shard)
+            shard = None
+        return name
+    finally:
+        sset["free"].put(shard)
+
+
+def close_shard_set(sset: dict) -> None:
+    while not sset["free"].empty():
+        shard = sset["free"].get()
+        if shard is not None:
+            _close_shard(sset, shard)
+    sset["done"].sort(key=lambda d: d["name"])
+
+
+def export_frame_to_shard(entry: dict, jpg_path: Path, meta_path: Path | None,
+                          sset: dict, engine: dict) -> str:
+    """Append one frame to a shard: 'exported' or 'no_file'."""
+    meta = None
+    if meta_path:
+        try:
+            meta = meta_path.read_bytes()
+        except FileNotFoundError:
+            pass
+    try:
+        jpg = jpg_path.read_bytes()
+        mtime = os.stat(jpg_path).st_mtime
+    except FileNotFoundError:
+        return "no_file"
+    members = [("jpg", jpg)]
+    if meta is not None:
+        members.append(("meta.json", meta))
+    members.append(("json", json.dumps(entry).encode()))
+    entry["shard"] = append_sample(sset, sample_key(entry["frame_id"]), entry["frame_id"],
+                                   members, mtime)
+    account_transfer(engine, len(jpg) + len(meta or b""), "tar")
+    return "exported"
+
+
+def _iter_tar(path: Path):
+    with open(path, "rb", buffering=SHARD_READ_BUFFER) as f, tarfile.open(fileobj=f, mode="r|") as tar:
+        key, sample = None, {}
+        for member in tar:
+            if not member.isfile():
+                continue
+            k, _, ext = member.name.partition(".")
+            if sample and (k != key or ext in sample):  # a repeated key is a new sample
+                yield key, sample
+                sample = {}
+            key = k
+            sample[ext] = tar.extractfile(member).read()
+        if sample:
+            yield key, sample
+
+
+def iter_shards(export_dir: Path, chain: bool = True):
+    """
+    Stream a sharded export as (key, {extension: bytes}) samples, reading
+    each shard front to back. With chain, the parents of a delta export are
+    read first, so the whole dataset comes out.
+    """
+    for d in (manifest_chain(Path(export_dir)) if chain else [Path(export_dir)]):
+        manifest = load_manifest(d) or {}
+        for shard in manifest.get("shards", []):
+            yield from _iter_tar(d / shard["name"])
+
+
+def read_shard_sample(shard_path: Path, index_entry: dict) -> dict:
+    """Random access to one sample through its line in the shard's .idx.jsonl."""
+    sample = {}
+    with open(shard_path, "rb") as f:
+        for ext, (offset, size) in index_entry["members"].items():
+            f.seek(offset)
+            sample[ext] = f.read(size)
+    return sample
+
+
+# ---------------------------------------------------------------------------
+# Content-addressed blob store
+# ---------------------------------------------------------------------------
+# blobs/{sha[:2]}/{sha}: one file per distinct content, shared by every
+# --format refs export that points at the store (--blob-store, default blobs/
+# next to the export); manifest.jsonl references frames by jpg_sha256 /
+# meta_sha256 and blob_path() resolves a hash to its file. Known frames are
+# not copied again. A blob is transferred with
+# the copy engine under a temporary name and renamed into place, so
+# concurrent writers of the same content are harmless and a blob that exists
+# is complete.
+
+def blob_path(store: Path, digest: str) -> Path:
+    return Path(store) / digest[:2] / digest
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(COPY_BUFFER_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def store_blob(src: Path, digest: str, store: Path, engine: dict) -> None:
+    dst = blob_path(store, digest)
+    if dst.exists():
+        account_transfer(engine, 0, "deduplicated")
+        return
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{digest}.{threading.get_ident()}.tmp")
+    transfer_file(src, tmp, engine)
+    os.replace(tmp, dst)
+
+
+def export_frame_to_store(entry: dict, jpg_path: Path, meta_path: Path | None,
+                          hashes: tuple, store: Path, engine: dict) -> str:
+    """
+    Put one frame's files into the blob store, hashing them unless the index
+    had the hashes: 'exported' or 'no_file'. The hashes go into entry.
+    """
+    jpg_sha256, meta_sha256 = hashes
+    try:
+        jpg_sha256 = jpg_sha256 or file_sha256(jpg_path)
+        store_blob(jpg_path, jpg_sha256, store, engine)
+    except FileNotFoundError:
+        return "no_file"  # purged since the index was updated
+    if meta_path:
+        try:
+            meta_sha256 = meta_sha256 or file_sha256(meta_path)
+            store_blob(meta_path, meta_sha256, store, engine)
+        except FileNotFoundError:
+            meta_sha256 = None
+    else:
+        meta_sha256 = None
+    entry["jpg_sha256"] = jpg_sha256
+    entry["meta_sha256"] = meta_sha256
+    return "exported"
+
+
+# ---------------------------------------------------------------------------
+# Tensor output
+# ---------------------------------------------------------------------------
+# images.u8 is a raw uint8 (frames, height, width) array that np.memmap opens
+# directly: grayscale, resized to --tensor-size, min-max normalized.
+# labels.npy is a row-aligned structured array; manifest.json records the
+# shape and SHA-256 of both, and load_tensors() maps an export. Needs numpy
+# and Pillow.
+# Decoding runs in --tensor-workers processes (JPEG decode and resize hold
+# the GIL). Pillow's draft mode lets the JPEG decoder scale down by 1/2..1/8
+# in the DCT, so large frames are never decoded at full size. The main
+# process appends the pixels to images.u8 in completion order and the label
+# row alongside, hashing images.u8 as it is written.
+
+TENSOR_IMAGES_FILE = "images.u8"
+TENSOR_LABELS_FILE = "labels.npy"
+# String fields ("U") are sized to the longest value in the export, so no
+# frame or device id is ever truncated.
+TENSOR_LABEL_DTYPE = [
+    ("frame_id", "U"),
+    ("identity_id", "U"),
+    ("eye_side", "U"),
+    ("device_id", "U"),
+    ("hamming_distance", "<f4"),
+    ("is_match", "?"),
+]
+
+
+def tensor_label_dtype(labels: list[tuple]) -> list[tuple[str, str]]:
+    """TENSOR_LABEL_DTYPE with each string field as wide as its longest value in labels."""
+    return [(name, f"U{max([1, *(len(row[i]) for row in labels)])}" if kind == "U" else kind)
+            for i, (name, kind) in enumerate(TENSOR_LABEL_DTYPE)]
+
+
+def parse_tensor_size(value: str) -> tuple[int, int]:
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
+
+
+def preprocess_frame(jpg_path: Path, size: tuple[int, int],
+                     normalize: str) -> tuple[str, bytes | None]:
+    """Decode, grayscale, resize and normalize one frame: ('exported', pixels), 'no_file' or 'corrupt'."""
+    try:
+        with Image.open(jpg_path) as img:
+            img.draft("L", size)
+            gray = img.convert("L").resize(size, Image.BILINEAR)
+    except FileNotFoundError:
+        return "no_file", None
+    except (OSError, SyntaxError, ValueError):
+        return "corrupt", None
+    pixels = np.asarray(gray, dtype=np.uint8)
+    if normalize == "minmax":
+        lo, hi = int(pixels.min()), int(pixels.max())
+        if hi > lo:
+            pixels = ((pixels.astype(np.uint16) - lo) * 255 // (hi - lo)).astype(np.uint8)
+    return "exported", pixels.tobytes()
+
+
+def make_tensor_writer(output_dir: Path, size: tuple[int, int]) -> dict:
+    return {
+        "file": open(output_dir / TENSOR_IMAGES_FILE, "wb"),
+        "sha256": hashlib.sha256(),
+        "size": size,
+        "labels": [],
+    }
+
+
+def append_tensor(writer: dict, entry: dict, pixels: bytes) -> None:
+    writer["file"].write(pixels)
+    writer["sha256"].update(pixels)
+    writer["labels"].append((entry["frame_id"], entry["identity_id"] or "",
+                             entry.get("eye_side") or "", entry["device_id"],
+                             entry["hamming_distance"], entry["is_match"]))
+
+
+def close_tensor_writer(writer: dict, output_dir: Path) -> dict:
+    """Finish images.u8, write labels.npy and return the manifest's tensors section."""
+    writer["file"].close()
+    np.save(output_dir / TENSOR_LABELS_FILE,
+            np.array(writer["labels"], dtype=tensor_label_dtype(writer["labels"])))
+    width, height = writer["size"]
+    return {
+        "images": TENSOR_IMAGES_FILE,
+        "dtype": "uint8",
+        "shape": [len(writer["labels"]), height, width],
+        "images_sha256": writer["sha256"].hexdigest(),
+        "labels": TENSOR_LABELS_FILE,
+        "labels_sha256": file_sha256(output_dir / TENSOR_LABELS_FILE),
+    }
+
+
+def load_tensors(export_dir: Path, verify: bool = False):
+    """(images, labels) of a --format tensors export; images is a read-only np.memmap."""
+    export_dir = Path(export_dir)
+    tensors = load_manifest(export_dir)["tensors"]
+    if verify:
+        for name, digest in ((tensors["images"], tensors["images_sha256"]),
+                             (tensors["labels"], tensors["labels_sha256"])):
+            if file_sha256(export_dir / name) != digest:
+                raise ValueError(f"{export_dir / name}: checksum mismatch")
+    labels = np.load(export_dir / tensors["labels"])
+    if tensors["shape"][0] == 0:
+        return np.empty(tensors["shape"], dtype=np.uint8), labels
+    images = np.memmap(export_dir / tensors["images"], dtype=np.uint8, mode="r",
+                       shape=tuple(tensors["shape"]))
+    return images, labels
+
+
+def export(args: argparse.Namespace) -> None:
+    archive = open_archive(args)
+    output_dir = Path(args.output_dir or ".")
+
+    # Bring the archive index up to date
+    index_path = Path(args.index) if args.index else default_index_path(archive, args)
+    print(f"Updating archive index {index_path}...")
+    t0 = time.monotonic()
+    index = open_archive_index(index_path, rebuild=args.rebuild_index)
+    stats = update_archive_index(index, archive, args.index_workers)
+    print(f"  {stats['frames']} frames in {stats['dates']} date dirs, "
+          f"{stats['meta_read']} metadata files read "
+          f"({stats['rescanned']} rescanned, {stats['removed']} removed, "
+          f"{stats['settled']} settled dates not listed) "
+          f"in {time.monotonic() - t0:.1f}s")
+    if args.index_only:
+        index.close()
+        archive["close"]()
+        return
+
+    # Parent export for a delta
+    parent_dir = parent = None
+    if args.incremental:
+        parent_dir = newest_export(output_dir.parent, exclude=output_dir)
+        if parent_dir is None:
+            print(f"No previous export with a watermark in {output_dir.parent}; exporting everything")
+    elif args.parent:
+        parent_dir = Path(args.parent)
+    if parent_dir is not None:
+        parent = load_manifest(parent_dir)
+        if parent is None or not parent.get("watermark"):
+            print(f"Error: {parent_dir} has no manifest with a watermark", file=sys.stderr)
+            sys.exit(1)
+        differing = [k for k in CHAINED_FILTERS
+                     if parent["filters"].get(k) != getattr(args, k)]
+        if differing:
+            print(f"Error: filters differ from the parent export ({', '.join(differing)})",
+                  file=sys.stderr)
+            sys.exit(1)
+        print(f"Delta on top of {parent_dir} "
+              f"({parent['watermark']['column']} > {parent['watermark']['value']})")
+
+    if args.format == "tensors" and np is None:
+        print("Error: --format tensors needs numpy and Pillow. Run: pip install numpy pillow",
+              file=sys.stderr)
+        sys.exit(1)
+
+    # Connect to database
+    if psycopg2 is None:
+        print("Error: psycopg2 not installed. Run: pip install psycopg2-binary", file=sys.stderr)
+        sys.exit(1)
+    print(f"Connecting to database...")
+    conn = psycopg2.connect(args.db_url)
+    column = parent["watermark"]["column"] if parent else args.watermark_column
+    upper = high_water_mark(conn, column, args.until)
+    lower = parse_watermark(parent["watermark"]) if parent else None
+    if upper is None or (lower is not None and upper <= lower):
+        print("No new rows in match_log." if parent else "match_log is empty.")
+        conn.close()
+        index.close()
+        archive["close"]()
+        return
+    query, params = match_log_query(args, (column, lower, upper))
+    covers_all = args.max_frames <= 0 and not (args.until and column == "log_id")
+    if not covers_all:
+        print("  NOTE: --max-frames/--until limit this export; it records no watermark "
+              "and cannot be a parent")
+
+    filter_sql, filter_params = frame_filter_sql(args)
+    manifest_file = None
+    counts = {"exported": 0, "filtered": 0, "no_file": 0, "corrupt": 0}
+    scanned = 0
+    engine = make_copy_engine(args.transfer, args.max_mb_per_sec)
+    sset = None
+    blob_store = None
+    if args.format == "refs":
+        blob_store = Path(args.blob_store) if args.blob_store else output_dir.parent / "blobs"
+    hash_cache = []  # (jpg_sha256, meta_sha256, frame_id) to store in the index
+    tensors = None
+    pending = {}  # future -> manifest entry
+    if args.format == "tensors":
+        workers = max(1, args.tensor_workers)
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        workers = max(1, args.copy_workers)
+        pool = ThreadPoolExecutor(max_workers=workers)
+    max_pending = workers * 4
+
+    def collect(futures):
+        for future in futures:
+            entry = pending.pop(future)
+            status = future.result()
+            if tensors is not None:
+                status, pixels = status
+                if status == "exported":
+                    append_tensor(tensors, entry, pixels)
+                    account_transfer(engine, len(pixels), "tensor")
+            counts[status] += 1
+            if status == "exported":
+                manifest_file.write(json.dumps(entry) + "\n")
+                if blob_store is not None:
+                    hash_cache.append((entry["jpg_sha256"], entry["meta_sha256"],
+                                       sanitize_path(entry["frame_id"])))
+
+    with pool:
+        for batch in stream_match_log(conn, query, params, args.batch_size):
+            found = lookup_frames(index, archive, [row["probe_frame_id"] for row in batch],
+                                  filter_sql, filter_params)
+            if not args.dry_run:
+                # Concurrent GETs into the cache for a remote archive, while
+                # the copy pool works through the previous batch
+                archive["prefetch"]([path for jpg, meta, passes, *_ in found.values() if passes
+                                     for path in (jpg, meta) if path])
+            for row in batch:
+                scanned += 1
+                if scanned % PROGRESS_EVERY == 0:
+                    print(f"  {scanned} rows read, {counts['exported']} exported "
+                          f"({engine_throughput(engine)})")
+                frame_id = row["probe_frame_id"]
+                entry = {
+                    "frame_id": frame_id,
+                    "device_id": row["device_id"] or "unknown",
+                    "hamming_distance": float(row["hamming_distance"]),
+                    "is_match": bool(row["is_match"]),
+                    "identity_id": (str(row["matched_identity_id"])
+                                    if row["matched_identity_id"] else None),
+                }
+
+                hit = found.get(sanitize_path(frame_id))
+                if hit is None:
+                    counts["no_file"] += 1
+                    continue
+                jpg_path, meta_path, passes, hashes, eye_side = hit
+                if not passes:
+                    counts["filtered"] += 1
                     continue
-            except (json.JSONDecodeError, KeyError):
-                pass
 
-        if args.dry_run:
-            print(f"  Would export: {frame_id} ({jpg_path})")
-        else:
-            # Copy JPEG
-            safe_frame_id = frame_id.replace("/", "_").replace("\\", "_")
-            shutil.copy2(jpg_path, output_dir / "images" / f"{safe_frame_id}.jpg")
-
-            # Copy metadata
-            if meta_path:
-                shutil.copy2(meta_path, output_dir / "metadata" / f"{safe_frame_id}.meta.json")
-
-        manifest_entries.append({
-            "frame_id": frame_id,
-            "device_id": device_id,
-            "hamming_distance": float(row["hamming_distance"]),
-            "is_match": bool(row["is_match"]),
-        })
-        exported += 1
-
-    # Write manifest
-    if not args.dry_run and manifest_entries:
+                if args.dry_run:
+                    print(f"  Would export: {frame_id} ({jpg_path})")
+                    counts["exported"] += 1
+                    continue
+
+                # Create output directory structure on the first frame
+                if manifest_file is None:
+                    if args.format == "shards":
+                        output_dir.mkdir(parents=True, exist_ok=True)
+                        sset = make_shard_set(output_dir, args.shard_writers, args.shard_size_mb)
+                    elif blob_store is not None:
+                        output_dir.mkdir(parents=True, exist_ok=True)
+                        blob_store.mkdir(parents=True, exist_ok=True)
+                    elif args.format == "tensors":
+                        output_dir.mkdir(parents=True, exist_ok=True)
+                        tensors = make_tensor_writer(output_dir, args.tensor_size)
+                    else:
+                        (output_dir / "images").mkdir(parents=True, exist_ok=True)
+                        (output_dir / "metadata").mkdir(parents=True, exist_ok=True)
+                    manifest_file = open(output_dir / MANIFEST_FRAMES_FILE, "w")
+                    engine["start"] = time.monotonic()
+
+                if sset is not None:
+                    future = pool.submit(export_frame_to_shard, entry, jpg_path, meta_path,
+                                         sset, engine)
+                elif tensors is not None:
+                    entry["eye_side"] = eye_side
+                    future = pool.submit(preprocess_frame, jpg_path, args.tensor_size,
+                                         args.tensor_normalize)
+                elif blob_store is not None:
+                    future = pool.submit(export_frame_to_store, entry, jpg_path, meta_path,
+                                         hashes, blob_store, engine)
+                else:
+                    safe_frame_id = frame_id.replace("/", "_").replace("\\", "_")
+                    future = pool.submit(export_frame, jpg_path, meta_path, output_dir,
+                                         safe_frame_id, engine)
+                pending[future] = entry
+                # Bounded in-flight work keeps memory flat and the archive's
+                # I/O queue at --copy-workers (--tensor-workers) deep
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            if hash_cache:
+                cache_frame_hashes(index, hash_cache)
+                hash_cache.clear()
+        collect(list(pending))
+        if hash_cache:
+            cache_frame_hashes(index, hash_cache)
+    if sset is not None:
+        close_shard_set(sset)
+
+    conn.close()
+    index.close()
+    archive["close"]()
+    if args.cache_max_gb > 0 and "cache_dir" in archive:
+        files, size = trim_cache(archive["cache_dir"], args.cache_max_gb * 1024 ** 3)
+        if files:
+            print(f"Trimmed {files} files ({size / 1024 / 1024:.1f} MB) from {archive['cache_dir']}")
+    exported = counts["exported"]
+    print(f"Read {scanned} frames from match_log")
+    if scanned == 0:
+        print("No frames to export.")
+
+    if not args.dry_run and scanned > 0 and manifest_file is None:
+        # Nothing copied, but the manifest still advances the watermark
+        output_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file = open(output_dir / MANIFEST_FRAMES_FILE, "w")
+        if args.format == "tensors":
+            tensors = make_tensor_writer(output_dir, args.tensor_size)
+
+    # Write manifest: frames were streamed to manifest.jsonl, manifest.json
+    # describes the export
+    if manifest_file is not None:
+        manifest_file.close()
         manifest = {
             "export_date": datetime.now(timezone.utc).isoformat(),
             "total_frames": exported,
@@ -176,23 +1559,68 @@ def export(args: argparse.Namespace) -> None:
                 "min_confidence": args.min_confidence,
                 "matches_only": args.matches_only,
                 "no_match_only": args.no_match_only,
+                "devices": args.devices,
+                "eye_side": args.eye_side,
+                "captured_since": args.captured_since,
+                "captured_until": args.captured_until,
+                "hd_min": args.hd_min,
+                "hd_max": args.hd_max,
+                "since": args.since.isoformat() if args.since else None,
+                "until": args.until.isoformat() if args.until else None,
             },
-            "frames": manifest_entries,
+            "sample": ({"max_frames": args.max_frames, "strata": args.strata,
+                        "hd_bins": args.hd_bins, "sample_percent": args.sample_percent,
+                        "seed": args.seed} if args.max_frames > 0 else None),
+            "frames_file": MANIFEST_FRAMES_FILE,
+            "format": args.format,
+            "watermark": ({"column": column,
+                           "value": upper.isoformat() if isinstance(upper, datetime) else upper}
+                          if covers_all else None),
+            "parent": None,
+            "chain_total_frames": exported,
         }
+        if sset is not None:
+            manifest["shards"] = sset["done"]
+        if tensors is not None:
+            manifest["tensors"] = close_tensor_writer(tensors, output_dir)
+            manifest["tensors"]["normalize"] = args.tensor_normalize
+        if blob_store is not None:
+            manifest["blob_store"] = os.path.relpath(blob_store.resolve(), output_dir.resolve())
+        if parent:
+            manifest["parent"] = {
+                "path": os.path.relpath(parent_dir.resolve(), output_dir.resolve()),
+                "watermark": parent["watermark"],
+            }
+            manifest["chain_total_frames"] += parent.get("chain_total_frames",
+                                                         parent["total_frames"])
         manifest_path = output_dir / "manifest.json"
         manifest_path.write_text(json.dumps(manifest, indent=2))
 
     # Summary
     print(f"\nExport summary:")
     print(f"  Exported:         {exported}")
-    print(f"  Skipped (no file):{skipped_no_file}")
-    print(f"  Skipped (quality):{skipped_quality}")
-    if not args.dry_run and exported > 0:
+    print(f"  Skipped (no file):{counts['no_file']}")
+    print(f"  Skipped (filters):{counts['filtered']}")
+    if counts["corrupt"]:
+        print(f"  Skipped (corrupt):{counts['corrupt']}")
+    if manifest_file is not None:
+        modes = ", ".join(f"{mode} {n}" for mode, n in sorted(engine["by_mode"].items()))
+        print(f"  Transferred:      {engine['files']} files, "
+              f"{engine['bytes'] / 1024 / 1024:.1f} MB ({engine_throughput(engine)}; {modes})")
         print(f"  Output:           {output_dir}")
-        print(f"  Manifest:         {output_dir / 'manifest.json'}")
-
-    cur.close()
-    conn.close()
+        if blob_store is not None:
+            print(f"  Blob store:       {blob_store}")
+        if tensors is not None:
+            print(f"  Tensors:          {TENSOR_IMAGES_FILE} {manifest['tensors']['shape']} uint8, "
+                  f"{TENSOR_LABELS_FILE}")
+        if sset is not None:
+            print(f"  Shards:           {len(sset['done'])} "
+                  f"(~{args.shard_size_mb:g} MB, {SHARD_NAME.format(0)} ...)")
+        print(f"  Manifest:         {output_dir / 'manifest.json'} ({MANIFEST_FRAMES_FILE})")
+        if parent:
+            chain = manifest_chain(output_dir)
+            print(f"  Chain:            {' -> '.join(d.name for d in chain)} "
+                  f"({manifest['chain_total_frames']} frames)")
 
 
 if __name__ == "__main__":
@@ -7,8 +7,28 @@ Reads CSV outputs from benchmark.py and computes:
 - Threshold sweep with DET/ROC curves
 - HD histograms (genuine vs impostor)
 - Latency statistics
-- Per-subject accuracy heatmap
-- Optional comparison against a previous run
+- Per-request resource cost (CPU-seconds, memory growth, network bytes,
+  throughput per core) from joining profile.csv with request timestamps
+- Stacked per-service CPU/memory and per-phase top consumer when
+  profile.py ran with --stack (profile_services.csv)
+- NATS message/byte rates, pending backlog, slow consumers and messages
+  per request when profile.py ran with --nats (profile_nats*.csv)
+- PostgreSQL load per phase (DB time, WAL and inserts per request, wait
+  events, checkpoints), table growth and statements whose execution time
+  rises over the run when profile.py ran with --postgres
+  (profile_postgres*.csv)
+- Per-thread-group CPU, busiest single thread and run-queue delay of the
+  engine process when profile.py ran with --threads (profile_threads.csv)
+- The slowest requests with the resource picture around each, including
+  spike snapshots from profile.py --spike-capture (diagnostics/)
+- Per-subject accuracy heatmap (block-binned overview + zoomable tile
+  pyramid) and a worst-subject drill-down list
+- Optional comparison against a previous run, including latency
+  distribution tests (Mann–Whitney, KS, bootstrap quantile shifts) that
+  gate on statistically real P99 regressions
+
+Plots are rendered as independent jobs in a process pool; a plot whose
+inputs are unchanged since the last run is not re-rendered.
 
 Usage:
     python scripts/vnv/analyze.py --input reports/vnv/latest
@@ -16,8 +36,14 @@ Usage:
 """
 
 import argparse
+import hashlib
+import inspect
 import json
+import math
+import os
+import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import matplotlib
@@ -70,6 +96,30 @@ def load_run(run_dir: Path) -> dict:
     else:
         data["profile"] = None
 
+    services_path = run_dir / "profile_services.csv"
+    if services_path.exists():
+        data["profile_services"] = pd.read_csv(services_path)
+    else:
+        data["profile_services"] = None
+
+    for key, name in (("profile_nats", "profile_nats.csv"),
+                      ("profile_nats_conns", "profile_nats_conns.csv"),
+                      ("profile_nats_subjects", "profile_nats_subjects.csv")):
+        path = run_dir / name
+        data[key] = pd.read_csv(path) if path.exists() else None
+
+    for key, name in (("profile_postgres", "profile_postgres.csv"),
+                      ("profile_postgres_waits", "profile_postgres_waits.csv"),
+                      ("profile_postgres_statements", "profile_postgres_statements.csv")):
+        path = run_dir / name
+        data[key] = pd.read_csv(path) if path.exists() else None
+
+    threads_path = run_dir / "profile_threads.csv"
+    if threads_path.exists():
+        data["profile_threads"] = pd.read_csv(threads_path)
+    else:
+        data["profile_threads"] = None
+
     return data
 
 
@@ -244,23 +294,829 @@ def metrics_at_threshold(genuine_hd: np.ndarray, impostor_hd: np.ndarray,
     return {"threshold": threshold, "fmr": fmr, "fnmr": fnmr}
 
 
+# ---------------------------------------------------------------------------
+# Resource Attribution
+# ---------------------------------------------------------------------------
+# profile.py samples carry an "epoch" column and benchmark.py rows carry
+# start_ts/end_ts on the same wall clock, so container resources can be
+# charged to the requests that were in flight when they were consumed.
+
+PHASE_SOURCES = {"enroll": "enrollment", "genuine": "genuine", "impostor": "impostor"}
+
+
+def request_timeline(data: dict) -> pd.DataFrame | None:
+    """All benchmark requests with phase, start and end epoch seconds."""
+    frames = []
+    for phase, key in PHASE_SOURCES.items():
+        df = data[key]
+        if "start_ts" not in df.columns or "end_ts" not in df.columns:
+            return None
+        frames.append(pd.DataFrame({
+            "phase": phase,
+            "subject_id": df["subject_id"].to_numpy(),
+            "eye_side": df["eye_side"].to_numpy(),
+            "image_file": df["image_file"].to_numpy(),
+            "frame_id": df["frame_id"].astype(str).to_numpy() if "frame_id" in df.columns else "",
+            "start_ts": pd.to_numeric(df["start_ts"], errors="coerce").to_numpy(),
+            "end_ts": pd.to_numeric(df["end_ts"], errors="coerce").to_numpy(),
+        }))
+    requests = pd.concat(frames, ignore_index=True).dropna(subset=["start_ts", "end_ts"])
+    return requests if len(requests) > 0 else None
+
+
+def _inflight_integral(starts: np.ndarray, ends: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """∫ (number of requests in flight) dt from -inf to each time in `at`."""
+    times = np.concatenate([starts, ends])
+    steps = np.concatenate([np.ones(len(starts)), -np.ones(len(ends))])
+    order = np.argsort(times, kind="stable")
+    times, steps = times[order], steps[order]
+    inflight = np.cumsum(steps)                      # count after each event
+    area = np.concatenate([[0.0], np.cumsum(inflight[:-1] * np.diff(times))])
+    return np.interp(at, times, area, left=0.0, right=area[-1])
+
+
+def attribute_cpu_to_requests(profile: pd.DataFrame, requests: pd.DataFrame) -> np.ndarray:
+    """
+    CPU-seconds per request. Each profiler interval's CPU-seconds are shared
+    among the requests in flight during it, in proportion to their overlap;
+    CPU burned while nothing is in flight is left unattributed.
+    """
+    t = profile["epoch"].to_numpy()
+    cpu_sec = profile["cpu_percent"].to_numpy()[1:] / 100.0 * np.diff(t)
+
+    starts = requests["start_ts"].to_numpy()
+    ends = requests["end_ts"].to_numpy()
+    busy = np.diff(_inflight_integral(starts, ends, t))  # request-seconds per interval
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(busy > 0, cpu_sec / busy, 0.0)   # CPU-s per request-second
+    # F(t) = ∫ rate dt is piecewise linear; a request's share is F(end) - F(start).
+    cum = np.concatenate([[0.0], np.cumsum(rate * np.diff(t))])
+    return np.interp(ends, t, cum) - np.interp(starts, t, cum)
+
+
+def compute_resource_attribution(data: dict) -> tuple[dict, pd.DataFrame] | None:
+    """
+    Join profile.csv samples with the request timeline. Per phase: CPU-seconds
+    (total and per request), memory growth per request (slope of memory vs
+    completed requests), network bytes per request and throughput per core.
+    Returns (per-phase summary, per-request cost table) or None when the run
+    has no common clock.
+    """
+    profile = data["profile"]
+    if profile is None or "epoch" not in profile.columns:
+        return None
+    requests = request_timeline(data)
+    if requests is None:
+        return None
+
+    profile = profile.copy()
+    for col in ("epoch", "cpu_percent", "mem_usage_mb", "net_in_mb", "net_out_mb"):
+        if col in profile.columns:
+            profile[col] = pd.to_numeric(profile[col], errors="coerce")
+    profile = profile.dropna(subset=["epoch", "cpu_percent"]).sort_values("epoch")
+    if len(profile) < 2:
+        return None
+
+    requests = requests.sort_values("start_ts").reset_index(drop=True)
+    requests["cpu_sec"] = attribute_cpu_to_requests(profile, requests)
+    t = profile["epoch"].to_numpy()
+
+    phases = {}
+    for phase, reqs in requests.groupby("phase", sort=False):
+        t_start, t_end = float(reqs["start_ts"].min()), float(reqs["end_ts"].max())
+        duration = t_end - t_start
+        n = len(reqs)
+        cpu_total = float(reqs["cpu_sec"].sum())
+        in_window = (t >= t_start) & (t <= t_end)
+        coverage = float(min(t[-1], t_end) - max(t[0], t_start)) / duration if duration > 0 else 0.0
+
+        entry = {
+            "requests": int(n),
+            "start_epoch": t_start,
+            "end_epoch": t_end,
+            "duration_sec": duration,
+            "profile_coverage": max(0.0, min(1.0, coverage)),
+            "profile_samples": int(in_window.sum()),
+            "cpu_seconds": cpu_total,
+            "cpu_ms_per_request": cpu_total / n * 1000 if n else 0.0,
+            "cpu_ms_per_request_p99": float(reqs["cpu_sec"].quantile(0.99) * 1000),
+            "avg_cores_busy": cpu_total / duration if duration > 0 else 0.0,
+            "throughput_rps": n / duration if duration > 0 else 0.0,
+            "requests_per_core_second": n / cpu_total if cpu_total > 0 else 0.0,
+        }
+
+        if "mem_usage_mb" in profile.columns and in_window.sum() >= 2:
+            mem = profile["mem_usage_mb"].to_numpy()[in_window]
+            done = np.searchsorted(np.sort(reqs["end_ts"].to_numpy()), t[in_window], side="right")
+            entry["mem_growth_mb"] = float(mem[-1] - mem[0])
+            if np.ptp(done) > 0:
+                entry["mem_mb_per_request"] = float(np.polyfit(done, mem, 1)[0])
+
+        for col, key in (("net_in_mb", "net_in_bytes_per_request"),
+                         ("net_out_mb", "net_out_bytes_per_request")):
+            if col in profile.columns:
+                series = profile[col].to_numpy()
+                delta_mb = np.interp(t_end, t, series) - np.interp(t_start, t, series)
+                entry[key] = float(delta_mb * 1024 * 1024 / n) if n else 0.0
+
+        phases[phase] = entry
+
+    costs = requests[["phase", "subject_id", "eye_side", "image_file", "start_ts", "end_ts", "cpu_sec"]]
+    return phases, costs
+
+
+# ---------------------------------------------------------------------------
+# Stack Service Usage
+# ---------------------------------------------------------------------------
+# profile.py --stack writes profile_services.csv: one row per sample tick and
+# service, all services on the same tick clock.
+
+def compute_service_usage(services_df: pd.DataFrame | None, attribution: dict | None) -> dict | None:
+    """
+    Mean/peak CPU and memory per service over the run and, when benchmark
+    phase windows are known, mean CPU per service within each phase plus the
+    service using the most CPU (the likely bottleneck at that load).
+    """
+    if services_df is None or len(services_df) == 0:
+        return None
+    df = services_df.copy()
+    for col in ("epoch", "cpu_percent", "mem_usage_mb"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    grouped = df.groupby("service")
+    usage = {"services": {}, "phases": {}}
+    for service, g in grouped:
+        usage["services"][service] = {
+            "samples": int(len(g)),
+            "cpu_mean_percent": float(g["cpu_percent"].mean()),
+            "cpu_peak_percent": float(g["cpu_percent"].max()),
+            "mem_mean_mb": float(g["mem_usage_mb"].mean()),
+            "mem_peak_mb": float(g["mem_usage_mb"].max()),
+        }
+
+    for phase, a in (attribution or {}).items():
+        window = df[(df["epoch"] >= a["start_epoch"]) & (df["epoch"] <= a["end_epoch"])]
+        if len(window) == 0:
+            continue
+        cpu = window.groupby("service")["cpu_percent"].mean().sort_values(ascending=False)
+        usage["phases"][phase] = {
+            "cpu_mean_percent": {k: float(v) for k, v in cpu.items()},
+            "top_cpu_service": str(cpu.index[0]),
+        }
+    return usage
+
+
+# ---------------------------------------------------------------------------
+# NATS Message Bus
+# ---------------------------------------------------------------------------
+# profile.py --nats/--stack writes profile_nats.csv (server-wide rates),
+# profile_nats_conns.csv (per connection) and profile_nats_subjects.csv
+# (subscriptions per subject) on the shared tick clock.
+
+def compute_nats_usage(nats_df: pd.DataFrame | None, conns_df: pd.DataFrame | None,
+                       subjects_df: pd.DataFrame | None, attribution: dict | None) -> dict | None:
+    """
+    Message/byte rates, slow consumers and pending bytes over the run; per
+    benchmark phase the mean rates and NATS messages per request (how much
+    bus traffic one match fans out into); the connections with the largest
+    pending backlog; and the latest subscription count per subject.
+    """
+    if nats_df is None or len(nats_df) == 0:
+        return None
+    df = nats_df.apply(pd.to_numeric, errors="coerce")
+    slow = df["slow_consumers"].dropna()
+    usage = {
+        "samples": int(len(df)),
+        "in_msgs_per_sec_mean": float(df["in_msgs_per_sec"].mean()),
+        "in_msgs_per_sec_peak": float(df["in_msgs_per_sec"].max()),
+        "out_msgs_per_sec_mean": float(df["out_msgs_per_sec"].mean()),
+        "out_msgs_per_sec_peak": float(df["out_msgs_per_sec"].max()),
+        "in_mb_per_sec_peak": float(df["in_mb_per_sec"].max()),
+        "out_mb_per_sec_peak": float(df["out_mb_per_sec"].max()),
+        "pending_bytes_max": float(df["pending_bytes_max"].max()),
+        "slow_consumers_new": int(slow.iloc[-1] - slow.iloc[0]) if len(slow) else 0,
+        "server_cpu_peak_percent": float(df["cpu_percent"].max()),
+        "phases": {},
+        "connections": [],
+        "subjects": {},
+    }
+
+    for phase, a in (attribution or {}).items():
+        window = df[(df["epoch"] >= a["start_epoch"]) & (df["epoch"] <= a["end_epoch"])]
+        if len(window) == 0:
+            continue
+        in_rate = float(window["in_msgs_per_sec"].mean())
+        usage["phases"][phase] = {
+            "in_msgs_per_sec": in_rate,
+            "out_msgs_per_sec": float(window["out_msgs_per_sec"].mean()),
+            "pending_bytes_max": float(window["pending_bytes_max"].max()),
+            "msgs_per_request": in_rate * a["duration_sec"] / a["requests"] if a["requests"] else None,
+        }
+
+    if conns_df is not None and len(conns_df) > 0:
+        c = conns_df.assign(**{col: pd.to_numeric(conns_df[col], errors="coerce")
+                               for col in ("pending_bytes", "in_msgs_per_sec", "out_msgs_per_sec")})
+        c["name"] = c["name"].fillna("").astype(str)
+        per_conn = c.groupby(["cid", "name"]).agg(
+            pending_bytes_max=("pending_bytes", "max"),
+            in_msgs_per_sec_mean=("in_msgs_per_sec", "mean"),
+            out_msgs_per_sec_mean=("out_msgs_per_sec", "mean"),
+        ).sort_values("pending_bytes_max", ascending=False).head(10).reset_index()
+        usage["connections"] = [
+            {"cid": int(r.cid), "name": r.name, "pending_bytes_max": float(r.pending_bytes_max),
+             "in_msgs_per_sec_mean": float(r.in_msgs_per_sec_mean),
+             "out_msgs_per_sec_mean": float(r.out_msgs_per_sec_mean)}
+            for r in per_conn.itertuples()
+        ]
+
+    if subjects_df is not None and len(subjects_df) > 0:
+        last = subjects_df[subjects_df["epoch"] == subjects_df["epoch"].max()]
+        usage["subjects"] = {str(r.subject): int(r.subscriptions)
+                             for r in last.sort_values("subscriptions", ascending=False).itertuples()}
+    return usage
+
+
+# ---------------------------------------------------------------------------
+# PostgreSQL Load
+# ---------------------------------------------------------------------------
+# profile.py --postgres writes profile_postgres.csv (backends, WAL,
+# checkpoints, table sizes and inserts), profile_postgres_waits.csv (active
+# backends per wait event) and profile_postgres_statements.csv
+# (pg_stat_statements deltas) on the shared tick clock.
+
+PG_TABLES = ("templates", "match_log", "identities")
+PG_SLOWDOWN_RATIO = 1.5
+PG_TREND_MIN_CALLS = 20
+
+
+def _statement_trend(st: pd.DataFrame) -> tuple[float | None, float | None]:
+    """Mean execution time over the first and last quarter of a statement's active span."""
+    t0, t1 = st["epoch"].min(), st["epoch"].max()
+    quarter = (t1 - t0) / 4
+    if quarter <= 0:
+        return None, None
+    means = []
+    for part in (st[st["epoch"] <= t0 + quarter], st[st["epoch"] >= t1 - quarter]):
+        calls = part["calls"].sum()
+        means.append(float(part["exec_ms"].sum() / calls) if calls >= PG_TREND_MIN_CALLS else None)
+    return means[0], means[1]
+
+
+def compute_postgres_usage(pg_df: pd.DataFrame | None, waits_df: pd.DataFrame | None,
+                           statements_df: pd.DataFrame | None,
+                           attribution: dict | None) -> dict | None:
+    """
+    Database load behind the benchmark. Per phase: statement time, WAL and
+    inserts per request, waiting backends and checkpoints. Over the run:
+    growth of the engine tables (bytes per row), the share of active backends
+    per wait event, the statements by total time, and the statements whose
+    mean execution time grew by PG_SLOWDOWN_RATIO between the first and last
+    quarter of their activity -- persistence getting slower as tables grow.
+    """
+    if pg_df is None or len(pg_df) == 0:
+        return None
+    df = pg_df.apply(pd.to_numeric, errors="coerce").sort_values("epoch")
+    ckpt = df[["checkpoints_timed", "checkpoints_req"]].fillna(0)
+    usage = {
+        "samples": int(len(df)),
+        "waiting_mean": float(df["waiting"].mean()),
+        "lock_waits_peak": int(df["lock_waits"].max()),
+        "io_waits_peak": int(df["io_waits"].max()),
+        "longest_query_ms": float(df["longest_query_ms"].max()),
+        "commits_per_sec_mean": float(df["commits_per_sec"].mean()),
+        "wal_mb_per_sec_mean": float(df["wal_mb_per_sec"].mean()),
+        "wal_mb_per_sec_peak": float(df["wal_mb_per_sec"].max()),
+        "checkpoints_timed": int(ckpt["checkpoints_timed"].sum()),
+        "checkpoints_req": int(ckpt["checkpoints_req"].sum()),
+        "checkpoint_write_ms": float(df["checkpoint_write_ms"].sum()),
+        "tables": {},
+        "phases": {},
+        "wait_events": [],
+        "statements": [],
+        "slowing_statements": [],
+    }
+
+    for table in PG_TABLES:
+        cols = [f"{table}_mb", f"{table}_index_mb", f"{table}_rows"]
+        if not all(c in df.columns for c in cols):
+            continue
+        t = df[cols].dropna()
+        if len(t) == 0:
+            continue
+        first, last = t.iloc[0], t.iloc[-1]
+        rows_added = float(last[cols[2]] - first[cols[2]])
+        growth_mb = float(last[cols[0]] + last[cols[1]] - first[cols[0]] - first[cols[1]])
+        usage["tables"][table] = {
+            "mb": float(last[cols[0]]),
+            "index_mb": float(last[cols[1]]),
+            "rows": int(last[cols[2]]),
+            "rows_added": int(rows_added),
+            "growth_mb": growth_mb,
+            "bytes_per_row": growth_mb * 1024 * 1024 / rows_added if rows_added > 0 else None,
+        }
+
+    st = None
+    if statements_df is not None and len(statements_df) > 0:
+        st = statements_df.copy()
+        for col in ("epoch", "calls", "exec_ms", "rows", "shared_blks_written", "wal_kb"):
+            st[col] = pd.to_numeric(st[col], errors="coerce")
+
+    for phase, a in (attribution or {}).items():
+        in_window = (df["epoch"] >= a["start_epoch"]) & (df["epoch"] <= a["end_epoch"])
+        window = df[in_window]
+        if len(window) == 0 or not a["requests"]:
+            continue
+        n, duration = a["requests"], a["duration_sec"]
+        entry = {
+            "waiting_mean": float(window["waiting"].mean()),
+            "lock_waits_peak": int(window["lock_waits"].max()),
+            "wal_kb_per_request": float(window["wal_mb_per_sec"].mean() * duration * 1024 / n),
+            "checkpoints": int(ckpt[in_window].to_numpy().sum()),
+            "inserts_per_request": {
+                table: float(window[f"{table}_inserts_per_sec"].mean() * duration / n)
+                for table in PG_TABLES if f"{table}_inserts_per_sec" in window.columns
+            },
+        }
+        if st is not None:
+            s = st[(st["epoch"] >= a["start_epoch"]) & (st["epoch"] <= a["end_epoch"])]
+            entry["db_ms_per_request"] = float(s["exec_ms"].sum() / n)
+        if waits_df is not None and len(waits_df) > 0:
+            w = waits_df[(waits_df["epoch"] >= a["start_epoch"])
+                         & (waits_df["epoch"] <= a["end_epoch"])
+                         & (waits_df["wait_event_type"] != "CPU")]
+            if len(w) > 0:
+                top = w.groupby(["wait_event_type", "wait_event"])["backends"].sum().idxmax()
+                entry["top_wait_event"] = ":".join(top)
+        usage["phases"][phase] = entry
+
+    if waits_df is not None and len(waits_df) > 0:
+        per_event = waits_df.groupby(["wait_event_type", "wait_event"])["backends"].sum()
+        total = per_event.sum()
+        usage["wait_events"] = [
+            {"wait_event_type": str(t), "wait_event": str(e), "share": float(v / total)}
+            for (t, e), v in per_event.sort_values(ascending=False).head(10).items()
+        ]
+
+    if st is not None:
+        for queryid, g in st.groupby("queryid"):
+            calls = int(g["calls"].sum())
+            first, last = _statement_trend(g)
+            entry = {
+                "queryid": str(queryid),
+                "table": str(g["table"].iloc[0]),
+                "operation": str(g["operation"].iloc[0]),
+                "query": str(g["query"].iloc[-1]),
+                "calls": calls,
+                "exec_ms": float(g["exec_ms"].sum()),
+                "mean_exec_ms": float(g["exec_ms"].sum() / calls) if calls else 0.0,
+                "wal_kb_per_call": float(g["wal_kb"].sum() / calls) if calls else 0.0,
+                "first_quarter_mean_ms": first,
+                "last_quarter_mean_ms": last,
+            }
+            usage["statements"].append(entry)
+            if first and last and last / first >= PG_SLOWDOWN_RATIO:
+                usage["slowing_statements"].append(entry["queryid"])
+        usage["statements"].sort(key=lambda e: -e["exec_ms"])
+        usage["statements"] = usage["statements"][:15]
+    return usage
+
+
+# ---------------------------------------------------------------------------
+# Engine Thread Usage
+# ---------------------------------------------------------------------------
+# profile.py --threads writes profile_threads.csv: one row per sample tick and
+# thread group (threads of the engine process grouped by name).
+
+THREAD_SATURATION_PERCENT = 90.0
+THREAD_SATURATION_FRACTION = 0.5
+
+
+def compute_thread_usage(threads_df: pd.DataFrame | None, attribution: dict | None) -> dict | None:
+    """
+    Per thread group: mean/peak CPU, busiest single thread and run-queue
+    delay. A group is flagged saturated when one of its threads runs at
+    >= THREAD_SATURATION_PERCENT of a core for most samples -- a serial
+    bottleneck that adding cores or workers will not fix. With phase
+    windows, also the mean CPU of each group within each phase.
+    """
+    if threads_df is None or len(threads_df) == 0:
+        return None
+    df = threads_df.copy()
+    for col in ("epoch", "threads", "cpu_percent", "max_thread_cpu_percent",
+                "runqueue_delay_ms", "max_thread_runqueue_pct", "nonvoluntary_ctxsw"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    ticks = df.groupby("epoch")["epoch"].first().sort_values().to_numpy()
+    tick_sec = float(np.median(np.diff(ticks))) if len(ticks) > 1 else 1.0
+
+    usage = {"groups": {}, "phases": {}, "saturated_groups": []}
+    for group, g in df.groupby("group"):
+        saturated_fraction = float((g["max_thread_cpu_percent"] >= THREAD_SATURATION_PERCENT).mean())
+        usage["groups"][group] = {
+            "samples": int(len(g)),
+            "threads_max": int(g["threads"].max()),
+            "cpu_mean_percent": float(g["cpu_percent"].mean()),
+            "cpu_peak_percent": float(g["cpu_percent"].max()),
+            "max_thread_cpu_mean_percent": float(g["max_thread_cpu_percent"].mean()),
+            "max_thread_cpu_peak_percent": float(g["max_thread_cpu_percent"].max()),
+            "runqueue_delay_ms_per_sec": float(g["runqueue_delay_ms"].mean() / tick_sec),
+            "max_thread_runqueue_percent": float(g["max_thread_runqueue_pct"].max()),
+            "nonvoluntary_ctxsw_per_sec": float(g["nonvoluntary_ctxsw"].mean() / tick_sec),
+            "saturated_fraction": saturated_fraction,
+        }
+        if saturated_fraction >= THREAD_SATURATION_FRACTION:
+            usage["saturated_groups"].append(group)
+
+    for phase, a in (attribution or {}).items():
+        window = df[(df["epoch"] >= a["start_epoch"]) & (df["epoch"] <= a["end_epoch"])]
+        if len(window) == 0:
+            continue
+        cpu = window.groupby("group")["cpu_percent"].mean().sort_values(ascending=False)
+        busiest = window.groupby("group")["max_thread_cpu_percent"].mean()
+        usage["phases"][phase] = {
+            "cpu_mean_percent": {k: float(v) for k, v in cpu.items()},
+            "max_thread_cpu_mean_percent": {k: float(v) for k, v in busiest.items()},
+            "top_cpu_group": str(cpu.index[0]),
+        }
+    return usage
+
+
+# ---------------------------------------------------------------------------
+# Tail Latency Diagnostics
+# ---------------------------------------------------------------------------
+# The slowest requests, each joined with what the regular profiler timelines
+# show around it and, when profile.py --spike-capture ran alongside
+# benchmark.py --spike-threshold-ms, the diagnostic snapshot captured while
+# the request was in flight (diagnostics/<frame_id>.json).
+
+SLOWEST_REQUESTS = 20
+DIAGNOSTIC_MARGIN_SEC = 1.0
+
+
+def load_spike_index(run_dir: Path) -> dict:
+    """frame_id -> snapshot path from diagnostics/index.jsonl (empty if absent)."""
+    index_path = run_dir / "diagnostics" / "index.jsonl"
+    index = {}
+    if not index_path.exists():
+        return index
+    with open(index_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            index[str(entry["frame_id"])] = index_path.parent / entry["snapshot"]
+    return index
+
+
+def summarize_spike_snapshot(snapshot: dict) -> dict:
+    """Condense a profile.py spike snapshot to the few numbers worth reading."""
+    out = {}
+    peaks = {}
+    for sample in snapshot.get("burst") or snapshot.get("pre_samples") or []:
+        for service, st in sample.get("services", {}).items():
+            p = peaks.setdefault(service, {"cpu_peak_percent": 0.0, "cpu_pressure_peak_percent": 0.0})
+            p["cpu_peak_percent"] = max(p["cpu_peak_percent"], float(st.get("cpu_percent") or 0))
+            p["cpu_pressure_peak_percent"] = max(p["cpu_pressure_peak_percent"],
+                                                 float(st.get("cpu_pressure_pct") or 0))
+    if peaks:
+        top = max(peaks, key=lambda k: peaks[k]["cpu_peak_percent"])
+        out["burst_top_service"] = top
+        out["burst_top_cpu_percent"] = peaks[top]["cpu_peak_percent"]
+        out["burst_max_cpu_pressure_percent"] = max(p["cpu_pressure_peak_percent"] for p in peaks.values())
+    threads = snapshot.get("threads")
+    if threads:
+        out["thread_states"] = threads.get("states", {})
+        groups = threads.get("groups") or []
+        if groups:
+            busiest = max(groups, key=lambda g: g["max_thread_cpu_percent"])
+            out["busiest_thread_group"] = busiest["group"]
+            out["busiest_thread_cpu_percent"] = busiest["max_thread_cpu_percent"]
+    nats = snapshot.get("nats")
+    if nats:
+        out["nats_slow_consumers"] = nats.get("slow_consumers")
+        pending = [c.get("pending_bytes") or 0 for c in nats.get("top_pending", [])]
+        out["nats_max_pending_bytes"] = max(pending) if pending else 0
+    pg = snapshot.get("postgres")
+    if pg is not None:
+        out["pg_active_backends"] = len(pg)
+        waits = {}
+        for b in pg:
+            if b.get("wait_event_type"):
+                key = f"{b['wait_event_type']}:{b.get('wait_event')}"
+                waits[key] = waits.get(key, 0) + 1
+        out["pg_wait_events"] = waits
+        out["pg_longest_query_ms"] = max((b.get("running_ms") or 0 for b in pg), default=0.0)
+    return out
+
+
+def _window_peak(df: pd.DataFrame | None, key: str | None, column: str,
+                 lo: float, hi: float) -> tuple[str | None, float | None]:
+    """Largest value of column within [lo, hi] and the key (service/group) it belongs to."""
+    if df is None or column not in df.columns or "epoch" not in df.columns:
+        return None, None
+    epoch = pd.to_numeric(df["epoch"], errors="coerce").to_numpy()
+    mask = (epoch >= lo) & (epoch <= hi)
+    if not mask.any():
+        return None, None
+    values = pd.to_numeric(df[column], errors="coerce").to_numpy()[mask]
+    if np.isnan(values).all():
+        return None, None
+    i = int(np.nanargmax(values))
+    return (str(df[key].to_numpy()[mask][i]) if key else None), float(values[i])
+
+
+def slowest_requests(data: dict, spike_index: dict, limit: int = SLOWEST_REQUESTS) -> list[dict]:
+    """
+    The `limit` slowest requests across all phases with the resource picture
+    around each one (±DIAGNOSTIC_MARGIN_SEC): engine CPU, the busiest stack
+    service and engine thread group, plus the spike snapshot if one exists.
+    """
+    requests = request_timeline(data)
+    if requests is None:
+        return []
+    requests = requests.assign(latency_ms=(requests["end_ts"] - requests["start_ts"]) * 1000)
+    slow = requests.nlargest(limit, "latency_ms")
+    median_ms = {phase: float(g["latency_ms"].median()) for phase, g in requests.groupby("phase")}
+
+    rows = []
+    for r in slow.itertuples():
+        lo, hi = r.start_ts - DIAGNOSTIC_MARGIN_SEC, r.end_ts + DIAGNOSTIC_MARGIN_SEC
+        row = {
+            "phase": r.phase,
+            "frame_id": r.frame_id,
+            "subject_id": str(r.subject_id),
+            "eye_side": r.eye_side,
+            "latency_ms": float(r.latency_ms),
+            "x_phase_median": float(r.latency_ms / median_ms[r.phase]) if median_ms[r.phase] else None,
+            "start_ts": float(r.start_ts),
+        }
+        _, row["engine_cpu_peak_percent"] = _window_peak(data["profile"], None, "cpu_percent", lo, hi)
+        row["top_service"], row["top_service_cpu_percent"] = _window_peak(
+            data.get("profile_services"), "service", "cpu_percent", lo, hi)
+        row["busiest_thread_group"], row["busiest_thread_cpu_percent"] = _window_peak(
+            data.get("profile_threads"), "group", "max_thread_cpu_percent", lo, hi)
+        snapshot_path = spike_index.get(str(r.frame_id))
+        if snapshot_path is not None and snapshot_path.exists():
+            with open(snapshot_path) as f:
+                row["spike"] = summarize_spike_snapshot(json.load(f))
+            row["spike_snapshot"] = str(Path("diagnostics") / snapshot_path.name)
+        rows.append(row)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Plot Inputs
+# ---------------------------------------------------------------------------
+# Plots are rendered from compact, precomputed arrays (histogram counts,
+# decimated timelines, subject grids) rather than raw result rows, so each
+# plot job is cheap to ship to a worker process and cheap to hash.
+
+HD_HIST_BINS = np.linspace(0, 0.55, 110)
+LATENCY_HIST_BINS = 50
+TIMELINE_MAX_POINTS = 4000
+SUBJECT_HEATMAP_MAX_ROWS = 200
+SUBJECT_RASTER_SUBJECTS_PER_ROW = 128
+HEATMAP_TILE_SIZE = 256
+
+
+def prepare_histogram(values: np.ndarray, bins) -> dict:
+    """Bin values once and keep only the counts and summary stats needed to plot."""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return {"n": 0, "counts": np.array([]), "edges": np.array([]),
+                "mean": 0.0, "median": 0.0, "p99": 0.0}
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        "n": int(len(values)),
+        "counts": counts,
+        "edges": edges,
+        "mean": float(values.mean()),
+        "median": float(np.median(values)),
+        "p99": float(np.percentile(values, 99)),
+    }
+
+
+def downsample_series(x: np.ndarray, y: np.ndarray,
+                      max_points: int = TIMELINE_MAX_POINTS) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decimate a timeline to at most max_points, keeping the min and max of
+    every bucket so short spikes stay visible. y is one series or a 2-D
+    (series, samples) array; several series share one index (the union of
+    their bucket min/max samples), so they stay aligned on the returned x.
+    Buckets with no valid sample are dropped.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    rows = np.atleast_2d(y)
+    n = rows.shape[1]
+    if n <= max_points:
+        return x, y
+    n_buckets = max(1, max_points // (2 * len(rows)))
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    idx = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        keep = set()
+        for seg in rows[:, lo:hi]:
+            if np.isnan(seg).all():
+                continue
+            keep.update((lo + int(np.nanargmin(seg)), lo + int(np.nanargmax(seg))))
+        idx.extend(sorted(keep))
+    idx = np.asarray(idx, dtype=int)
+    return x[idx], y[..., idx]
+
+
+def aggregate_subject_accuracy(genuine_df: pd.DataFrame) -> pd.DataFrame | None:
+    """
+    Per (subject, eye, device) probe totals and failures, fully vectorized.
+    device_id is optional; runs without it are treated as one device.
+    """
+    valid = genuine_df[(genuine_df["error"].isna()) | (genuine_df["error"] == "")]
+    if len(valid) == 0:
+        return None
+
+    device = valid["device_id"] if "device_id" in valid.columns else "all"
+    df = pd.DataFrame({
+        "subject_id": valid["subject_id"].astype(str).to_numpy(),
+        "eye_side": valid["eye_side"].fillna("unknown").astype(str).to_numpy(),
+        "device_id": pd.Series(device, index=valid.index).fillna("unknown").astype(str).to_numpy(),
+        "correct": valid["correct"].astype(str).str.lower().eq("true").to_numpy(),
+    })
+    stats = df.groupby(["subject_id", "eye_side", "device_id"], sort=True).agg(
+        total=("correct", "size"),
+        correct=("correct", "sum"),
+    ).reset_index()
+    stats["failures"] = stats["total"] - stats["correct"]
+    stats["fnmr"] = stats["failures"] / stats["total"]
+    return stats
+
+
+def _subject_group_codes(stats: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, list[str], list[str]]:
+    """Integer codes for subjects (numeric order when IDs are numeric) and device/eye groups."""
+    subjects = pd.Series(stats["subject_id"].unique())
+    numeric = pd.to_numeric(subjects, errors="coerce")
+    subjects = subjects.iloc[np.argsort(numeric.to_numpy() if numeric.notna().all()
+                                        else subjects.to_numpy(), kind="stable")]
+    subj_codes = pd.Index(subjects).get_indexer(stats["subject_id"])
+    group_keys = stats["device_id"] + " / " + stats["eye_side"]
+    group_codes, groups = pd.factorize(group_keys, sort=True)
+    return subj_codes, group_codes, list(subjects), list(groups)
+
+
+def prepare_subject_blocks(stats: pd.DataFrame, max_rows: int = SUBJECT_HEATMAP_MAX_ROWS) -> dict:
+    """
+    Hierarchical binning for the overview heatmap: consecutive subjects are
+    pooled into blocks (rows) so the plot never exceeds max_rows rows, and
+    each device/eye pair is a column. Cell value = pooled FNMR of the block.
+    """
+    subj_codes, group_codes, subjects, groups = _subject_group_codes(stats)
+    n_subjects, n_groups = len(subjects), len(groups)
+    block_size = max(1, -(-n_subjects // max_rows))
+    n_blocks = -(-n_subjects // block_size)
+
+    flat = (subj_codes // block_size) * n_groups + group_codes
+    size = n_blocks * n_groups
+    failures = np.bincount(flat, weights=stats["failures"].to_numpy(), minlength=size)
+    totals = np.bincount(flat, weights=stats["total"].to_numpy(), minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grid = np.where(totals > 0, failures / totals, np.nan).reshape(n_blocks, n_groups)
+
+    starts = np.arange(n_blocks) * block_size
+    ends = np.minimum(starts + block_size, n_subjects) - 1
+    row_labels = [subjects[lo] if lo == hi else f"{subjects[lo]}–{subjects[hi]}"
+                  for lo, hi in zip(starts, ends)]
+    return {
+        "grid": grid,
+        "row_labels": row_labels,
+        "col_labels": groups,
+        "block_size": int(block_size),
+        "n_subjects": int(n_subjects),
+    }
+
+
+def prepare_subject_raster(stats: pd.DataFrame,
+                           subjects_per_row: int = SUBJECT_RASTER_SUBJECTS_PER_ROW) -> dict:
+    """
+    Full-resolution failure/total rasters for the tiled heatmap. Subjects are
+    laid out row-major, subjects_per_row per raster row; each subject takes
+    one pixel per device/eye group.
+    """
+    subj_codes, group_codes, subjects, groups = _subject_group_codes(stats)
+    n_groups = len(groups)
+    width = subjects_per_row * n_groups
+    height = -(-len(subjects) // subjects_per_row)
+
+    flat = (subj_codes // subjects_per_row) * width + (subj_codes % subjects_per_row) * n_groups + group_codes
+    size = height * width
+    failures = np.bincount(flat, weights=stats["failures"].to_numpy(), minlength=size)
+    totals = np.bincount(flat, weights=stats["total"].to_numpy(), minlength=size)
+    return {
+        "failures": failures.reshape(height, width).astype(np.float32),
+        "totals": totals.reshape(height, width).astype(np.float32),
+        "subjects_per_row": int(subjects_per_row),
+        "groups": groups,
+        "n_subjects": len(subjects),
+    }
+
+
+def worst_subjects(stats: pd.DataFrame, limit: int = 50) -> list[dict]:
+    """Subjects with the highest FNMR (ties broken by failure count) for drill-down."""
+    per_subject = stats.groupby("subject_id", sort=False).agg(
+        total=("total", "sum"),
+        failures=("failures", "sum"),
+    )
+    per_subject["fnmr"] = per_subject["failures"] / per_subject["total"]
+    worst = per_subject[per_subject["failures"] > 0].sort_values(
+        ["fnmr", "failures"], ascending=False).head(limit)
+
+    detail = stats[stats["subject_id"].isin(worst.index)]
+    rows = []
+    for subject_id, row in worst.iterrows():
+        groups = detail[detail["subject_id"] == subject_id]
+        rows.append({
+            "subject_id": subject_id,
+            "total": int(row["total"]),
+            "failures": int(row["failures"]),
+            "fnmr": float(row["fnmr"]),
+            "breakdown": [
+                {"device_id": g.device_id, "eye_side": g.eye_side,
+                 "total": int(g.total), "failures": int(g.failures)}
+                for g in groups.itertuples()
+            ],
+        })
+    return rows
+
+
+def prepare_stack(services_df: pd.DataFrame | None, column: str,
+                  max_points: int = TIMELINE_MAX_POINTS, key: str = "service",
+                  top: int | None = None) -> dict | None:
+    """
+    Pivot the long-format service timeline into one series per service (or
+    other key column) on the shared tick axis, bucket-averaged to at most
+    max_points ticks. With top, only the largest series are kept.
+    """
+    if services_df is None or len(services_df) == 0 or column not in services_df.columns:
+        return None
+    df = services_df.assign(
+        elapsed_sec=pd.to_numeric(services_df["elapsed_sec"], errors="coerce"),
+        value=pd.to_numeric(services_df[column], errors="coerce"),
+    )
+    wide = df.pivot_table(index="elapsed_sec", columns=key, values="value",
+                          aggfunc="mean").sort_index().fillna(0.0)
+    if len(wide) > max_points:
+        buckets = np.arange(len(wide)) * max_points // len(wide)
+        wide = wide.groupby(buckets).mean().set_index(
+            wide.index.to_series().groupby(buckets).mean())
+    order = wide.mean().sort_values(ascending=False).index[:top]
+    return {
+        "x": wide.index.to_numpy(dtype=float),
+        "services": [str(c) for c in order],
+        "values": wide[order].to_numpy(dtype=float).T,
+    }
+
+
+def prepare_timeline(profile_df: pd.DataFrame,
+                     column: str | list[str]) -> tuple[np.ndarray, np.ndarray] | None:
+    """
+    Extract a profile.csv column against elapsed seconds, decimated for
+    plotting. A list of columns gives a (columns, samples) y on one shared x.
+    """
+    columns = [column] if isinstance(column, str) else list(column)
+    if profile_df is None or len(profile_df) == 0 or not set(columns) <= set(profile_df.columns):
+        return None
+    if "elapsed_sec" in profile_df.columns:
+        x = pd.to_numeric(profile_df["elapsed_sec"], errors="coerce").to_numpy()
+    else:
+        x = np.arange(len(profile_df), dtype=float)
+    y = np.array([pd.to_numeric(profile_df[c], errors="coerce").to_numpy(dtype=float)
+                  for c in columns])
+    return downsample_series(x, y[0] if isinstance(column, str) else y)
+
+
 # ---------------------------------------------------------------------------
 # Plotting
 # ---------------------------------------------------------------------------
 
-def plot_hd_histogram(genuine_hd: np.ndarray, impostor_hd: np.ndarray,
+def _draw_hist(ax, hist: dict, density: bool, **kwargs):
+    """Draw a precomputed histogram as filled steps."""
+    counts = hist["counts"].astype(float)
+    if density:
+        counts = counts / (hist["n"] * np.diff(hist["edges"]))
+    ax.stairs(counts, hist["edges"], fill=True, **kwargs)
+
+
+def plot_hd_histogram(genuine: dict, impostor: dict,
                       operational_threshold: float, out_path: Path):
-    """Overlaid genuine vs impostor HD histograms."""
+    """Overlaid genuine vs impostor HD histograms (inputs from prepare_histogram)."""
     fig, ax = plt.subplots(figsize=(10, 6))
 
-    bins = np.linspace(0, 0.55, 110)
-
-    if len(genuine_hd) > 0:
-        ax.hist(genuine_hd, bins=bins, alpha=0.6, color="green",
-                label=f"Genuine (n={len(genuine_hd)}, μ={genuine_hd.mean():.4f})", density=True)
-    if len(impostor_hd) > 0:
-        ax.hist(impostor_hd, bins=bins, alpha=0.6, color="red",
-                label=f"Impostor (n={len(impostor_hd)}, μ={impostor_hd.mean():.4f})", density=True)
+    if genuine["n"] > 0:
+        _draw_hist(ax, genuine, density=True, alpha=0.6, color="green",
+                   label=f"Genuine (n={genuine['n']}, μ={genuine['mean']:.4f})")
+    if impostor["n"] > 0:
+        _draw_hist(ax, impostor, density=True, alpha=0.6, color="red",
+                   label=f"Impostor (n={impostor['n']}, μ={impostor['mean']:.4f})")
 
     ax.axvline(operational_threshold, color="black", linestyle="--", linewidth=1.5,
                label=f"Threshold = {operational_threshold}")
@@ -318,54 +1174,91 @@ def plot_roc_curve(thresholds: np.ndarray, fmr: np.ndarray, fnmr: np.ndarray,
     plt.close(fig)
 
 
-def plot_subject_accuracy_heatmap(genuine_df: pd.DataFrame, out_path: Path):
-    """Heatmap showing per-subject FNMR."""
-    valid = genuine_df[(genuine_df["error"].isna()) | (genuine_df["error"] == "")]
-    if len(valid) == 0:
-        return
-
-    subject_stats = valid.groupby("subject_id").agg(
-        total=("correct", "count"),
-        correct=("correct", "sum"),
-    ).reset_index()
-    subject_stats["fnmr"] = 1.0 - (subject_stats["correct"] / subject_stats["total"])
-    subject_stats = subject_stats.sort_values("subject_id")
-
-    # Reshape into a grid
-    n_subjects = len(subject_stats)
-    cols = 40
-    rows = (n_subjects + cols - 1) // cols
-
-    grid = np.full((rows, cols), np.nan)
-    labels = np.full((rows, cols), "", dtype=object)
-    for i, (_, row) in enumerate(subject_stats.iterrows()):
-        r, c = divmod(i, cols)
-        grid[r, c] = row["fnmr"]
-        labels[r, c] = row["subject_id"]
-
-    fig, ax = plt.subplots(figsize=(20, max(4, rows * 0.5)))
+def plot_subject_accuracy_heatmap(grid: np.ndarray, row_labels: list, col_labels: list,
+                                  block_size: int, n_subjects: int, out_path: Path):
+    """Overview heatmap of pooled FNMR per subject block × device/eye (from prepare_subject_blocks)."""
+    rows, cols = grid.shape
+    fig, ax = plt.subplots(figsize=(max(6, 2 + cols * 1.2), min(16, max(4, rows * 0.06 + 2))))
     cmap = plt.cm.RdYlGn_r
-    im = ax.imshow(grid, cmap=cmap, vmin=0, vmax=1, aspect="auto")
-
-    ax.set_title("Per-Subject False Non-Match Rate (FNMR)\n(0=perfect, 1=all failed)")
-    ax.set_xticks([])
-    ax.set_yticks([])
+    im = ax.imshow(grid, cmap=cmap, vmin=0, vmax=1, aspect="auto", interpolation="nearest")
+
+    unit = "subject" if block_size == 1 else f"block of {block_size} subjects"
+    ax.set_title(f"Per-Subject False Non-Match Rate (FNMR), {n_subjects} subjects\n"
+                 f"(row = {unit}; 0=perfect, 1=all failed)")
+    ax.set_xticks(range(cols))
+    ax.set_xticklabels(col_labels, rotation=30, ha="right", fontsize=8)
+    step = max(1, rows // 40)
+    ax.set_yticks(range(0, rows, step))
+    ax.set_yticklabels(row_labels[::step], fontsize=7)
     plt.colorbar(im, ax=ax, label="FNMR", shrink=0.6)
     fig.tight_layout()
     fig.savefig(out_path, dpi=150)
     plt.close(fig)
 
 
-def plot_latency_histogram(latencies: np.ndarray, title: str, out_path: Path):
-    """Histogram of latency values."""
-    if len(latencies) == 0:
+def render_heatmap_tiles(failures: np.ndarray, totals: np.ndarray, subjects_per_row: int,
+                         groups: list, n_subjects: int, out_path: Path,
+                         tile_size: int = HEATMAP_TILE_SIZE):
+    """
+    Write the per-subject FNMR raster as a zoom pyramid of PNG tiles laid out
+    {z}/{x}/{y}.png next to out_path (z=0 is a single overview tile, the
+    highest z is one pixel per subject × group). Coarser levels pool 2×2
+    cells by summing failures and totals. out_path is the tile manifest.
+    """
+    tiles_dir = out_path.parent / out_path.stem
+    if tiles_dir.exists():
+        shutil.rmtree(tiles_dir)
+    cmap = plt.cm.RdYlGn_r
+
+    height, width = failures.shape
+    max_zoom = max(0, math.ceil(math.log2(max(height, width) / tile_size)))
+    levels = []
+    f, t = failures, totals
+    for z in range(max_zoom, -1, -1):
+        h, w = f.shape
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fnmr = np.where(t > 0, f / t, np.nan)
+        tiles_x, tiles_y = -(-w // tile_size), -(-h // tile_size)
+        for x in range(tiles_x):
+            (tiles_dir / str(z) / str(x)).mkdir(parents=True, exist_ok=True)
+            for y in range(tiles_y):
+                tile = np.full((tile_size, tile_size), np.nan)
+                part = fnmr[y * tile_size:(y + 1) * tile_size, x * tile_size:(x + 1) * tile_size]
+                tile[:part.shape[0], :part.shape[1]] = part
+                plt.imsave(tiles_dir / str(z) / str(x) / f"{y}.png", tile,
+                           cmap=cmap, vmin=0, vmax=1)
+        levels.append({"z": z, "width": w, "height": h, "tiles_x": tiles_x, "tiles_y": tiles_y})
+
+        # 2×2 pooling for the next (coarser) level
+        ph, pw = h + (h % 2), w + (w % 2)
+        f = np.pad(f, ((0, ph - h), (0, pw - w))).reshape(ph // 2, 2, pw // 2, 2).sum(axis=(1, 3))
+        t = np.pad(t, ((0, ph - h), (0, pw - w))).reshape(ph // 2, 2, pw // 2, 2).sum(axis=(1, 3))
+
+    manifest = {
+        "tile_size": tile_size,
+        "max_zoom": max_zoom,
+        "tiles": f"{tiles_dir.name}/{{z}}/{{x}}/{{y}}.png",
+        "subjects_per_row": subjects_per_row,
+        "groups": groups,
+        "n_subjects": n_subjects,
+        "subject_index": "subject_accuracy.csv",
+        "levels": sorted(levels, key=lambda l: l["z"]),
+    }
+    with open(out_path, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+
+
+def plot_latency_histogram(hist: dict, title: str, out_path: Path):
+    """Histogram of latency values (input from prepare_histogram)."""
+    if hist["n"] == 0:
         return
     fig, ax = plt.subplots(figsize=(10, 5))
-    ax.hist(latencies, bins=50, color="steelblue", alpha=0.7, edgecolor="white")
-    ax.axvline(np.median(latencies), color="orange", linestyle="--",
-               label=f"Median: {np.median(latencies):.0f} ms")
-    ax.axvline(np.percentile(latencies, 99), color="red", linestyle="--",
-               label=f"P99: {np.percentile(latencies, 99):.0f} ms")
+    _draw_hist(ax, hist, density=False, color="steelblue", alpha=0.7,
+               edgecolor="white")
+    ax.axvline(hist["median"], color="orange", linestyle="--",
+               label=f"Median: {hist['median']:.0f} ms")
+    ax.axvline(hist["p99"], color="red", linestyle="--",
+               label=f"P99: {hist['p99']:.0f} ms")
     ax.set_xlabel("Latency (ms)")
     ax.set_ylabel("Count")
     ax.set_title(title)
@@ -376,39 +1269,384 @@ def plot_latency_histogram(latencies: np.ndarray, title: str, out_path: Path):
     plt.close(fig)
 
 
-def plot_profile_timelines(profile_df: pd.DataFrame, plots_dir: Path):
-    """Plot CPU and memory timelines from profile.csv."""
-    if profile_df is None or len(profile_df) == 0:
-        return
+def plot_timeline(x: np.ndarray, y: np.ndarray, ylabel: str, title: str,
+                  style: str, out_path: Path, phases: list | None = None):
+    """
+    Single-series resource timeline (CPU, memory, ...) from profile.csv.
+    phases: optional [(label, start_sec, end_sec)] shaded behind the series.
+    """
+    fig, ax = plt.subplots(figsize=(12, 4))
+    for (label, lo, hi), color in zip(phases or [], plt.cm.Pastel1.colors):
+        ax.axvspan(lo, hi, color=color, alpha=0.5, label=label)
+    ax.plot(x, y, style, linewidth=0.8)
+    if phases:
+        ax.legend(loc="upper left", fontsize=8)
+    ax.set_xlabel("Time (seconds)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
+
+
+def plot_stacked_timeline(x: np.ndarray, services: list, values: np.ndarray, ylabel: str,
+                          title: str, out_path: Path, phases: list | None = None):
+    """Stacked per-service timeline from prepare_stack (largest consumer at the bottom)."""
+    fig, ax = plt.subplots(figsize=(12, 5))
+    for (label, lo, hi) in phases or []:
+        ax.axvline(lo, color="gray", linestyle=":", linewidth=0.8)
+        ax.text(lo, 1.0, f" {label}", transform=ax.get_xaxis_transform(),
+                fontsize=8, va="top", color="gray")
+    colors = plt.cm.tab10.colors
+    ax.stackplot(x, values, labels=services, colors=[colors[i % 10] for i in range(len(services))],
+                 alpha=0.85, linewidth=0)
+    ax.set_xlabel("Time (seconds)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.legend(loc="upper center", bbox_to_anchor=(0.5, -0.12), fontsize=8,
+              ncol=min(6, len(services)), frameon=False)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
+
+
+def plot_nats_timeline(x: np.ndarray, in_rate: np.ndarray, out_rate: np.ndarray,
+                       pending: np.ndarray, out_path: Path, phases: list | None = None):
+    """NATS message rates (top) and the largest per-connection pending backlog (bottom)."""
+    fig, (ax, ax2) = plt.subplots(2, 1, figsize=(12, 6), sharex=True,
+                                  gridspec_kw={"height_ratios": [3, 2]})
+    for a in (ax, ax2):
+        for (label, lo, hi) in phases or []:
+            a.axvline(lo, color="gray", linestyle=":", linewidth=0.8)
+        a.grid(True, alpha=0.3)
+    for (label, lo, hi) in phases or []:
+        ax.text(lo, 1.0, f" {label}", transform=ax.get_xaxis_transform(),
+                fontsize=8, va="top", color="gray")
+    ax.plot(x, in_rate, "b-", linewidth=0.8, label="in (published)")
+    ax.plot(x, out_rate, "g-", linewidth=0.8, label="out (delivered)")
+    ax.set_ylabel("Messages / s")
+    ax.set_title("NATS Message Bus")
+    ax.legend(loc="upper right", fontsize=8)
+    ax2.plot(x, pending / 1024, "r-", linewidth=0.8)
+    ax2.set_ylabel("Max pending (KiB)")
+    ax2.set_xlabel("Time (seconds)")
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
+
+
+def plot_postgres_timeline(x: np.ndarray, inserts: dict, wal: np.ndarray, waits: dict,
+                           checkpoints: np.ndarray, out_path: Path, phases: list | None = None):
+    """
+    PostgreSQL load: row inserts per table (top), WAL volume with checkpoint
+    markers (middle) and backends waiting on locks / LWLocks / IO (bottom).
+    """
+    fig, (ax, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 8), sharex=True,
+                                       gridspec_kw={"height_ratios": [3, 2, 2]})
+    for a in (ax, ax2, ax3):
+        for (label, lo, hi) in phases or []:
+            a.axvline(lo, color="gray", linestyle=":", linewidth=0.8)
+        a.grid(True, alpha=0.3)
+    for (label, lo, hi) in phases or []:
+        ax.text(lo, 1.0, f" {label}", transform=ax.get_xaxis_transform(),
+                fontsize=8, va="top", color="gray")
+    for table, y in inserts.items():
+        ax.plot(x, y, linewidth=0.8, label=table)
+    ax.set_ylabel("Inserts / s")
+    ax.set_title("PostgreSQL Load")
+    ax.legend(loc="upper right", fontsize=8)
+    ax2.plot(x, wal, "m-", linewidth=0.8)
+    for i, cx in enumerate(checkpoints):
+        ax2.axvline(cx, color="red", linewidth=0.8, alpha=0.6, label="checkpoint" if i == 0 else None)
+    if len(checkpoints):
+        ax2.legend(loc="upper right", fontsize=8)
+    ax2.set_ylabel("WAL MB / s")
+    ax3.stackplot(x, list(waits.values()), labels=list(waits), alpha=0.85, linewidth=0)
+    ax3.set_ylabel("Waiting backends")
+    ax3.set_xlabel("Time (seconds)")
+    ax3.legend(loc="upper right", fontsize=8)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
 
-    if "timestamp" in profile_df.columns:
-        x = range(len(profile_df))
+
+def plot_thread_timeline(x: np.ndarray, services: list, values: np.ndarray,
+                         max_thread: np.ndarray, title: str, out_path: Path,
+                         phases: list | None = None):
+    """
+    Engine thread groups: stacked group CPU on top, busiest single thread
+    per group below against the one-core line (a thread pinned at 100% is a
+    serialization point).
+    """
+    fig, (ax, ax2) = plt.subplots(2, 1, figsize=(12, 7), sharex=True,
+                                  gridspec_kw={"height_ratios": [3, 2]})
+    colors = [plt.cm.tab10.colors[i % 10] for i in range(len(services))]
+    for a in (ax, ax2):
+        for (label, lo, hi) in phases or []:
+            a.axvline(lo, color="gray", linestyle=":", linewidth=0.8)
+        a.grid(True, alpha=0.3)
+    for (label, lo, hi) in phases or []:
+        ax.text(lo, 1.0, f" {label}", transform=ax.get_xaxis_transform(),
+                fontsize=8, va="top", color="gray")
+    ax.stackplot(x, values, labels=services, colors=colors, alpha=0.85, linewidth=0)
+    ax.set_ylabel("CPU % (100 = 1 core)")
+    ax.set_title(title)
+    for i, label in enumerate(services):
+        ax2.plot(x, max_thread[i], color=colors[i], linewidth=1)
+    ax2.axhline(100, color="red", linestyle="--", linewidth=0.8)
+    ax2.set_ylabel("Busiest thread CPU %")
+    ax2.set_xlabel("Time (seconds)")
+    ax2.legend(*ax.get_legend_handles_labels(), loc="upper center", bbox_to_anchor=(0.5, -0.25),
+               fontsize=8, ncol=min(6, len(services)), frameon=False)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
+
+
+# ---------------------------------------------------------------------------
+# Plot Jobs
+# ---------------------------------------------------------------------------
+# Each plot is a job: {"name", "func", "inputs", "out"}. Jobs are independent,
+# so they render in parallel worker processes. A job is skipped when the hash
+# of its code (the plot function and the module-level helpers and constants
+# it uses), inputs and output file matches the one recorded in
+# plots/.plot_cache.json and its output file still exists. A job that fails
+# is reported and left out of the cache, so the next run retries it.
+
+PLOT_CACHE_FILE = ".plot_cache.json"
+
+
+def _code_fingerprint(func, h, seen: set) -> None:
+    """Hash func's source plus the module-level functions/constants it names, recursively."""
+    if func in seen:
+        return
+    seen.add(func)
+    try:
+        h.update(inspect.getsource(func).encode())
+    except (OSError, TypeError):
+        h.update(func.__qualname__.encode())
+    module_globals = getattr(func, "__globals__", {})
+    codes = [func.__code__]
+    while codes:
+        code = codes.pop()
+        codes.extend(c for c in code.co_consts if inspect.iscode(c))  # nested defs/lambdas
+        for name in code.co_names:
+            value = module_globals.get(name)
+            if inspect.isfunction(value) and value.__module__ == func.__module__:
+                _code_fingerprint(value, h, seen)
+            elif isinstance(value, (int, float, str, tuple, list, dict)) and name.isupper():
+                h.update(name.encode())
+                _hash_update(h, value)
+
+
+def _hash_update(h, obj):
+    """Feed a plot input (arrays, dicts, scalars) into a hash deterministically."""
+    if isinstance(obj, np.ndarray):
+        h.update(f"nd{obj.dtype.str}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj):
+            h.update(str(k).encode())
+            _hash_update(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for v in obj:
+            _hash_update(h, v)
+        h.update(b"]")
     else:
-        x = range(len(profile_df))
-
-    # CPU timeline
-    if "cpu_percent" in profile_df.columns:
-        fig, ax = plt.subplots(figsize=(12, 4))
-        ax.plot(x, profile_df["cpu_percent"], "b-", linewidth=0.8)
-        ax.set_xlabel("Time (seconds)")
-        ax.set_ylabel("CPU %")
-        ax.set_title("iris-engine2 Container CPU Usage During Benchmark")
-        ax.grid(True, alpha=0.3)
-        fig.tight_layout()
-        fig.savefig(plots_dir / "cpu_timeline.png", dpi=150)
-        plt.close(fig)
-
-    # Memory timeline
-    if "mem_usage_mb" in profile_df.columns:
-        fig, ax = plt.subplots(figsize=(12, 4))
-        ax.plot(x, profile_df["mem_usage_mb"], "r-", linewidth=0.8)
-        ax.set_xlabel("Time (seconds)")
-        ax.set_ylabel("Memory (MB)")
-        ax.set_title("iris-engine2 Container Memory Usage During Benchmark")
-        ax.grid(True, alpha=0.3)
-        fig.tight_layout()
-        fig.savefig(plots_dir / "memory_timeline.png", dpi=150)
-        plt.close(fig)
+        h.update(repr(obj).encode())
+
+
+def plot_job_hash(job: dict) -> str:
+    """Hash of everything that determines a plot's pixels."""
+    h = hashlib.sha256()
+    h.update(job["func"].__name__.encode())
+    _code_fingerprint(job["func"], h, set())
+    h.update(matplotlib.__version__.encode())
+    h.update(job["out"].name.encode())
+    _hash_update(h, job["inputs"])
+    return h.hexdigest()
+
+
+def _render_job(job: dict) -> str:
+    job["func"](**job["inputs"], out_path=job["out"])
+    return job["name"]
+
+
+def run_plot_jobs(jobs: list[dict], plots_dir: Path, workers: int = 0,
+                  force: bool = False) -> dict:
+    """
+    Render plot jobs, skipping unchanged ones. workers=0 uses one process per
+    CPU (capped at the number of jobs); workers=1 renders inline. Either way
+    a failing job only warns and is not cached.
+    Returns {"rendered": [...], "skipped": [...]}.
+    """
+    cache_path = plots_dir / PLOT_CACHE_FILE
+    cache = {}
+    if cache_path.exists() and not force:
+        try:
+            with open(cache_path) as f:
+                cache = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            cache = {}
+
+    todo, skipped = [], []
+    hashes = {}
+    for job in jobs:
+        digest = plot_job_hash(job)
+        hashes[job["name"]] = digest
+        if cache.get(job["name"]) == digest and job["out"].exists():
+            skipped.append(job["name"])
+        else:
+            todo.append(job)
+
+    rendered = []
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(todo)))
+
+    if workers == 1:
+        for job in todo:
+            try:
+                rendered.append(_render_job(job))
+            except Exception as e:
+                print(f"  WARNING: plot {job['name']} failed: {e}", file=sys.stderr)
+    elif todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_render_job, job): job["name"] for job in todo}
+            for fut in as_completed(futures):
+                try:
+                    rendered.append(fut.result())
+                except Exception as e:
+                    print(f"  WARNING: plot {futures[fut]} failed: {e}", file=sys.stderr)
+
+    new_cache = {name: hashes[name] for name in skipped + rendered}
+    with open(cache_path, "w") as f:
+        json.dump(new_cache, f, indent=2)
+
+    return {"rendered": rendered, "skipped": skipped}
+
+
+def phase_spans(df: pd.DataFrame | None, attribution: dict | None) -> list[tuple] | None:
+    """
+    Benchmark phases as (phase, start, end) on a profile table's elapsed-seconds
+    axis, using the table's median epoch - elapsed_sec offset.
+    """
+    if not attribution or df is None or not {"epoch", "elapsed_sec"} <= set(df.columns):
+        return None
+    offset = float((pd.to_numeric(df["epoch"], errors="coerce")
+                    - pd.to_numeric(df["elapsed_sec"], errors="coerce")).median())
+    return [(phase, a["start_epoch"] - offset, a["end_epoch"] - offset)
+            for phase, a in attribution.items()]
+
+
+def build_plot_jobs(data: dict, genuine_valid: pd.DataFrame, genuine_hd: np.ndarray,
+                    impostor_hd: np.ndarray, sweep: dict, operational_threshold: float,
+                    subject_stats: pd.DataFrame | None, attribution: dict | None,
+                    plots_dir: Path, plot_format: str = "png") -> list[dict]:
+    """Precompute compact plot inputs and describe every plot as a job."""
+    jobs = []
+
+    def add(name, func, out_name=None, **inputs):
+        jobs.append({"name": name, "func": func, "inputs": inputs,
+                     "out": plots_dir / (out_name or f"{name}.{plot_format}")})
+
+    add("hd_histogram", plot_hd_histogram,
+        genuine=prepare_histogram(genuine_hd, HD_HIST_BINS),
+        impostor=prepare_histogram(impostor_hd, HD_HIST_BINS),
+        operational_threshold=operational_threshold)
+
+    if len(genuine_hd) > 0 and len(impostor_hd) > 0:
+        add("det_curve", plot_det_curve, thresholds=sweep["thresholds"],
+            fmr=sweep["fmr"], fnmr=sweep["fnmr"], eer=sweep["eer"])
+        add("roc_curve", plot_roc_curve, thresholds=sweep["thresholds"],
+            fmr=sweep["fmr"], fnmr=sweep["fnmr"])
+
+    if subject_stats is not None:
+        add("subject_accuracy_heatmap", plot_subject_accuracy_heatmap,
+            **prepare_subject_blocks(subject_stats))
+        add("subject_heatmap_tiles", render_heatmap_tiles, out_name="subject_heatmap_tiles.json",
+            **prepare_subject_raster(subject_stats))
+
+    enroll_latencies = pd.to_numeric(data["enrollment"]["latency_ms"], errors="coerce").dropna().values
+    verify_latencies = pd.to_numeric(genuine_valid["client_latency_ms"], errors="coerce").dropna().values
+    if len(enroll_latencies) > 0:
+        add("enrollment_latency", plot_latency_histogram,
+            hist=prepare_histogram(enroll_latencies, LATENCY_HIST_BINS),
+            title="Enrollment Latency Distribution")
+    if len(verify_latencies) > 0:
+        add("verification_latency", plot_latency_histogram,
+            hist=prepare_histogram(verify_latencies, LATENCY_HIST_BINS),
+            title="Verification Latency Distribution")
+
+    cpu = prepare_timeline(data["profile"], "cpu_percent")
+    if cpu is not None:
+        add("cpu_timeline", plot_timeline, x=cpu[0], y=cpu[1], ylabel="CPU %",
+            title="iris-engine2 Container CPU Usage During Benchmark", style="b-",
+            phases=phase_spans(data["profile"], attribution))
+    mem = prepare_timeline(data["profile"], "mem_usage_mb")
+    if mem is not None:
+        add("memory_timeline", plot_timeline, x=mem[0], y=mem[1], ylabel="Memory (MB)",
+            title="iris-engine2 Container Memory Usage During Benchmark", style="r-",
+            phases=phase_spans(data["profile"], attribution))
+
+    # Stack-wide per-service timelines (profile.py --stack)
+    services_df = data.get("profile_services")
+    stack_spans = phase_spans(services_df, attribution)
+    stack_cpu = prepare_stack(services_df, "cpu_percent")
+    if stack_cpu is not None:
+        add("stack_cpu_timeline", plot_stacked_timeline, **stack_cpu, ylabel="CPU % (100 = 1 core)",
+            title="Per-Service CPU Usage (stacked)", phases=stack_spans)
+    stack_mem = prepare_stack(services_df, "mem_usage_mb")
+    if stack_mem is not None:
+        add("stack_memory_timeline", plot_stacked_timeline, **stack_mem, ylabel="Memory (MB)",
+            title="Per-Service Memory Usage (stacked)", phases=stack_spans)
+
+    # NATS message bus (profile.py --nats)
+    nats_df = data.get("profile_nats")
+    if nats_df is not None and len(nats_df) > 0:
+        series = prepare_timeline(nats_df, ["in_msgs_per_sec", "out_msgs_per_sec", "pending_bytes_max"])
+        if series is not None:
+            x, (in_rate, out_rate, pending) = series
+            add("nats_timeline", plot_nats_timeline, x=x, in_rate=in_rate,
+                out_rate=out_rate, pending=pending, phases=phase_spans(nats_df, attribution))
+
+    # PostgreSQL load (profile.py --postgres)
+    pg_df = data.get("profile_postgres")
+    if pg_df is not None and len(pg_df) > 0:
+        columns = ([f"{t}_inserts_per_sec" for t in ("templates", "match_log")]
+                   + ["wal_mb_per_sec", "lock_waits", "lwlock_waits", "io_waits"])
+        timeline = prepare_timeline(pg_df, columns)
+        if timeline is not None:
+            x, values = timeline
+            series = dict(zip(columns, values))
+            elapsed = pd.to_numeric(pg_df["elapsed_sec"], errors="coerce")
+            ckpt = (pd.to_numeric(pg_df["checkpoints_timed"], errors="coerce").fillna(0)
+                    + pd.to_numeric(pg_df["checkpoints_req"], errors="coerce").fillna(0))
+            add("postgres_timeline", plot_postgres_timeline, x=x,
+                inserts={t: series[f"{t}_inserts_per_sec"] for t in ("templates", "match_log")},
+                wal=series["wal_mb_per_sec"],
+                waits={label: series[col] for label, col in (("Lock", "lock_waits"),
+                                                             ("LWLock", "lwlock_waits"),
+                                                             ("IO", "io_waits"))},
+                checkpoints=elapsed[ckpt > 0].to_numpy(dtype=float),
+                phases=phase_spans(pg_df, attribution))
+
+    # Engine thread groups (profile.py --threads)
+    threads_df = data.get("profile_threads")
+    thread_cpu = prepare_stack(threads_df, "cpu_percent", key="group", top=8)
+    if thread_cpu is not None:
+        busiest = prepare_stack(threads_df, "max_thread_cpu_percent", key="group")
+        rows = [busiest["services"].index(g) for g in thread_cpu["services"]]
+        add("thread_cpu_timeline", plot_thread_timeline, **thread_cpu,
+            max_thread=busiest["values"][rows], title="iris-engine2 CPU by Thread Group",
+            phases=phase_spans(threads_df, attribution))
+
+    return jobs
 
 
 # ---------------------------------------------------------------------------
@@ -457,6 +1695,215 @@ def compare_runs(current: dict, previous: dict) -> list[dict]:
     return deltas
 
 
+# ---------------------------------------------------------------------------
+# Latency Distribution Comparison
+# ---------------------------------------------------------------------------
+# Point deltas of P99 between two runs are dominated by run-to-run noise.
+# Here the full latency distributions are compared: a rank test and a KS test
+# for an overall shift, plus bootstrap confidence bands on the shift of each
+# quantile. The tail verdict is driven by the P99 band, so a regression is
+# only reported when the whole confidence interval sits above the tolerance.
+
+LATENCY_QUANTILES = np.array([0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95, 0.99])
+BOOTSTRAP_ITERATIONS = 500
+BOOTSTRAP_MAX_SAMPLES = 200_000
+
+
+def _normal_sf(z: float) -> float:
+    """Upper-tail probability of the standard normal distribution."""
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def mann_whitney_u(current: np.ndarray, previous: np.ndarray) -> dict:
+    """
+    Mann–Whitney U test (normal approximation with tie correction).
+    Returns the one-sided p-value for "current is stochastically greater than
+    previous" and the probability of superiority P(current > previous).
+    """
+    n1, n2 = len(current), len(previous)
+    if n1 == 0 or n2 == 0:
+        return {"u": 0.0, "p_greater": 1.0, "prob_superiority": 0.5}
+
+    combined = np.concatenate([current, previous])
+    ranks = pd.Series(combined).rank(method="average").to_numpy()
+    u1 = float(ranks[:n1].sum() - n1 * (n1 + 1) / 2.0)
+
+    n = n1 + n2
+    _, tie_counts = np.unique(combined, return_counts=True)
+    tie_term = float(((tie_counts ** 3) - tie_counts).sum()) / (n * (n - 1)) if n > 1 else 0.0
+    sigma = math.sqrt(n1 * n2 / 12.0 * ((n + 1) - tie_term))
+    mu = n1 * n2 / 2.0
+    if sigma == 0:
+        p_greater = 1.0
+    else:
+        p_greater = _normal_sf((u1 - mu - 0.5) / sigma)
+
+    return {
+        "u": u1,
+        "p_greater": float(p_greater),
+        "prob_superiority": u1 / (n1 * n2),
+    }
+
+
+def ks_two_sample(current: np.ndarray, previous: np.ndarray) -> dict:
+    """Two-sample Kolmogorov–Smirnov test with the asymptotic p-value."""
+    n1, n2 = len(current), len(previous)
+    if n1 == 0 or n2 == 0:
+        return {"d": 0.0, "p_value": 1.0}
+
+    a = np.sort(current)
+    b = np.sort(previous)
+    grid = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, grid, side="right") / n1
+    cdf_b = np.searchsorted(b, grid, side="right") / n2
+    d = float(np.max(np.abs(cdf_a - cdf_b)))
+
+    en = math.sqrt(n1 * n2 / (n1 + n2))
+    lam = (en + 0.12 + 0.11 / en) * d
+    if lam < 0.2:
+        # The alternating series does not converge here; Q_KS(λ) ≈ 1.
+        return {"d": d, "p_value": 1.0}
+    j = np.arange(1, 101)
+    p = float(2.0 * np.sum((-1.0) ** (j - 1) * np.exp(-2.0 * j ** 2 * lam ** 2)))
+    return {"d": d, "p_value": min(max(p, 0.0), 1.0)}
+
+
+def bootstrap_quantile_shift(current: np.ndarray, previous: np.ndarray,
+                             quantiles: np.ndarray = LATENCY_QUANTILES,
+                             alpha: float = 0.05,
+                             iterations: int = BOOTSTRAP_ITERATIONS,
+                             seed: int = 0) -> dict:
+    """
+    Shift (current - previous) of each latency quantile with a percentile
+    bootstrap confidence band at level 1 - alpha.
+    """
+    rng = np.random.default_rng(seed)
+    if len(current) > BOOTSTRAP_MAX_SAMPLES:
+        current = rng.choice(current, BOOTSTRAP_MAX_SAMPLES, replace=False)
+    if len(previous) > BOOTSTRAP_MAX_SAMPLES:
+        previous = rng.choice(previous, BOOTSTRAP_MAX_SAMPLES, replace=False)
+
+    cur_q = np.quantile(current, quantiles)
+    prev_q = np.quantile(previous, quantiles)
+
+    shifts = np.empty((iterations, len(quantiles)))
+    for i in range(iterations):
+        cur_s = current[rng.integers(0, len(current), len(current))]
+        prev_s = previous[rng.integers(0, len(previous), len(previous))]
+        shifts[i] = np.quantile(cur_s, quantiles) - np.quantile(prev_s, quantiles)
+
+    return {
+        "quantiles": quantiles,
+        "previous": prev_q,
+        "current": cur_q,
+        "shift": cur_q - prev_q,
+        "ci_low": np.quantile(shifts, alpha / 2, axis=0),
+        "ci_high": np.quantile(shifts, 1 - alpha / 2, axis=0),
+    }
+
+
+def compare_latency_distributions(current: np.ndarray, previous: np.ndarray,
+                                  alpha: float = 0.05, tolerance: float = 0.05) -> dict | None:
+    """
+    Compare two latency samples. The tail verdict is "regression" when the
+    whole P99 confidence band lies above +tolerance × previous P99,
+    "improvement" when it lies below -tolerance × previous P99, otherwise
+    "no_change".
+    """
+    current = np.asarray(current, dtype=float)
+    previous = np.asarray(previous, dtype=float)
+    if len(current) < 2 or len(previous) < 2:
+        return None
+
+    mwu = mann_whitney_u(current, previous)
+    ks = ks_two_sample(current, previous)
+    qs = bootstrap_quantile_shift(current, previous, alpha=alpha)
+
+    i99 = int(np.argmin(np.abs(qs["quantiles"] - 0.99)))
+    prev_p99 = float(qs["previous"][i99])
+    margin = tolerance * prev_p99
+    ci_low, ci_high = float(qs["ci_low"][i99]), float(qs["ci_high"][i99])
+    if ci_low > margin:
+        verdict = "regression"
+    elif ci_high < -margin:
+        verdict = "improvement"
+    else:
+        verdict = "no_change"
+
+    return {
+        "n_previous": int(len(previous)),
+        "n_current": int(len(current)),
+        "mann_whitney_p_greater": mwu["p_greater"],
+        "prob_superiority": mwu["prob_superiority"],
+        "ks_d": ks["d"],
+        "ks_p_value": ks["p_value"],
+        "distribution_shifted": bool(ks["p_value"] < alpha or mwu["p_greater"] < alpha),
+        "quantile_shift": [
+            {
+                "quantile": float(q),
+                "previous_ms": float(p),
+                "current_ms": float(c),
+                "shift_ms": float(d),
+                "ci_low_ms": float(lo),
+                "ci_high_ms": float(hi),
+            }
+            for q, p, c, d, lo, hi in zip(qs["quantiles"], qs["previous"], qs["current"],
+                                          qs["shift"], qs["ci_low"], qs["ci_high"])
+        ],
+        "p99_shift_ms": float(qs["shift"][i99]),
+        "p99_shift_pct": float(qs["shift"][i99] / prev_p99 * 100) if prev_p99 else 0.0,
+        "p99_ci_ms": [ci_low, ci_high],
+        "tail_verdict": verdict,
+        "alpha": alpha,
+        "tolerance": tolerance,
+    }
+
+
+def latency_samples(data: dict) -> dict:
+    """Latency arrays per benchmark phase, errors excluded."""
+    def valid(df):
+        return df[(df["error"].isna()) | (df["error"] == "")]
+
+    def col(df, name):
+        return pd.to_numeric(df[name], errors="coerce").dropna().to_numpy(dtype=float)
+
+    genuine = valid(data["genuine"])
+    impostor = valid(data["impostor"])
+    return {
+        "enroll": col(data["enrollment"], "latency_ms"),
+        "verify_client": col(genuine, "client_latency_ms"),
+        "verify_server": col(genuine, "server_latency_ms"),
+        "impostor_client": col(impostor, "client_latency_ms"),
+    }
+
+
+LATENCY_PHASE_LABELS = {
+    "enroll": "Enrollment",
+    "verify_client": "Genuine verify (client)",
+    "verify_server": "Genuine verify (server)",
+    "impostor_client": "Impostor probe (client)",
+}
+
+
+def plot_latency_quantile_shift(shifts: dict, out_path: Path):
+    """Quantile-by-quantile latency shift vs previous run, with confidence bands."""
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for (phase, qs), color in zip(shifts.items(), plt.cm.tab10.colors):
+        q = qs["quantiles"] * 100
+        ax.plot(q, qs["shift"], "o-", color=color, markersize=3,
+                label=LATENCY_PHASE_LABELS.get(phase, phase))
+        ax.fill_between(q, qs["ci_low"], qs["ci_high"], color=color, alpha=0.15)
+    ax.axhline(0, color="black", linewidth=0.8)
+    ax.set_xlabel("Quantile (%)")
+    ax.set_ylabel("Shift vs previous run (ms)")
+    ax.set_title("Latency Quantile Shift (current − previous, bootstrap CI)")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -469,6 +1916,19 @@ def main():
                         help="Path to previous run directory for comparison")
     parser.add_argument("--threshold", type=float, default=0.39,
                         help="Operational HD threshold (default: 0.39)")
+    parser.add_argument("--plot-workers", type=int, default=0,
+                        help="Plot rendering processes (default: 0 = one per CPU, 1 = inline)")
+    parser.add_argument("--plot-format", choices=["png", "svg"], default="png",
+                        help="Plot file format; svg gives compact, zoomable plots for "
+                             "report.py --mode lazy (default: png)")
+    parser.add_argument("--force-plots", action="store_true",
+                        help="Re-render all plots even if their inputs are unchanged")
+    parser.add_argument("--regression-alpha", type=float, default=0.05,
+                        help="Significance level for latency distribution tests and "
+                             "quantile confidence bands (default: 0.05)")
+    parser.add_argument("--regression-tolerance", type=float, default=0.05,
+                        help="Relative P99 shift tolerated before a regression gate fails "
+                             "(default: 0.05 = 5%%)")
     args = parser.parse_args()
 
     run_dir = Path(args.input).resolve()
@@ -502,6 +1962,116 @@ def main():
     print(f"  Genuine HD samples: {len(genuine_hd)}")
     print(f"  Impostor HD samples: {len(impostor_hd)}")
 
+    # ── Per-subject accuracy ─────────────────────────────────────────────
+    subject_stats = aggregate_subject_accuracy(data["genuine"])
+    worst = []
+    if subject_stats is not None:
+        subject_stats.to_csv(run_dir / "subject_accuracy.csv", index=False)
+        worst = worst_subjects(subject_stats)
+        n_subjects = subject_stats["subject_id"].nunique()
+        print(f"  Subjects with genuine probes: {n_subjects} "
+              f"({len(worst)} worst-performing listed for drill-down)")
+
+    # ── Resource attribution (profile.csv × request timeline) ────────────
+    attribution = None
+    joined = compute_resource_attribution(data)
+    if joined is not None:
+        attribution, costs = joined
+        costs.to_csv(run_dir / "request_costs.csv", index=False)
+        print("Resource attribution per phase:")
+        for phase, a in attribution.items():
+            print(f"  {phase:<9} {a['cpu_ms_per_request']:8.1f} CPU-ms/req  "
+                  f"{a['throughput_rps']:7.2f} req/s  {a['avg_cores_busy']:5.2f} cores  "
+                  f"{a['requests_per_core_second']:7.2f} req/core-s  "
+                  f"mem {a.get('mem_mb_per_request', 0.0):+.3f} MB/req  "
+                  f"net {a.get('net_in_bytes_per_request', 0.0) / 1024:.1f}/"
+                  f"{a.get('net_out_bytes_per_request', 0.0) / 1024:.1f} KiB/req "
+                  f"(profile coverage {a['profile_coverage']:.0%})")
+    elif data["profile"] is not None:
+        print("  NOTE: profile.csv has no epoch column or results lack start_ts/end_ts; "
+              "skipping per-request resource attribution")
+
+    # ── Stack service usage ──────────────────────────────────────────────
+    service_usage = compute_service_usage(data["profile_services"], attribution)
+    if service_usage:
+        print("Stack service usage (mean CPU %):")
+        for service, u in sorted(service_usage["services"].items(),
+                                 key=lambda kv: -kv[1]["cpu_mean_percent"]):
+            print(f"  {service:<14} {u['cpu_mean_percent']:7.1f}%  peak {u['cpu_peak_percent']:7.1f}%  "
+                  f"mem {u['mem_mean_mb']:8.0f} MB")
+        for phase, ph in service_usage["phases"].items():
+            print(f"  {phase:<9} top CPU service: {ph['top_cpu_service']}")
+
+    # ── NATS message bus ─────────────────────────────────────────────────
+    nats_usage = compute_nats_usage(data["profile_nats"], data["profile_nats_conns"],
+                                    data["profile_nats_subjects"], attribution)
+    if nats_usage:
+        print(f"NATS: {nats_usage['in_msgs_per_sec_mean']:.0f} msg/s in, "
+              f"{nats_usage['out_msgs_per_sec_mean']:.0f} msg/s out (peak "
+              f"{nats_usage['out_msgs_per_sec_peak']:.0f}), max pending "
+              f"{nats_usage['pending_bytes_max'] / 1024:.0f} KiB, "
+              f"{nats_usage['slow_consumers_new']} new slow consumers")
+        for phase, ph in nats_usage["phases"].items():
+            per_req = ph["msgs_per_request"]
+            print(f"  {phase:<9} {ph['in_msgs_per_sec']:8.0f} msg/s in"
+                  + (f"  ({per_req:.1f} msgs/request)" if per_req is not None else ""))
+        if nats_usage["slow_consumers_new"] > 0:
+            print("  WARNING: NATS reported slow consumers during the run (bus saturated)")
+
+    # ── PostgreSQL load ──────────────────────────────────────────────────
+    postgres_usage = compute_postgres_usage(data["profile_postgres"], data["profile_postgres_waits"],
+                                            data["profile_postgres_statements"], attribution)
+    if postgres_usage:
+        print(f"PostgreSQL: {postgres_usage['commits_per_sec_mean']:.0f} commits/s, WAL "
+              f"{postgres_usage['wal_mb_per_sec_mean']:.2f} MB/s (peak "
+              f"{postgres_usage['wal_mb_per_sec_peak']:.2f}), {postgres_usage['waiting_mean']:.1f} "
+              f"backends waiting on average, {postgres_usage['checkpoints_timed']} timed + "
+              f"{postgres_usage['checkpoints_req']} requested checkpoints")
+        for table, t in postgres_usage["tables"].items():
+            per_row = f"{t['bytes_per_row']:.0f} B/row" if t["bytes_per_row"] else "-"
+            print(f"  {table:<10} {t['mb'] + t['index_mb']:8.1f} MB  +{t['rows_added']} rows  {per_row}")
+        for phase, ph in postgres_usage["phases"].items():
+            db_ms = ph.get("db_ms_per_request")
+            print(f"  {phase:<9} WAL {ph['wal_kb_per_request']:6.1f} KB/request"
+                  + (f"  DB {db_ms:6.2f} ms/request" if db_ms is not None else "")
+                  + (f"  top wait {ph['top_wait_event']}" if "top_wait_event" in ph else ""))
+        for st in postgres_usage["statements"]:
+            if st["queryid"] in postgres_usage["slowing_statements"]:
+                print(f"  WARNING: {st['operation']} on {st['table']} slowed from "
+                      f"{st['first_quarter_mean_ms']:.2f} to {st['last_quarter_mean_ms']:.2f} ms "
+                      f"over the run")
+        if postgres_usage["checkpoints_req"] > 0:
+            print("  WARNING: requested checkpoints (WAL exceeded max_wal_size during the run)")
+
+    # ── Engine thread usage ──────────────────────────────────────────────
+    thread_usage = compute_thread_usage(data["profile_threads"], attribution)
+    if thread_usage:
+        print("Engine thread groups (mean CPU %, busiest thread):")
+        for group, u in sorted(thread_usage["groups"].items(),
+                               key=lambda kv: -kv[1]["cpu_mean_percent"])[:10]:
+            print(f"  {group:<24} {u['cpu_mean_percent']:7.1f}%  x{u['threads_max']:<3} "
+                  f"busiest {u['max_thread_cpu_mean_percent']:6.1f}%  "
+                  f"runq {u['runqueue_delay_ms_per_sec']:7.1f} ms/s")
+        for group in thread_usage["saturated_groups"]:
+            print(f"  WARNING: a '{group}' thread is pinned at >= {THREAD_SATURATION_PERCENT:.0f}% "
+                  f"of a core (serial bottleneck)")
+
+    # ── Tail latency diagnostics ─────────────────────────────────────────
+    spike_index = load_spike_index(run_dir)
+    slowest = slowest_requests(data, spike_index)
+    if slowest:
+        print(f"Slowest requests ({len(spike_index)} spike snapshots):")
+        for r in slowest[:10]:
+            context = []
+            if r["top_service"]:
+                context.append(f"top {r['top_service']} {r['top_service_cpu_percent']:.0f}%")
+            if r["busiest_thread_group"]:
+                context.append(f"thread {r['busiest_thread_group']} {r['busiest_thread_cpu_percent']:.0f}%")
+            if r.get("spike"):
+                context.append(f"snapshot {r['spike_snapshot']}")
+            print(f"  {r['phase']:<9} {r['frame_id']:<28} {r['latency_ms']:9.1f} ms  "
+                  f"({r['x_phase_median']:.1f}x median)  {'  '.join(context)}")
+
     # ── Decidability ─────────────────────────────────────────────────────
     decidability = compute_decidability(genuine_hd, impostor_hd)
     print(f"  Decidability (d'): {decidability:.4f}")
@@ -520,74 +2090,9 @@ def main():
     print(f"    FMR = {op_metrics['fmr']:.6f}")
     print(f"    FNMR = {op_metrics['fnmr']:.6f}")
 
-    # ── Generate plots ───────────────────────────────────────────────────
-    print("Generating plots...")
-
-    plot_hd_histogram(genuine_hd, impostor_hd, args.threshold,
-                      plots_dir / "hd_histogram.png")
-    print("  ✓ hd_histogram.png")
-
-    if len(genuine_hd) > 0 and len(impostor_hd) > 0:
-        plot_det_curve(sweep["thresholds"], sweep["fmr"], sweep["fnmr"],
-                       sweep["eer"], plots_dir / "det_curve.png")
-        print("  ✓ det_curve.png")
-
-        plot_roc_curve(sweep["thresholds"], sweep["fmr"], sweep["fnmr"],
-                       plots_dir / "roc_curve.png")
-        print("  ✓ roc_curve.png")
-
-    plot_subject_accuracy_heatmap(data["genuine"], plots_dir / "subject_accuracy_heatmap.png")
-    print("  ✓ subject_accuracy_heatmap.png")
-
-    # Latency histograms
-    enroll_latencies = pd.to_numeric(data["enrollment"]["latency_ms"], errors="coerce").dropna().values
-    verify_latencies = pd.to_numeric(genuine_valid["client_latency_ms"], errors="coerce").dropna().values
-
-    plot_latency_histogram(enroll_latencies, "Enrollment Latency Distribution",
-                           plots_dir / "enrollment_latency.png")
-    print("  ✓ enrollment_latency.png")
-
-    plot_latency_histogram(verify_latencies, "Verification Latency Distribution",
-                           plots_dir / "verification_latency.png")
-    print("  ✓ verification_latency.png")
-
-    # Profile timelines
-    if data["profile"] is not None:
-        plot_profile_timelines(data["profile"], plots_dir)
-        print("  ✓ cpu_timeline.png, memory_timeline.png")
-
-    # ── Gate evaluation ──────────────────────────────────────────────────
-    gates = {
-        "fmr_zero": {
-            "description": "FMR = 0% for unenrolled subjects at threshold 0.39",
-            "passed": op_metrics["fmr"] == 0.0,
-            "value": op_metrics["fmr"],
-        },
-        "fnmr_below_10pct": {
-            "description": "FNMR < 10% at operational threshold",
-            "passed": op_metrics["fnmr"] < 0.10,
-            "value": op_metrics["fnmr"],
-        },
-        "fte_below_1pct": {
-            "description": "FTE < 1%",
-            "passed": enrollment_metrics["fte_rate"] < 0.01,
-            "value": enrollment_metrics["fte_rate"],
-        },
-    }
-
-    all_gates_pass = all(g["passed"] for g in gates.values())
-
-    print("\n" + "=" * 60)
-    print("GATE EVALUATION")
-    print("=" * 60)
-    for name, gate in gates.items():
-        status = "PASS" if gate["passed"] else "FAIL"
-        print(f"  [{status}] {gate['description']} (actual: {gate['value']:.6f})")
-
-    print(f"\n  Overall: {'ALL GATES PASS' if all_gates_pass else 'SOME GATES FAILED'}")
-
     # ── Comparison ───────────────────────────────────────────────────────
     comparison = None
+    latency_regression = None
     if args.compare:
         prev_dir = Path(args.compare).resolve()
         prev_summary_path = prev_dir / "summary.json"
@@ -627,9 +2132,89 @@ def main():
                 arrow = "↑" if d["change"] > 0 else "↓" if d["change"] < 0 else "="
                 print(f"  {d['metric']:<25} {d['previous']:>12.6f} {d['current']:>12.6f} "
                       f"{arrow} {d['change']:>+.6f}")
+
+            print("\nComparing latency distributions...")
+            latency_regression = {}
+            cur_lat = latency_samples(data)
+            prev_lat = latency_samples(prev_data)
+            for phase, cur_values in cur_lat.items():
+                result = compare_latency_distributions(
+                    cur_values, prev_lat[phase],
+                    alpha=args.regression_alpha, tolerance=args.regression_tolerance)
+                if result is None:
+                    continue
+                latency_regression[phase] = result
+                print(f"  {LATENCY_PHASE_LABELS[phase]:<25} P99 {result['p99_shift_ms']:+9.1f} ms "
+                      f"[{result['p99_ci_ms'][0]:+.1f}, {result['p99_ci_ms'][1]:+.1f}]  "
+                      f"KS p={result['ks_p_value']:.4f}  MWU p={result['mann_whitney_p_greater']:.4f}  "
+                      f"→ {result['tail_verdict']}")
         else:
             print(f"\nWARNING: Previous run summary not found at {prev_summary_path}")
 
+    # ── Generate plots ───────────────────────────────────────────────────
+    print("Generating plots...")
+
+    jobs = build_plot_jobs(data, genuine_valid, genuine_hd, impostor_hd, sweep,
+                           args.threshold, subject_stats, attribution, plots_dir,
+                           plot_format=args.plot_format)
+    if latency_regression:
+        jobs.append({
+            "name": "latency_quantile_shift",
+            "func": plot_latency_quantile_shift,
+            "inputs": {"shifts": {
+                phase: {k: np.array([row[f] for row in r["quantile_shift"]])
+                        for k, f in (("quantiles", "quantile"), ("shift", "shift_ms"),
+                                     ("ci_low", "ci_low_ms"), ("ci_high", "ci_high_ms"))}
+                for phase, r in latency_regression.items()
+            }},
+            "out": plots_dir / f"latency_quantile_shift.{args.plot_format}",
+        })
+    result = run_plot_jobs(jobs, plots_dir, workers=args.plot_workers,
+                           force=args.force_plots)
+    outputs = {job["name"]: job["out"].name for job in jobs}
+    for name in result["rendered"]:
+        print(f"  ✓ {outputs[name]}")
+    for name in result["skipped"]:
+        print(f"  = {outputs[name]} (unchanged)")
+
+    # ── Gate evaluation ──────────────────────────────────────────────────
+    gates = {
+        "fmr_zero": {
+            "description": "FMR = 0% for unenrolled subjects at threshold 0.39",
+            "passed": op_metrics["fmr"] == 0.0,
+            "value": op_metrics["fmr"],
+        },
+        "fnmr_below_10pct": {
+            "description": "FNMR < 10% at operational threshold",
+            "passed": op_metrics["fnmr"] < 0.10,
+            "value": op_metrics["fnmr"],
+        },
+        "fte_below_1pct": {
+            "description": "FTE < 1%",
+            "passed": enrollment_metrics["fte_rate"] < 0.01,
+            "value": enrollment_metrics["fte_rate"],
+        },
+    }
+
+    for phase, r in (latency_regression or {}).items():
+        gates[f"latency_p99_{phase}"] = {
+            "description": f"{LATENCY_PHASE_LABELS[phase]} P99 not regressed vs previous run "
+                           f"({1 - r['alpha']:.0%} CI, {r['tolerance']:.0%} tolerance)",
+            "passed": r["tail_verdict"] != "regression",
+            "value": r["p99_shift_ms"],
+        }
+
+    all_gates_pass = all(g["passed"] for g in gates.values())
+
+    print("\n" + "=" * 60)
+    print("GATE EVALUATION")
+    print("=" * 60)
+    for name, gate in gates.items():
+        status = "PASS" if gate["passed"] else "FAIL"
+        print(f"  [{status}] {gate['description']} (actual: {gate['value']:.6f})")
+
+    print(f"\n  Overall: {'ALL GATES PASS' if all_gates_pass else 'SOME GATES FAILED'}")
+
     # ── Save analysis to summary.json ────────────────────────────────────
     analysis_summary = {
         "timestamp": data["metadata"].get("timestamp", ""),
@@ -642,12 +2227,31 @@ def main():
         "eer_threshold": sweep["eer_threshold"],
         "optimal_threshold": sweep["optimal_threshold"],
         "metrics_at_operational_threshold": op_metrics,
+        "worst_subjects": worst,
         "gates": {k: {"passed": v["passed"], "value": v["value"], "description": v["description"]}
                   for k, v in gates.items()},
         "all_gates_pass": all_gates_pass,
+        # Plot files this run produced, so report.py never picks up a stale
+        # plot left in another format by an earlier --plot-format
+        "plot_format": args.plot_format,
+        "plots": {name: outputs[name] for name in result["rendered"] + result["skipped"]},
     }
     if comparison:
         analysis_summary["comparison"] = comparison
+    if latency_regression:
+        analysis_summary["latency_regression"] = latency_regression
+    if attribution:
+        analysis_summary["resource_attribution"] = attribution
+    if service_usage:
+        analysis_summary["service_usage"] = service_usage
+    if thread_usage:
+        analysis_summary["thread_usage"] = thread_usage
+    if nats_usage:
+        analysis_summary["nats_usage"] = nats_usage
+    if postgres_usage:
+        analysis_summary["postgres_usage"] = postgres_usage
+    if slowest:
+        analysis_summary["slowest_requests"] = slowest
 
     with open(run_dir / "summary.json", "w") as f:
         json.dump(analysis_summary, f, indent=2)
@@ -12,23 +12,66 @@ Usage:
         --output reports/vnv/
 
 No source code changes. Results are recorded exactly as returned by the API.
+Every row carries wall-clock start_ts/end_ts (Unix epoch seconds) so requests
+can be aligned with profile.py samples, and the frame_id sent to the API.
+
+With --spike-threshold-ms, any request still in flight after the threshold
+is reported (by frame_id) to profile.py --spike-capture, which snapshots the
+system while it is slow.
+
+--engine async runs each phase on asyncio + aiohttp with --concurrency
+requests in flight and payloads prefetched off the event loop, for load
+well beyond one request at a time from a single process. The CSV files and
+summary.json are the same as with the default sync engine.
+
+    python scripts/vnv/benchmark.py ... --engine async --concurrency 512
+
+--gateway grpc,stream additionally drives the genuine and impostor probes
+through the C++ gateway the way capture devices reach it: CaptureFrame over
+gRPC (proto/capture.proto, stubs generated by capture_proto.py) on a pool of
+--grpc-channels channels, results read back from the gateway's HTTP
+WebSocket (/ws/results). Each path writes genuine_<path>.csv and
+impostor_<path>.csv next to the direct-engine files, and summary.json
+compares latency and throughput per path ("paths"), so the cost of the
+gateway hop and its circuit breaker is measured.
+
+    python scripts/vnv/benchmark.py ... --engine async --gateway grpc,stream \
+        --gateway-grpc localhost:9503 --gateway-url http://localhost:9504
 """
 
 import argparse
+import asyncio
 import base64
 import csv
+import functools
+import itertools
 import json
 import os
+import random
 import subprocess
 import sys
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import requests
 from tqdm import tqdm
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # only needed for --engine async and --gateway
+
+try:
+    import grpc
+except ImportError:
+    grpc = None  # only needed for --gateway
+
+from capture_proto import DEFAULT_PROTO, load_capture_stubs
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -38,6 +81,7 @@ DEFAULT_ENROLL_COUNT = 800       # subjects 000–799
 DEFAULT_IMPOSTOR_COUNT = 200     # subjects 800–999
 IMPOSTOR_START = 800             # impostor subjects always start at 800
 EYE_SIDES = {"L": "left", "R": "right"}
+BENCHMARK_DEVICE_ID = "vnv-benchmark"  # device_id sent with every request
 
 # Fixed namespace for deterministic UUID generation from subject number
 _VNV_UUID_NS = uuid.UUID("a1b2c3d4-e5f6-7890-abcd-ef1234567890")
@@ -99,25 +143,145 @@ def get_gallery_size(api_url: str) -> int:
     return resp.json().get("gallery_size", 0)
 
 
+# ---------------------------------------------------------------------------
+# Latency Spike Triggers
+# ---------------------------------------------------------------------------
+# With --spike-threshold-ms, a timer runs alongside every request. If the
+# request is still in flight when it fires, a trigger line keyed by frame_id
+# is appended to diagnostics/spike_triggers.jsonl; profile.py --spike-capture
+# watches that file and snapshots the system while the slow request is
+# still running.
+
+SPIKE_TRIGGER_FILE = "spike_triggers.jsonl"
+
+
+def fire_spike(spike: dict, frame_id: str, test_type: str, start_ts: float) -> None:
+    with spike["lock"], open(spike["path"], "a") as f:
+        f.write(json.dumps({
+            "frame_id": frame_id,
+            "test_type": test_type,
+            "start_ts": round(start_ts, 6),
+            "fired_ts": round(time.time(), 6),
+            "threshold_ms": spike["threshold_ms"],
+        }) + "\n")
+        spike["fired"] += 1
+
+
+def post_watched(url: str, payload: dict, spike: dict | None, frame_id: str,
+                 test_type: str, start_ts: float) -> requests.Response:
+    """POST payload; report a spike trigger if it outlives spike['threshold_ms']."""
+    timer = None
+    if spike is not None:
+        timer = threading.Timer(spike["threshold_ms"] / 1000, fire_spike,
+                                (spike, frame_id, test_type, start_ts))
+        timer.daemon = True
+        timer.start()
+    try:
+        return requests.post(url, json=payload, timeout=60)
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+
+async def post_watched_async(session, url: str, body: bytes, spike: dict | None, frame_id: str,
+                             test_type: str, start_ts: float) -> tuple[int, dict]:
+    """Async post_watched(): POST a pre-encoded JSON body, return (status, parsed body)."""
+    handle = None
+    if spike is not None:
+        handle = asyncio.get_running_loop().call_later(
+            spike["threshold_ms"] / 1000, fire_spike, spike, frame_id, test_type, start_ts)
+    try:
+        async with session.post(url, data=body, headers=JSON_HEADERS) as resp:
+            return resp.status, await resp.json(content_type=None)
+    finally:
+        if handle is not None:
+            handle.cancel()
+
+
+# ---------------------------------------------------------------------------
+# Phases
+# ---------------------------------------------------------------------------
+# A phase is a dict: the probe items (subject, eye_code, eye_side, image),
+# request(item) -> (frame_id, endpoint, payload without jpeg_b64),
+# record(item, frame_id, http_status, body, exc, latency_ms, start_ts) -> CSV
+# row (updating the phase's counters), postfix() for the progress bar and
+# summary() -> stats dict. run_phase() and run_phase_async() execute the same
+# phase, so both engines produce identical CSV rows and summaries. record()
+# never raises: a response body it cannot parse becomes a failed row.
+
+def verification_row(test_type: str, item: tuple, frame_id: str, expected: str,
+                     latency_ms: float, start_ts: float, **fields) -> dict:
+    subj, _, eye_side, img_path = item
+    row = {
+        "test_type": test_type,
+        "subject_id": subj,
+        "eye_side": eye_side,
+        "device_id": BENCHMARK_DEVICE_ID,
+        "image_file": img_path.name,
+        "frame_id": frame_id,
+        "expected_identity": expected,
+        "is_match": False,
+        "matched_identity_id": "",
+        "hamming_distance": "",
+        "best_rotation": "",
+        "server_latency_ms": "0",
+        "client_latency_ms": f"{latency_ms:.2f}",
+        "start_ts": f"{start_ts:.6f}",
+        "end_ts": f"{start_ts + latency_ms / 1000:.6f}",
+        "error": "",
+        "correct": False,
+    }
+    row.update(fields)
+    return row
+
+
+def response_object(body) -> dict:
+    """body if it is a JSON object, else ValueError (recorded as a failed request)."""
+    if not isinstance(body, dict):
+        raise ValueError(f"malformed response body: {json.dumps(body)[:200]}")
+    return body
+
+
+def parse_analyze(body) -> tuple:
+    """(error, server_latency_ms, match_fields) of an /analyze response; ValueError if malformed."""
+    body = response_object(body)
+    try:
+        server_latency = f"{float(body.get('latency_ms') or 0):.2f}"
+    except (TypeError, ValueError):
+        raise ValueError(f"malformed latency_ms: {body.get('latency_ms')!r}")
+    match = body.get("match")
+    if match is not None and not isinstance(match, dict):
+        raise ValueError(f"malformed match: {json.dumps(match)[:200]}")
+    return body.get("error"), server_latency, match_fields(match)
+
+
+def match_fields(match: dict | None) -> dict:
+    """is_match / matched_identity_id / hamming_distance / best_rotation of a response."""
+    if match is None:
+        return {"is_match": False, "matched_identity_id": "", "hamming_distance": "",
+                "best_rotation": ""}
+    return {
+        "is_match": match.get("is_match", False),
+        "matched_identity_id": match.get("matched_identity_id") or "",
+        "hamming_distance": match.get("hamming_distance", ""),
+        "best_rotation": match.get("best_rotation", ""),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Enrollment
 # ---------------------------------------------------------------------------
 
-def run_enrollment(dataset: Path, api_url: str, writer: csv.DictWriter,
-                   enroll_range: range, progress: bool = True) -> dict:
+def enrollment_phase(dataset: Path, enroll_range: range) -> dict:
     """
     Enroll first image per eye for the given subject range.
-    Returns summary stats dict.
+    summary() returns the stats dict.
     """
-    subjects = [subject_dir_name(i) for i in enroll_range]
-    total = 0
-    success = 0
-    duplicate = 0
-    failed = 0
+    stats = {"total": 0, "success": 0, "duplicate": 0, "failed": 0}
     errors = []
 
     items = []
-    for subj in subjects:
+    for subj in (subject_dir_name(i) for i in enroll_range):
         for eye_code, eye_side in EYE_SIDES.items():
             eye_dir = dataset / subj / eye_code
             images = sorted_images(eye_dir)
@@ -126,77 +290,73 @@ def run_enrollment(dataset: Path, api_url: str, writer: csv.DictWriter,
                 continue
             items.append((subj, eye_code, eye_side, images[0]))
 
-    desc = "Enrolling"
-    iterator = tqdm(items, desc=desc, disable=not progress)
-
-    for subj, eye_code, eye_side, img_path in iterator:
-        total += 1
-        t0 = time.monotonic()
-        try:
-            jpeg_b64 = load_jpeg_b64(img_path)
-            identity_uuid = subject_uuid(int(subj))
-            resp = requests.post(
-                f"{api_url}/enroll",
-                json={
-                    "identity_id": identity_uuid,
-                    "identity_name": subj,
-                    "eye_side": eye_side,
-                    "jpeg_b64": jpeg_b64,
-                    "device_id": "vnv-benchmark",
-                },
-                timeout=60,
-            )
-            latency_ms = (time.monotonic() - t0) * 1000
-            status_code = resp.status_code
-            body = resp.json()
-
-            is_dup = body.get("is_duplicate", False)
-            error = body.get("error")
-            template_id = body.get("template_id", "")
-            smpc_protected = body.get("smpc_protected", False)
-
-            if error:
-                failed += 1
-            elif is_dup:
-                duplicate += 1
-            else:
-                success += 1
-
-            writer.writerow({
-                "subject_id": subj,
-                "eye_side": eye_side,
-                "image_file": img_path.name,
-                "http_status": status_code,
-                "template_id": template_id,
-                "is_duplicate": is_dup,
-                "smpc_protected": smpc_protected,
-                "error": error if error else "",
-                "latency_ms": f"{latency_ms:.2f}",
-            })
-
-        except Exception as e:
-            latency_ms = (time.monotonic() - t0) * 1000
-            failed += 1
-            writer.writerow({
-                "subject_id": subj,
-                "eye_side": eye_side,
-                "image_file": img_path.name,
-                "http_status": 0,
-                "template_id": "",
-                "is_duplicate": False,
-                "smpc_protected": False,
-                "error": str(e),
-                "latency_ms": f"{latency_ms:.2f}",
-            })
-
-        iterator.set_postfix(ok=success, dup=duplicate, fail=failed)
+    def request(item):
+        subj, eye_code, eye_side, img_path = item
+        return f"enroll_{subj}_{eye_code}_{img_path.stem}", "/enroll", {
+            "identity_id": subject_uuid(int(subj)),
+            "identity_name": subj,
+            "eye_side": eye_side,
+            "device_id": BENCHMARK_DEVICE_ID,
+        }
+
+    def record(item, frame_id, status_code, body, exc, latency_ms, start_ts):
+        subj, _, eye_side, img_path = item
+        stats["total"] += 1
+        row = {
+            "subject_id": subj,
+            "eye_side": eye_side,
+            "device_id": BENCHMARK_DEVICE_ID,
+            "image_file": img_path.name,
+            "frame_id": frame_id,
+            "http_status": 0,
+            "template_id": "",
+            "is_duplicate": False,
+            "smpc_protected": False,
+            "error": "",
+            "latency_ms": f"{latency_ms:.2f}",
+            "start_ts": f"{start_ts:.6f}",
+            "end_ts": f"{start_ts + latency_ms / 1000:.6f}",
+        }
+        if exc is None:
+            try:
+                body = response_object(body)
+            except ValueError as e:
+                exc = e
+        if exc is not None:
+            stats["failed"] += 1
+            row["error"] = str(exc)
+            return row
+
+        is_dup = body.get("is_duplicate", False)
+        error = body.get("error")
+        if error:
+            stats["failed"] += 1
+        elif is_dup:
+            stats["duplicate"] += 1
+        else:
+            stats["success"] += 1
+        row.update({
+            "http_status": status_code,
+            "template_id": body.get("template_id", ""),
+            "is_duplicate": is_dup,
+            "smpc_protected": body.get("smpc_protected", False),
+            "error": error if error else "",
+        })
+        return row
+
+    def summary():
+        total = stats["total"]
+        return {**stats, "fte_rate": stats["failed"] / total if total > 0 else 0}
 
     return {
-        "total": total,
-        "success": success,
-        "duplicate": duplicate,
-        "failed": failed,
-        "fte_rate": failed / total if total > 0 else 0,
+        "name": "enroll",
+        "desc": "Enrolling",
+        "items": items,
+        "request": request,
+        "record": record,
+        "postfix": lambda: {"ok": stats["success"], "dup": stats["duplicate"],
+                            "fail": stats["failed"]},
+        "summary": summary,
     }
 
 
@@ -204,21 +364,16 @@ def run_enrollment(dataset: Path, api_url: str, writer: csv.DictWriter,
 # Genuine Verification (positive tests)
 # ---------------------------------------------------------------------------
 
-def run_genuine_verification(dataset: Path, api_url: str, writer: csv.DictWriter,
-                             enroll_range: range, progress: bool = True) -> dict:
+def genuine_phase(dataset: Path, enroll_range: range) -> dict:
     """
     Send remaining images from enrolled subjects as genuine probes.
     The system should match them to their own identity.
     """
-    subjects = [subject_dir_name(i) for i in enroll_range]
-    total = 0
-    correct = 0
-    false_negative = 0
-    wrong_identity = 0
-    pipeline_fail = 0
+    stats = {"total": 0, "correct": 0, "false_negative": 0, "wrong_identity": 0,
+             "pipeline_fail": 0}
 
     items = []
-    for subj in subjects:
+    for subj in (subject_dir_name(i) for i in enroll_range):
         for eye_code, eye_side in EYE_SIDES.items():
             eye_dir = dataset / subj / eye_code
             images = sorted_images(eye_dir)
@@ -226,115 +381,55 @@ def run_genuine_verification(dataset: Path, api_url: str, writer: csv.DictWriter
             for img_path in images[1:]:
                 items.append((subj, eye_code, eye_side, img_path))
 
-    desc = "Genuine probes"
-    iterator = tqdm(items, desc=desc, disable=not progress)
-
-    for subj, eye_code, eye_side, img_path in iterator:
-        total += 1
-        t0 = time.monotonic()
-        try:
-            jpeg_b64 = load_jpeg_b64(img_path)
-            resp = requests.post(
-                f"{api_url}/analyze/json",
-                json={
-                    "jpeg_b64": jpeg_b64,
-                    "eye_side": eye_side,
-                    "frame_id": f"{subj}_{eye_code}_{img_path.stem}",
-                    "device_id": "vnv-benchmark",
-                },
-                timeout=60,
-            )
-            latency_ms = (time.monotonic() - t0) * 1000
-            body = resp.json()
-
-            error = body.get("error")
-            match = body.get("match")
-            server_latency = body.get("latency_ms", 0)
-
-            if error:
-                pipeline_fail += 1
-                writer.writerow({
-                    "test_type": "genuine",
-                    "subject_id": subj,
-                    "eye_side": eye_side,
-                    "image_file": img_path.name,
-                    "expected_identity": subj,
-                    "is_match": False,
-                    "matched_identity_id": "",
-                    "hamming_distance": "",
-                    "best_rotation": "",
-                    "server_latency_ms": f"{server_latency:.2f}",
-                    "client_latency_ms": f"{latency_ms:.2f}",
-                    "error": error,
-                    "correct": False,
-                })
-                continue
-
-            is_match = False
-            matched_id = ""
-            hd = ""
-            rotation = ""
-
-            if match is not None:
-                is_match = match.get("is_match", False)
-                matched_id = match.get("matched_identity_id") or ""
-                hd = match.get("hamming_distance", "")
-                rotation = match.get("best_rotation", "")
-
-            expected_uuid = subject_uuid(int(subj))
-            if is_match and matched_id == expected_uuid:
-                correct += 1
-                is_correct = True
-            elif is_match and matched_id != expected_uuid:
-                wrong_identity += 1
-                is_correct = False
-            else:
-                false_negative += 1
-                is_correct = False
-
-            writer.writerow({
-                "test_type": "genuine",
-                "subject_id": subj,
-                "eye_side": eye_side,
-                "image_file": img_path.name,
-                "expected_identity": subj,
-                "is_match": is_match,
-                "matched_identity_id": matched_id,
-                "hamming_distance": hd,
-                "best_rotation": rotation,
-                "server_latency_ms": f"{server_latency:.2f}",
-                "client_latency_ms": f"{latency_ms:.2f}",
-                "error": "",
-                "correct": is_correct,
-            })
-
-        except Exception as e:
-            latency_ms = (time.monotonic() - t0) * 1000
-            pipeline_fail += 1
-            writer.writerow({
-                "test_type": "genuine",
-                "subject_id": subj,
-                "eye_side": eye_side,
-                "image_file": img_path.name,
-                "expected_identity": subj,
-                "is_match": False,
-                "matched_identity_id": "",
-                "hamming_distance": "",
-                "best_rotation": "",
-                "server_latency_ms": "0",
-                "client_latency_ms": f"{latency_ms:.2f}",
-                "error": str(e),
-                "correct": False,
-            })
-
-        iterator.set_postfix(ok=correct, fn=false_negative, wrong=wrong_identity, fail=pipeline_fail)
+    def request(item):
+        subj, eye_code, eye_side, img_path = item
+        frame_id = f"{subj}_{eye_code}_{img_path.stem}"
+        return frame_id, "/analyze/json", {
+            "eye_side": eye_side,
+            "frame_id": frame_id,
+            "device_id": BENCHMARK_DEVICE_ID,
+        }
+
+    def record(item, frame_id, status_code, body, exc, latency_ms, start_ts):
+        subj = item[0]
+        stats["total"] += 1
+        if exc is None:
+            try:
+                error, server_latency, fields = parse_analyze(body)
+            except ValueError as e:
+                exc = e
+        if exc is not None:
+            stats["pipeline_fail"] += 1
+            return verification_row("genuine", item, frame_id, subj, latency_ms, start_ts,
+                                    error=str(exc))
+
+        if error:
+            stats["pipeline_fail"] += 1
+            return verification_row("genuine", item, frame_id, subj, latency_ms, start_ts,
+                                    server_latency_ms=server_latency, error=error)
+
+        expected_uuid = subject_uuid(int(subj))
+        if fields["is_match"] and fields["matched_identity_id"] == expected_uuid:
+            stats["correct"] += 1
+            is_correct = True
+        elif fields["is_match"]:
+            stats["wrong_identity"] += 1
+            is_correct = False
+        else:
+            stats["false_negative"] += 1
+            is_correct = False
+        return verification_row("genuine", item, frame_id, subj, latency_ms, start_ts,
+                                server_latency_ms=server_latency, correct=is_correct, **fields)
 
     return {
-        "total": total,
-        "correct": correct,
-        "false_negative": false_negative,
-        "wrong_identity": wrong_identity,
-        "pipeline_fail": pipeline_fail,
+        "name": "genuine",
+        "desc": "Genuine probes",
+        "items": items,
+        "request": request,
+        "record": record,
+        "postfix": lambda: {"ok": stats["correct"], "fn": stats["false_negative"],
+                            "wrong": stats["wrong_identity"], "fail": stats["pipeline_fail"]},
+        "summary": lambda: dict(stats),
     }
 
 
@@ -342,132 +437,427 @@ def run_genuine_verification(dataset: Path, api_url: str, writer: csv.DictWriter
 # Impostor Verification (negative tests — real unenrolled subjects)
 # ---------------------------------------------------------------------------
 
-def run_impostor_verification(dataset: Path, api_url: str, writer: csv.DictWriter,
-                              impostor_range: range, progress: bool = True) -> dict:
+def impostor_phase(dataset: Path, impostor_range: range) -> dict:
     """
     Send ALL images from unenrolled subjects as impostor probes.
     The system must return is_match=false for every single one.
     Any match is a true false positive.
     """
-    subjects = [subject_dir_name(i) for i in impostor_range]
-    total = 0
-    true_reject = 0
-    false_positive = 0
-    pipeline_fail = 0
+    stats = {"total": 0, "true_reject": 0, "false_positive": 0, "pipeline_fail": 0}
 
     items = []
-    for subj in subjects:
+    for subj in (subject_dir_name(i) for i in impostor_range):
         for eye_code, eye_side in EYE_SIDES.items():
             eye_dir = dataset / subj / eye_code
             images = sorted_images(eye_dir)
             for img_path in images:
                 items.append((subj, eye_code, eye_side, img_path))
 
-    desc = "Impostor probes"
-    iterator = tqdm(items, desc=desc, disable=not progress)
+    def request(item):
+        subj, eye_code, eye_side, img_path = item
+        frame_id = f"impostor_{subj}_{eye_code}_{img_path.stem}"
+        return frame_id, "/analyze/json", {
+            "eye_side": eye_side,
+            "frame_id": frame_id,
+            "device_id": BENCHMARK_DEVICE_ID,
+        }
+
+    def record(item, frame_id, status_code, body, exc, latency_ms, start_ts):
+        stats["total"] += 1
+        if exc is None:
+            try:
+                error, server_latency, fields = parse_analyze(body)
+            except ValueError as e:
+                exc = e
+        if exc is not None:
+            stats["pipeline_fail"] += 1
+            return verification_row("impostor", item, frame_id, "", latency_ms, start_ts,
+                                    error=str(exc))
+
+        if error:
+            stats["pipeline_fail"] += 1
+            return verification_row("impostor", item, frame_id, "", latency_ms, start_ts,
+                                    server_latency_ms=server_latency, error=error)
+
+        if fields["is_match"]:
+            stats["false_positive"] += 1
+        else:
+            stats["true_reject"] += 1
+        return verification_row("impostor", item, frame_id, "", latency_ms, start_ts,
+                                server_latency_ms=server_latency,
+                                correct=not fields["is_match"], **fields)
 
-    for subj, eye_code, eye_side, img_path in iterator:
-        total += 1
+    return {
+        "name": "impostor",
+        "desc": "Impostor probes",
+        "items": items,
+        "request": request,
+        "record": record,
+        "postfix": lambda: {"reject": stats["true_reject"], "fp": stats["false_positive"],
+                            "fail": stats["pipeline_fail"]},
+        "summary": lambda: dict(stats),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Engines
+# ---------------------------------------------------------------------------
+# sync: one request at a time with requests, as the benchmark always ran;
+# client latency includes reading and encoding the JPEG.
+# async: an asyncio loop on aiohttp with up to --concurrency requests in
+# flight (a semaphore). Payloads -- JPEG read, base64 and the JSON body --
+# are built ahead by a small thread pool into a bounded queue of --prefetch
+# bodies, so the loop only sends; client latency is the HTTP exchange alone.
+# Rows are written in completion order (analyze.py orders by start_ts).
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+PREFETCH_THREADS = 4
+
+
+def run_phase(phase: dict, api_url: str, writer: csv.DictWriter, progress: bool = True,
+              spike: dict | None = None) -> dict:
+    iterator = tqdm(phase["items"], desc=phase["desc"], disable=not progress)
+    for item in iterator:
+        frame_id, endpoint, payload = phase["request"](item)
         t0 = time.monotonic()
+        start_ts = time.time()
+        status_code = body = exc = None
         try:
-            jpeg_b64 = load_jpeg_b64(img_path)
-            resp = requests.post(
-                f"{api_url}/analyze/json",
-                json={
-                    "jpeg_b64": jpeg_b64,
-                    "eye_side": eye_side,
-                    "frame_id": f"impostor_{subj}_{eye_code}_{img_path.stem}",
-                    "device_id": "vnv-benchmark",
-                },
-                timeout=60,
-            )
+            payload["jpeg_b64"] = load_jpeg_b64(item[3])
+            resp = post_watched(f"{api_url}{endpoint}", payload, spike, frame_id,
+                                phase["name"], start_ts)
             latency_ms = (time.monotonic() - t0) * 1000
+            status_code = resp.status_code
             body = resp.json()
+        except Exception as e:
+            latency_ms = (time.monotonic() - t0) * 1000
+            exc = e
+        writer.writerow(phase["record"](item, frame_id, status_code, body, exc, latency_ms,
+                                        start_ts))
+        iterator.set_postfix(**phase["postfix"]())
+    return phase["summary"]()
 
-            error = body.get("error")
-            match = body.get("match")
-            server_latency = body.get("latency_ms", 0)
-
-            if error:
-                pipeline_fail += 1
-                writer.writerow({
-                    "test_type": "impostor",
-                    "subject_id": subj,
-                    "eye_side": eye_side,
-                    "image_file": img_path.name,
-                    "expected_identity": "",
-                    "is_match": False,
-                    "matched_identity_id": "",
-                    "hamming_distance": "",
-                    "best_rotation": "",
-                    "server_latency_ms": f"{server_latency:.2f}",
-                    "client_latency_ms": f"{latency_ms:.2f}",
-                    "error": error,
-                    "correct": False,
-                })
-                continue
 
-            is_match = False
-            matched_id = ""
-            hd = ""
-            rotation = ""
-
-            if match is not None:
-                is_match = match.get("is_match", False)
-                matched_id = match.get("matched_identity_id") or ""
-                hd = match.get("hamming_distance", "")
-                rotation = match.get("best_rotation", "")
-
-            if is_match:
-                false_positive += 1
-                is_correct = False
-            else:
-                true_reject += 1
-                is_correct = True
-
-            writer.writerow({
-                "test_type": "impostor",
-                "subject_id": subj,
-                "eye_side": eye_side,
-                "image_file": img_path.name,
-                "expected_identity": "",
-                "is_match": is_match,
-                "matched_identity_id": matched_id,
-                "hamming_distance": hd,
-                "best_rotation": rotation,
-                "server_latency_ms": f"{server_latency:.2f}",
-                "client_latency_ms": f"{latency_ms:.2f}",
-                "error": "",
-                "correct": is_correct,
-            })
+def build_request_body(phase: dict, item: tuple) -> tuple[str, str, bytes]:
+    frame_id, endpoint, payload = phase["request"](item)
+    payload["jpeg_b64"] = load_jpeg_b64(item[3])
+    return frame_id, endpoint, json.dumps(payload).encode()
 
-        except Exception as e:
+
+async def resolve_built(item, future):
+    try:
+        return item, await future, None
+    except Exception as e:
+        return item, None, e
+
+
+async def prefetch(items: list, build, ready: asyncio.Queue, pool: ThreadPoolExecutor) -> None:
+    """Put (item, build(item), exc) on ready, built PREFETCH_THREADS at a time in item order."""
+    loop = asyncio.get_running_loop()
+    pending = []
+    for item in items:
+        pending.append((item, loop.run_in_executor(pool, build, item)))
+        if len(pending) >= PREFETCH_THREADS:
+            await ready.put(await resolve_built(*pending.pop(0)))
+    for job in pending:
+        await ready.put(await resolve_built(*job))
+    await ready.put(None)
+
+
+async def dispatch(ready: asyncio.Queue, slots: asyncio.Semaphore, send) -> None:
+    """Start send(*job) for every prefetched job; send() releases its slot."""
+    in_flight = set()
+    while (job := await ready.get()) is not None:
+        await slots.acquire()
+        task = asyncio.create_task(send(*job))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+async def run_phase_async(phase: dict, api_url: str, writer: csv.DictWriter,
+                          progress: bool = True, spike: dict | None = None,
+                          concurrency: int = 256, prefetch_size: int = 1024) -> dict:
+    bar = tqdm(total=len(phase["items"]), desc=phase["desc"], disable=not progress)
+    ready = asyncio.Queue(maxsize=max(1, prefetch_size))
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def send(session, item, built, exc):
+        try:
+            frame_id = built[0] if built else phase["request"](item)[0]
+            start_ts = time.time()
+            t0 = time.monotonic()
+            status_code = body = None
+            if exc is None:
+                try:
+                    status_code, body = await post_watched_async(
+                        session, f"{api_url}{built[1]}", built[2], spike, frame_id,
+                        phase["name"], start_ts)
+                except Exception as e:
+                    exc = e
             latency_ms = (time.monotonic() - t0) * 1000
-            pipeline_fail += 1
-            writer.writerow({
-                "test_type": "impostor",
-                "subject_id": subj,
-                "eye_side": eye_side,
-                "image_file": img_path.name,
-                "expected_identity": "",
-                "is_match": False,
-                "matched_identity_id": "",
-                "hamming_distance": "",
-                "best_rotation": "",
-                "server_latency_ms": "0",
-                "client_latency_ms": f"{latency_ms:.2f}",
-                "error": str(e),
-                "correct": False,
-            })
-
-        iterator.set_postfix(reject=true_reject, fp=false_positive, fail=pipeline_fail)
+            writer.writerow(phase["record"](item, frame_id, status_code, body, exc, latency_ms,
+                                            start_ts))
+            bar.update(1)
+            bar.set_postfix(**phase["postfix"](), refresh=False)
+        finally:
+            slots.release()
+
+    connector = aiohttp.TCPConnector(limit=max(1, concurrency))
+    timeout = aiohttp.ClientTimeout(total=60)
+    with ThreadPoolExecutor(max_workers=PREFETCH_THREADS) as pool:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            producer = asyncio.create_task(
+                prefetch(phase["items"], functools.partial(build_request_body, phase), ready, pool))
+            await dispatch(ready, slots, functools.partial(send, session))
+            await producer
+    bar.close()
+    return phase["summary"]()
+
+
+def execute_phase(args: argparse.Namespace, phase: dict, api_url: str, writer: csv.DictWriter,
+                  progress: bool, spike: dict | None) -> dict:
+    """Run a phase on the engine chosen with --engine."""
+    if args.engine == "async":
+        return asyncio.run(run_phase_async(phase, api_url, writer, progress, spike,
+                                           args.concurrency, args.prefetch))
+    return run_phase(phase, api_url, writer, progress, spike)
 
-    return {
-        "total": total,
-        "true_reject": true_reject,
-        "false_positive": false_positive,
-        "pipeline_fail": pipeline_fail,
+
+# ---------------------------------------------------------------------------
+# Gateway Paths
+# ---------------------------------------------------------------------------
+# Production clients reach iris-engine2 through the C++ gateway: CaptureFrame
+# over gRPC, a circuit breaker check, NATS eyed.analyze, and the result back
+# on eyed.result, which the gateway's HTTP server fans out on /ws/results.
+# A gateway path submits each probe over gRPC and waits for its result on
+# that WebSocket, matched by frame_id:
+#   grpc:   one SubmitFrame call per probe
+#   stream: StreamFrames, one long-lived stream per pooled channel
+# The gateway takes uint32 frame ids, so probes are numbered from a random
+# base and the benchmark's own id is kept in probe_id. ack_latency_ms is the
+# gRPC round trip (breaker check + NATS publish); client_latency_ms is the
+# full submit -> result time. A frame acked with accepted=false was refused
+# by the breaker (or its publish failed) and never reaches an engine.
+# Enrollment has no capture-protocol equivalent and always goes direct.
+
+GATEWAY_PATHS = ("grpc", "stream")
+GATEWAY_FIELDS = ["path", "probe_id", "accepted", "ack_latency_ms"]
+GRPC_TIMEOUT = 30
+GRPC_OPTIONS = [("grpc.max_send_message_length", 16 * 1024 * 1024)]
+
+
+def check_gateway(gateway_url: str) -> dict:
+    """Gateway /health/ready (not raising when the breaker is open)."""
+    resp = requests.get(f"{gateway_url}/health/ready", timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def build_capture_frame(pb2, phase: dict, item: tuple) -> tuple[str, object]:
+    """(probe_id, CaptureFrame) for item; frame_id and timestamp are set at send time."""
+    probe_id, _, payload = phase["request"](item)
+    return probe_id, pb2.CaptureFrame(
+        jpeg_data=item[3].read_bytes(),
+        device_id=BENCHMARK_DEVICE_ID,
+        eye_side=payload["eye_side"],
+        is_nir=True,
+    )
+
+
+async def open_gateway_client(path: str, target: str, channels: int, pb2_grpc) -> dict:
+    """
+    Pool of gRPC channels to the gateway. submit(frame) -> FrameAck goes
+    round-robin over the pool: a SubmitFrame call for path 'grpc', a write
+    on the channel's StreamFrames stream (acks matched by frame_id) for
+    path 'stream'.
+    """
+    pool = [grpc.aio.insecure_channel(target, options=GRPC_OPTIONS)
+            for _ in range(max(1, channels))]
+    stubs = [pb2_grpc.CaptureServiceStub(ch) for ch in pool]
+    turn = itertools.count()
+    streams = []
+
+    async def read_acks(stream):
+        try:
+            while (ack := await stream["call"].read()) != grpc.aio.EOF:
+                waiter = stream["pending"].pop(ack.frame_id, None)
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(ack)
+        except Exception as e:
+            for waiter in stream["pending"].values():
+                if not waiter.done():
+                    waiter.set_exception(e)
+        finally:
+            stream["pending"].clear()
+
+    async def submit_unary(frame):
+        return await stubs[next(turn) % len(stubs)].SubmitFrame(frame, timeout=GRPC_TIMEOUT)
+
+    async def submit_stream(frame):
+        stream = streams[next(turn) % len(streams)]
+        waiter = asyncio.get_running_loop().create_future()
+        stream["pending"][frame.frame_id] = waiter
+        try:
+            async with stream["lock"]:
+                await stream["call"].write(frame)
+            return await asyncio.wait_for(waiter, GRPC_TIMEOUT)
+        finally:
+            stream["pending"].pop(frame.frame_id, None)
+
+    async def close():
+        for stream in streams:
+            try:
+                async with stream["lock"]:
+                    await stream["call"].done_writing()
+                await asyncio.wait_for(stream["reader"], GRPC_TIMEOUT)
+            except Exception:
+                stream["reader"].cancel()
+        for ch in pool:
+            await ch.close()
+
+    if path == "stream":
+        for stub in stubs:
+            stream = {"call": stub.StreamFrames(), "lock": asyncio.Lock(), "pending": {}}
+            stream["reader"] = asyncio.create_task(read_acks(stream))
+            streams.append(stream)
+
+    return {"submit": submit_stream if path == "stream" else submit_unary, "close": close}
+
+
+async def watch_results(session, ws_url: str, waiting: dict, connected: asyncio.Event) -> None:
+    """Resolve waiting[frame_id] futures from the gateway's result WebSocket."""
+    async with session.ws_connect(ws_url, heartbeat=30) as ws:
+        connected.set()
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            try:
+                result = json.loads(msg.data)
+            except ValueError:
+                continue
+            if not isinstance(result, dict):
+                continue
+            if result.get("device_id", BENCHMARK_DEVICE_ID) != BENCHMARK_DEVICE_ID:
+                continue
+            waiter = waiting.get(str(result.get("frame_id", "")))
+            if waiter is not None and not waiter.done():
+                waiter.set_result(result)
+
+
+async def run_phase_gateway(phase: dict, path: str, gateway: dict, writer: csv.DictWriter,
+                            progress: bool = True, spike: dict | None = None,
+                            concurrency: int = 1, prefetch_size: int = 1024) -> dict:
+    """Run phase through the gateway on path; summary() plus the gateway's ack counters."""
+    counters = {"submitted": 0, "accepted": 0, "rejected": 0, "no_result": 0}
+    bar = tqdm(total=len(phase["items"]), desc=f"{phase['desc']} [{path}]",
+               disable=not progress)
+    ready = asyncio.Queue(maxsize=max(1, prefetch_size))
+    slots = asyncio.Semaphore(max(1, concurrency))
+    waiting = {}
+    numbers = itertools.count(random.getrandbits(32))
+    loop = asyncio.get_running_loop()
+
+    async def send(client, item, built, exc):
+        try:
+            probe_id = built[0] if built else phase["request"](item)[0]
+            frame_number = next(numbers) & 0xFFFFFFFF
+            frame_id = str(frame_number)
+            start_ts = time.time()
+            t0 = time.monotonic()
+            status_code = body = None
+            ack_ms = accepted = ""
+            handle = None
+            if exc is None:
+                frame = built[1]
+                frame.frame_id = frame_number
+                frame.timestamp_us = int(start_ts * 1_000_000)
+                waiting[frame_id] = result = loop.create_future()
+                if spike is not None:
+                    handle = loop.call_later(spike["threshold_ms"] / 1000, fire_spike, spike,
+                                             frame_id, phase["name"], start_ts)
+                try:
+                    counters["submitted"] += 1
+                    ack = await client["submit"](frame)
+                    ack_ms = f"{(time.monotonic() - t0) * 1000:.2f}"
+                    accepted = ack.accepted
+                    if ack.accepted:
+                        counters["accepted"] += 1
+                        try:
+                            body = await asyncio.wait_for(result, gateway["result_timeout"])
+                            status_code = 200
+                        except asyncio.TimeoutError:
+                            counters["no_result"] += 1
+                            exc = RuntimeError(
+                                f"no result within {gateway['result_timeout']:g}s")
+                    else:
+                        counters["rejected"] += 1
+                        exc = RuntimeError("rejected by gateway (circuit breaker open "
+                                           "or NATS publish failed)")
+                except Exception as e:
+                    exc = e
+                finally:
+                    waiting.pop(frame_id, None)
+                    if handle is not None:
+                        handle.cancel()
+            latency_ms = (time.monotonic() - t0) * 1000
+            row = phase["record"](item, frame_id, status_code, body, exc, latency_ms, start_ts)
+            row.update(path=path, probe_id=probe_id, accepted=accepted, ack_latency_ms=ack_ms)
+            writer.writerow(row)
+            bar.update(1)
+            bar.set_postfix(**phase["postfix"](), rej=counters["rejected"], refresh=False)
+        finally:
+            slots.release()
+
+    build = functools.partial(build_capture_frame, gateway["pb2"], phase)
+    async with aiohttp.ClientSession() as session:
+        connected = asyncio.Event()
+        watcher = asyncio.create_task(
+            watch_results(session, gateway["ws_url"], waiting, connected))
+        opened = asyncio.create_task(connected.wait())
+        done, _ = await asyncio.wait([watcher, opened], return_when=asyncio.FIRST_COMPLETED)
+        if watcher in done:
+            opened.cancel()
+            watcher.result()  # raises the connection error
+        client = await open_gateway_client(path, gateway["target"], gateway["channels"],
+                                           gateway["pb2_grpc"])
+        try:
+            with ThreadPoolExecutor(max_workers=PREFETCH_THREADS) as pool:
+                producer = asyncio.create_task(prefetch(phase["items"], build, ready, pool))
+                await dispatch(ready, slots, functools.partial(send, client))
+                await producer
+        finally:
+            await client["close"]()
+            watcher.cancel()
+    bar.close()
+    return {**phase["summary"](), "gateway": counters}
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))], 2)
+
+
+def latency_profile(csv_path: Path, duration_sec: float) -> dict:
+    """Latency percentiles and throughput of the completed requests in a phase CSV."""
+    with open(csv_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    done = sorted(float(r["client_latency_ms"]) for r in rows if not r["error"])
+    acks = sorted(float(r["ack_latency_ms"]) for r in rows if r.get("ack_latency_ms"))
+    profile = {
+        "requests": len(rows),
+        "completed": len(done),
+        "throughput_rps": round(len(done) / duration_sec, 2) if duration_sec > 0 else 0,
+        "p50_ms": percentile(done, 50),
+        "p95_ms": percentile(done, 95),
+        "p99_ms": percentile(done, 99),
     }
+    if acks:
+        profile.update({"ack_p50_ms": percentile(acks, 50), "ack_p99_ms": percentile(acks, 99)})
+    return profile
 
 
 # ---------------------------------------------------------------------------
@@ -493,8 +883,72 @@ def main():
     parser.add_argument("--impostor-count", type=int,
                         default=int(os.environ.get("VNV_IMPOSTOR_COUNT", str(DEFAULT_IMPOSTOR_COUNT))),
                         help="Number of impostor subjects (from 800 up)")
+    parser.add_argument("--spike-threshold-ms", type=float,
+                        default=float(os.environ.get("VNV_SPIKE_THRESHOLD_MS", "0")),
+                        help="Report requests still in flight after this many ms to "
+                             "profile.py --spike-capture (default: 0 = off)")
+    parser.add_argument("--engine", choices=["sync", "async"],
+                        default=os.environ.get("VNV_ENGINE", "sync"),
+                        help="sync: one request at a time; async: asyncio + aiohttp with "
+                             "--concurrency requests in flight")
+    parser.add_argument("--concurrency", type=int,
+                        default=int(os.environ.get("VNV_CONCURRENCY", "256")),
+                        help="Requests in flight with --engine async (default: 256)")
+    parser.add_argument("--prefetch", type=int,
+                        default=int(os.environ.get("VNV_PREFETCH", "1024")),
+                        help="Request bodies built ahead with --engine async (default: 1024)")
+    parser.add_argument("--gateway",
+                        default=os.environ.get("VNV_GATEWAY", ""),
+                        help="Also run the probes through the gateway on these paths, "
+                             f"comma-separated: {', '.join(GATEWAY_PATHS)} (default: none)")
+    parser.add_argument("--gateway-grpc",
+                        default=os.environ.get("VNV_GATEWAY_GRPC", "localhost:9503"),
+                        help="Gateway gRPC address (capture protocol)")
+    parser.add_argument("--gateway-url",
+                        default=os.environ.get("VNV_GATEWAY_URL", "http://localhost:9504"),
+                        help="Gateway HTTP base URL (health + /ws/results)")
+    parser.add_argument("--grpc-channels", type=int,
+                        default=int(os.environ.get("VNV_GRPC_CHANNELS", "4")),
+                        help="gRPC channels in the gateway pool (default: 4)")
+    parser.add_argument("--result-timeout", type=float,
+                        default=float(os.environ.get("VNV_RESULT_TIMEOUT", "30")),
+                        help="Seconds to wait for a gateway result on /ws/results (default: 30)")
+    parser.add_argument("--proto", default=DEFAULT_PROTO,
+                        help="capture.proto used to generate the gateway stubs")
     args = parser.parse_args()
 
+    if args.engine == "async" and aiohttp is None:
+        print("ERROR: --engine async needs aiohttp (pip install aiohttp)", file=sys.stderr)
+        sys.exit(1)
+
+    gateway_paths = [p.strip() for p in args.gateway.split(",") if p.strip()]
+    unknown = sorted(set(gateway_paths) - set(GATEWAY_PATHS))
+    if unknown:
+        print(f"ERROR: unknown --gateway path(s): {', '.join(unknown)} "
+              f"(choose from {', '.join(GATEWAY_PATHS)})", file=sys.stderr)
+        sys.exit(1)
+    gateway = None
+    if gateway_paths:
+        if grpc is None or aiohttp is None:
+            print("ERROR: --gateway needs grpcio, grpcio-tools and aiohttp "
+                  "(pip install grpcio grpcio-tools aiohttp)", file=sys.stderr)
+            sys.exit(1)
+        try:
+            pb2, pb2_grpc = load_capture_stubs(args.proto)
+        except (FileNotFoundError, RuntimeError, ImportError) as e:
+            print(f"ERROR: cannot generate capture stubs: {e}", file=sys.stderr)
+            sys.exit(1)
+        gateway_url = args.gateway_url.rstrip("/")
+        gateway = {
+            "pb2": pb2,
+            "pb2_grpc": pb2_grpc,
+            "target": args.gateway_grpc,
+            "url": gateway_url,
+            "ws_url": gateway_url.replace("http", "ws", 1) + "/ws/results",
+            "channels": args.grpc_channels,
+            "result_timeout": args.result_timeout,
+        }
+
     dataset = Path(args.dataset)
     if not dataset.is_dir():
         print(f"ERROR: Dataset directory not found: {dataset}", file=sys.stderr)
@@ -517,6 +971,14 @@ def main():
         print(f"  For a clean benchmark, run 'make db-reset' and restart the service.")
         print(f"  Proceeding anyway — results will reflect current gallery state.")
 
+    if gateway is not None:
+        print(f"Checking gateway at {gateway['url']} (gRPC {gateway['target']}) ...")
+        gateway_health = check_gateway(gateway["url"])
+        print(f"  Gateway NATS connected: {gateway_health.get('nats_connected')}, "
+              f"circuit breaker: {gateway_health.get('circuit_breaker')}")
+        if not gateway_health.get("ready"):
+            print("  WARNING: Gateway is not ready — frames it rejects are recorded as such.")
+
     # ── Create timestamped output directory ──────────────────────────────
     timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
     run_dir = Path(args.output) / timestamp
@@ -543,25 +1005,50 @@ def main():
         "enrolled_subjects": f"000-{args.enroll_count - 1:03d}",
         "impostor_subjects": f"{IMPOSTOR_START:03d}-{IMPOSTOR_START + args.impostor_count - 1:03d}",
         "python_version": sys.version,
+        "engine": args.engine,
+        "concurrency": args.concurrency if args.engine == "async" else 1,
+        "gateway_paths": gateway_paths,
     }
+    if gateway is not None:
+        metadata.update({
+            "gateway_grpc": gateway["target"],
+            "gateway_url": gateway["url"],
+            "grpc_channels": gateway["channels"],
+            "gateway_breaker_before": gateway_health.get("circuit_breaker"),
+        })
     with open(run_dir / "metadata.json", "w") as f:
         json.dump(metadata, f, indent=2)
 
+    # ── Latency spike triggers ───────────────────────────────────────────
+    spike = None
+    if args.spike_threshold_ms > 0:
+        diagnostics_dir = run_dir / "diagnostics"
+        diagnostics_dir.mkdir(exist_ok=True)
+        spike = {
+            "path": diagnostics_dir / SPIKE_TRIGGER_FILE,
+            "threshold_ms": args.spike_threshold_ms,
+            "lock": threading.Lock(),
+            "fired": 0,
+        }
+        print(f"Spike triggers: requests > {args.spike_threshold_ms:.0f} ms -> {spike['path']}")
+
     # ── Phase 1: Enrollment ──────────────────────────────────────────────
     print("\n" + "=" * 60)
     print(f"PHASE 1: ENROLLMENT (subjects 000–{args.enroll_count - 1:03d}, first image per eye)")
     print("=" * 60)
 
     enrollment_fields = [
-        "subject_id", "eye_side", "image_file", "http_status",
+        "subject_id", "eye_side", "device_id", "image_file", "frame_id", "http_status",
         "template_id", "is_duplicate", "smpc_protected", "error", "latency_ms",
+        "start_ts", "end_ts",
     ]
     enrollment_file = open(run_dir / "enrollment.csv", "w", newline="")
     enrollment_writer = csv.DictWriter(enrollment_file, fieldnames=enrollment_fields)
     enrollment_writer.writeheader()
 
     t_enroll_start = time.monotonic()
-    enroll_stats = run_enrollment(dataset, api_url, enrollment_writer, enroll_range, show_progress)
+    enroll_stats = execute_phase(args, enrollment_phase(dataset, enroll_range), api_url,
+                                 enrollment_writer, show_progress, spike)
     t_enroll_end = time.monotonic()
     enrollment_file.close()
 
@@ -584,17 +1071,19 @@ def main():
     print("=" * 60)
 
     verify_fields = [
-        "test_type", "subject_id", "eye_side", "image_file",
+        "test_type", "subject_id", "eye_side", "device_id", "image_file", "frame_id",
         "expected_identity", "is_match", "matched_identity_id",
         "hamming_distance", "best_rotation",
         "server_latency_ms", "client_latency_ms", "error", "correct",
+        "start_ts", "end_ts",
     ]
     genuine_file = open(run_dir / "genuine.csv", "w", newline="")
     genuine_writer = csv.DictWriter(genuine_file, fieldnames=verify_fields)
     genuine_writer.writeheader()
 
     t_genuine_start = time.monotonic()
-    genuine_stats = run_genuine_verification(dataset, api_url, genuine_writer, enroll_range, show_progress)
+    genuine_stats = execute_phase(args, genuine_phase(dataset, enroll_range), api_url,
+                                  genuine_writer, show_progress, spike)
     t_genuine_end = time.monotonic()
     genuine_file.close()
 
@@ -618,7 +1107,8 @@ def main():
     impostor_writer.writeheader()
 
     t_impostor_start = time.monotonic()
-    impostor_stats = run_impostor_verification(dataset, api_url, impostor_writer, impostor_range, show_progress)
+    impostor_stats = execute_phase(args, impostor_phase(dataset, impostor_range), api_url,
+                                   impostor_writer, show_progress, spike)
     t_impostor_end = time.monotonic()
     impostor_file.close()
 
@@ -631,6 +1121,38 @@ def main():
     print(f"  Pipeline failures: {impostor_stats['pipeline_fail']}")
     print(f"  Duration: {impostor_stats['duration_sec']}s")
 
+    # ── Phase 4: Gateway paths ───────────────────────────────────────────
+    paths = {"direct": {
+        "genuine": latency_profile(run_dir / "genuine.csv", genuine_stats["duration_sec"]),
+        "impostor": latency_profile(run_dir / "impostor.csv", impostor_stats["duration_sec"]),
+    }}
+    gateway_stats = {}
+    gateway_concurrency = args.concurrency if args.engine == "async" else 1
+    for path in gateway_paths:
+        print("\n" + "=" * 60)
+        print(f"PHASE 4: GATEWAY PATH '{path}' (genuine + impostor probes via {gateway['target']})")
+        print("=" * 60)
+        gateway_stats[path] = {}
+        paths[path] = {}
+        for name, phase in (("genuine", genuine_phase(dataset, enroll_range)),
+                            ("impostor", impostor_phase(dataset, impostor_range))):
+            csv_path = run_dir / f"{name}_{path}.csv"
+            with open(csv_path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=verify_fields + GATEWAY_FIELDS)
+                writer.writeheader()
+                t_start = time.monotonic()
+                stats = asyncio.run(run_phase_gateway(
+                    phase, path, gateway, writer, show_progress, spike,
+                    gateway_concurrency, args.prefetch))
+                stats["duration_sec"] = round(time.monotonic() - t_start, 2)
+            gateway_stats[path][name] = stats
+            paths[path][name] = latency_profile(csv_path, stats["duration_sec"])
+            counters = stats["gateway"]
+            print(f"\n{name.capitalize()} via {path}: {stats['total']} probes, "
+                  f"{counters['accepted']} accepted, {counters['rejected']} rejected, "
+                  f"{counters['no_result']} without result, {stats['duration_sec']}s")
+        gateway_stats[path]["breaker_after"] = check_gateway(gateway["url"]).get("circuit_breaker")
+
     # ── Save summary ─────────────────────────────────────────────────────
     summary = {
         "timestamp": timestamp,
@@ -643,6 +1165,11 @@ def main():
             + impostor_stats["duration_sec"], 2
         ),
     }
+    if spike is not None:
+        summary["spike_triggers"] = {"threshold_ms": spike["threshold_ms"], "fired": spike["fired"]}
+    if gateway_paths:
+        summary["gateway"] = gateway_stats
+        summary["paths"] = paths
     with open(run_dir / "summary.json", "w") as f:
         json.dump(summary, f, indent=2)
 
@@ -653,6 +1180,8 @@ def main():
     print(f"  Output: {run_dir}")
     print(f"  Total duration: {summary['total_duration_sec']}s")
     print(f"  Enrollment FTE: {enroll_stats['fte_rate']:.6f}")
+    if spike is not None:
+        print(f"  Latency spikes (> {spike['threshold_ms']:.0f} ms): {spike['fired']}")
 
     genuine_total_valid = genuine_stats["total"] - genuine_stats["pipeline_fail"]
     if genuine_total_valid > 0:
@@ -666,6 +1195,20 @@ def main():
         fmr = impostor_stats["false_positive"] / impostor_total_valid
         print(f"  Impostor FMR: {fmr:.6f} ({impostor_stats['false_positive']}/{impostor_total_valid})")
 
+    if gateway_paths:
+        print("\n  Latency by path (completed probes, client p50 / p99, throughput):")
+        for path, phases in paths.items():
+            for name, prof in phases.items():
+                if prof["p50_ms"] is None:
+                    print(f"    {path:<8} {name:<9} no completed probes")
+                    continue
+                line = (f"    {path:<8} {name:<9} {prof['p50_ms']:>9.2f} / {prof['p99_ms']:>9.2f} ms"
+                        f"  {prof['throughput_rps']:>8.2f} req/s")
+                direct = paths["direct"][name]["p50_ms"]
+                if path != "direct" and direct is not None:
+                    line += f"  hop {prof['p50_ms'] - direct:+.2f} ms p50, ack p50 {prof['ack_p50_ms']} ms"
+                print(line)
+
     if impostor_stats["false_positive"] > 0:
         print(f"\n  ⚠ WARNING: {impostor_stats['false_positive']} FALSE POSITIVES DETECTED")
         print(f"  This means unenrolled subjects were incorrectly matched.")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+EyeD capture protocol stubs for the V&V tools
+
+Generates the Python gRPC stubs for proto/capture.proto (the contract between
+capture devices and the gateway) with grpc_tools.protoc and imports them, so
+benchmark.py and the other V&V scripts talk to the gateway exactly as a capture
+device does. Stubs are generated into a cache directory keyed by the proto's
+hash and regenerated only when the proto changes.
+
+Usage:
+    from capture_proto import load_capture_stubs
+    pb2, pb2_grpc = load_capture_stubs()
+
+    python scripts/vnv/capture_proto.py --proto proto/capture.proto   # generate only
+"""
+
+import argparse
+import hashlib
+import importlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Repo checkout: scripts/vnv/../../proto; the vnv container mounts it at /proto
+DEFAULT_PROTO = os.environ.get(
+    "VNV_PROTO", str(Path(__file__).resolve().parents[2] / "proto" / "capture.proto"))
+DEFAULT_STUB_DIR = Path(tempfile.gettempdir()) / "eyed-vnv-stubs"
+
+
+def generate_stubs(proto: Path, out_dir: Path) -> Path:
+    """Run protoc for proto into out_dir/<hash>/ (skipped if already there)."""
+    from grpc_tools import protoc  # grpcio-tools, only needed here
+
+    digest = hashlib.sha256(proto.read_bytes()).hexdigest()[:16]
+    target = out_dir / digest
+    if (target / f"{proto.stem}_pb2_grpc.py").exists():
+        return target
+    target.mkdir(parents=True, exist_ok=True)
+    rc = protoc.main([
+        "grpc_tools.protoc",
+        f"-I{proto.parent}",
+        f"--python_out={target}",
+        f"--grpc_python_out={target}",
+        str(proto),
+    ])
+    if rc != 0:
+        raise RuntimeError(f"protoc failed for {proto} (exit {rc})")
+    return target
+
+
+def load_capture_stubs(proto: str | Path = DEFAULT_PROTO, out_dir: Path = DEFAULT_STUB_DIR):
+    """Return the (capture_pb2, capture_pb2_grpc) modules for proto."""
+    proto = Path(proto)
+    if not proto.is_file():
+        raise FileNotFoundError(f"capture proto not found: {proto} (set --proto or VNV_PROTO)")
+    target = generate_stubs(proto, out_dir)
+    if str(target) not in sys.path:
+        sys.path.insert(0, str(target))
+    return (importlib.import_module(f"{proto.stem}_pb2"),
+            importlib.import_module(f"{proto.stem}_pb2_grpc"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate EyeD capture gRPC stubs")
+    parser.add_argument("--proto", default=DEFAULT_PROTO, help="Path to capture.proto")
+    parser.add_argument("--out", default=str(DEFAULT_STUB_DIR), help="Stub cache directory")
+    args = parser.parse_args()
+    print(generate_stubs(Path(args.proto), Path(args.out)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+EyeD V&V Capture-Device Fleet Simulator
+
+Spawns N virtual capture devices that behave like capture/src (the C++
+capture device) and drives the gateway with them over the capture gRPC
+protocol (proto/capture.proto, stubs generated by capture_proto.py):
+
+- each device replays one dataset subject's images as a frame stream at
+  --fps, with uniform +/- --jitter-ms on every frame interval
+- frames pass through a 3-frame ring buffer (full -> dropped_buffer, like
+  RingBuffer<Frame, 4>) and the Sobel quality gate (score below
+  --quality-threshold -> dropped_quality)
+- frames go out on the device's own StreamFrames stream, one in flight; an
+  ack with accepted=false is backpressure (rejected) and the device backs
+  off 200 ms, a transport error reopens the stream with exponential backoff
+- results are collected from the gateway's /ws/results WebSocket and
+  matched by (device_id, frame_id) for end-to-end latency (capture -> result)
+
+The fleet is scaled through --devices stages (e.g. 1,4,16,64), each run for
+--duration seconds. Outputs, in reports/vnv/fleet/<timestamp>/:
+
+- frames.csv: every captured frame: stage, device, outcome, quality score,
+  ack latency, queue depth, end-to-end latency
+- devices.csv: per stage and device: outcome counts, latency percentiles
+- timeline.csv: once a second: circuit breaker state, gateway connected
+  devices / frames processed, frames awaiting a result
+- summary.json: per stage: offered fps, drop / reject rates, result
+  throughput, end-to-end and ack latency percentiles, max queue depth
+- plots/fleet_scaling.png: latency and loss against device count
+
+Usage:
+    python scripts/vnv/fleet.py \\
+        --dataset /path/to/CASIA-Iris-Thousand \\
+        --gateway-grpc localhost:9503 --gateway-url http://localhost:9504 \\
+        --devices 1,4,16,64 --fps 30 --jitter-ms 5 --duration 30
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import grpc
+except ImportError:
+    grpc = None
+
+from capture_proto import DEFAULT_PROTO, load_capture_stubs
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+DEVICE_PREFIX = "vnv-fleet"
+EYE_SIDES = {"L": "left", "R": "right"}
+RING_SLOTS = 3                # RingBuffer<Frame, 4> holds N - 1 frames
+REJECT_BACKOFF_SEC = 0.2      # capture device sleeps 200 ms after accepted=false
+RECONNECT_BASE_SEC = 0.5      # [gateway] reconnect_base_ms
+RECONNECT_MAX_SEC = 30.0      # [gateway] reconnect_max_ms
+SAMPLE_INTERVAL_SEC = 1.0
+
+# Final outcome of a captured frame
+OUTCOMES = ["result", "no_result", "rejected", "dropped_quality", "dropped_buffer",
+            "error", "unsent"]
+
+FRAME_FIELDS = [
+    "devices", "device_id", "frame_id", "image_file", "eye_side", "quality_score",
+    "outcome", "capture_ts", "ack_latency_ms", "queue_depth", "e2e_latency_ms",
+    "is_match", "error",
+]
+DEVICE_FIELDS = ["devices", "device_id", "captured", *OUTCOMES,
+                 "e2e_p50_ms", "e2e_p99_ms", "ack_p50_ms"]
+TIMELINE_FIELDS = ["ts", "devices", "circuit_breaker", "connected_devices",
+                   "frames_processed", "awaiting_result"]
+
+
+# ---------------------------------------------------------------------------
+# Dataset
+# ---------------------------------------------------------------------------
+
+def sobel_quality(path: Path) -> float:
+    """The capture device's quality score: mean Sobel magnitude / (255 * sqrt(2))."""
+    try:
+        with Image.open(path) as img:
+            gray = np.asarray(img.convert("L"), dtype=np.float32)
+    except OSError:
+        return 0.0  # undecodable: the quality gate drops it
+    if gray.shape[0] < 3 or gray.shape[1] < 3:
+        return 0.0
+    gx = ((gray[:-2, 2:] + 2 * gray[1:-1, 2:] + gray[2:, 2:])
+          - (gray[:-2, :-2] + 2 * gray[1:-1, :-2] + gray[2:, :-2]))
+    gy = ((gray[2:, :-2] + 2 * gray[2:, 1:-1] + gray[2:, 2:])
+          - (gray[:-2, :-2] + 2 * gray[:-2, 1:-1] + gray[:-2, 2:]))
+    return float(np.hypot(gx, gy).mean() / (255.0 * np.sqrt(2.0)))
+
+
+def load_frame(path: Path, eye_side: str) -> dict:
+    return {"file": path.name, "eye_side": eye_side, "jpeg": path.read_bytes(),
+            "quality": sobel_quality(path)}
+
+
+def load_fleet_images(dataset: Path, max_devices: int) -> list[list[dict]]:
+    """Frames for each device: device k replays subject k (both eyes, in order)."""
+    subjects = sorted(d for d in dataset.iterdir() if d.is_dir())
+    if not subjects:
+        raise FileNotFoundError(f"no subject directories in {dataset}")
+    jobs = []
+    for k in range(max_devices):
+        subj = subjects[k % len(subjects)]
+        jobs.append([(p, eye_side) for eye_code, eye_side in EYE_SIDES.items()
+                     for p in sorted((subj / eye_code).glob("*.jpg"))])
+    paths = {p: eye for job in jobs for p, eye in job}
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        frames = dict(zip(paths, pool.map(load_frame, paths, paths.values())))
+    devices = [[frames[p] for p, _ in job] for job in jobs]
+    empty = [k for k, imgs in enumerate(devices) if not imgs]
+    if empty:
+        raise FileNotFoundError(f"no images for device(s) {empty} under {dataset}")
+    return devices
+
+
+# ---------------------------------------------------------------------------
+# Virtual devices
+# ---------------------------------------------------------------------------
+
+def device_id(k: int) -> str:
+    return f"{DEVICE_PREFIX}-{k:03d}"
+
+
+async def run_device(device: dict, frames: list[dict], pb2, stub, cfg: dict,
+                     stop: asyncio.Event, rows: list, waiting: dict) -> None:
+    """One virtual camera: a capture loop and a gate + send loop sharing a ring buffer."""
+    ring = deque()
+    ready = asyncio.Event()
+
+    async def capture():
+        interval = 1.0 / cfg["fps"]
+        jitter = cfg["jitter_ms"] / 1000
+        await asyncio.sleep(random.uniform(0, interval))  # devices are not in lockstep
+        i = 0
+        while not stop.is_set():
+            frame = frames[i % len(frames)]
+            i += 1
+            row = {
+                "devices": cfg["devices"],
+                "device_id": device["id"],
+                "frame_id": device["next_frame"],
+                "image_file": frame["file"],
+                "eye_side": frame["eye_side"],
+                "quality_score": f"{frame['quality']:.4f}",
+                "outcome": "unsent",
+                "capture_ts": f"{time.time():.6f}",
+                "ack_latency_ms": "",
+                "queue_depth": "",
+                "e2e_latency_ms": "",
+                "is_match": "",
+                "error": "",
+                "_t0": time.monotonic(),
+            }
+            device["next_frame"] = (device["next_frame"] + 1) & 0xFFFFFFFF
+            rows.append(row)
+            if len(ring) >= RING_SLOTS:
+                row["outcome"] = "dropped_buffer"
+            else:
+                ring.append((row, frame))
+                ready.set()
+            await asyncio.sleep(max(0.0, interval + random.uniform(-jitter, jitter)))
+
+    async def send():
+        call = None
+        backoff = RECONNECT_BASE_SEC
+        while not stop.is_set():
+            if not ring:
+                ready.clear()
+                try:
+                    await asyncio.wait_for(ready.wait(), 0.1)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            row, frame = ring.popleft()
+            if frame["quality"] < cfg["quality_threshold"]:
+                row["outcome"] = "dropped_quality"
+                continue
+            if call is None:
+                call = stub.StreamFrames()
+            t_send = time.monotonic()
+            try:
+                await call.write(pb2.CaptureFrame(
+                    jpeg_data=frame["jpeg"],
+                    quality_score=frame["quality"],
+                    timestamp_us=int(float(row["capture_ts"]) * 1_000_000),
+                    frame_id=row["frame_id"],
+                    device_id=device["id"],
+                    is_nir=True,
+                    eye_side=frame["eye_side"],
+                ))
+                ack = await call.read()
+                if ack == grpc.aio.EOF:
+                    raise ConnectionError("gateway closed the stream")
+            except Exception as e:
+                row["outcome"] = "error"
+                row["error"] = (f"{e.code().name}: {e.details()}"
+                                if isinstance(e, grpc.aio.AioRpcError) else str(e))
+                call.cancel()
+                call = None
+                device["reconnects"] += 1
+                try:
+                    await asyncio.wait_for(stop.wait(), backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, RECONNECT_MAX_SEC)
+                continue
+            backoff = RECONNECT_BASE_SEC
+            row["ack_latency_ms"] = f"{(time.monotonic() - t_send) * 1000:.2f}"
+            row["queue_depth"] = ack.queue_depth
+            if ack.accepted:
+                row["outcome"] = "no_result"  # until the result arrives
+                waiting[(device["id"], str(row["frame_id"]))] = row
+            else:
+                row["outcome"] = "rejected"
+                await asyncio.sleep(REJECT_BACKOFF_SEC)
+        if call is not None:
+            try:
+                await call.done_writing()
+            except Exception:
+                pass
+            call.cancel()
+
+    await asyncio.gather(capture(), send())
+
+
+# ---------------------------------------------------------------------------
+# Gateway results and status
+# ---------------------------------------------------------------------------
+
+async def watch_results(session, ws_url: str, waiting: dict, connected: asyncio.Event) -> None:
+    """Complete waiting[(device_id, frame_id)] rows from the gateway's result WebSocket."""
+    async with session.ws_connect(ws_url, heartbeat=30) as ws:
+        connected.set()
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            try:
+                result = json.loads(msg.data)
+            except ValueError:
+                continue
+            if not isinstance(result, dict):
+                continue
+            row = waiting.pop((result.get("device_id"), str(result.get("frame_id", ""))), None)
+            if row is None:
+                continue
+            row["outcome"] = "result"
+            row["e2e_latency_ms"] = f"{(time.monotonic() - row['_t0']) * 1000:.2f}"
+            match = result.get("match")
+            row["is_match"] = match.get("is_match", False) if isinstance(match, dict) else False
+            row["error"] = result.get("error") or ""
+
+
+async def gateway_status(session, gateway_url: str, stub, pb2) -> dict:
+    """Breaker state (HTTP /health/ready) and GetStatus counters; {} fields on failure."""
+    status = {"circuit_breaker": "", "connected_devices": "", "frames_processed": ""}
+    try:
+        async with session.get(f"{gateway_url}/health/ready",
+                               timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            status["circuit_breaker"] = (await resp.json(content_type=None)).get(
+                "circuit_breaker", "")
+    except Exception:
+        pass
+    try:
+        reply = await stub.GetStatus(pb2.Empty(), timeout=5)
+        status["connected_devices"] = reply.connected_devices
+        status["frames_processed"] = reply.frames_processed
+    except Exception:
+        pass
+    return status
+
+
+async def sample_gateway(session, gateway_url: str, stub, pb2, devices: int, waiting: dict,
+                         stop: asyncio.Event, timeline: list) -> None:
+    while not stop.is_set():
+        status = await gateway_status(session, gateway_url, stub, pb2)
+        timeline.append({"ts": f"{time.time():.3f}", "devices": devices,
+                         "awaiting_result": len(waiting), **status})
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL_SEC)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))], 2)
+
+
+def latencies(rows: list[dict], field: str) -> list[float]:
+    return sorted(float(r[field]) for r in rows if r[field] != "")
+
+
+def stage_summary(n_devices: int, rows: list[dict], cfg: dict, duration_sec: float,
+                  timeline: list[dict]) -> dict:
+    counts = Counter(r["outcome"] for r in rows)
+    captured = len(rows)
+    sent = sum(counts[o] for o in ("result", "no_result", "rejected"))
+    e2e = latencies(rows, "e2e_latency_ms")
+    acks = latencies(rows, "ack_latency_ms")
+    depths = [int(r["queue_depth"]) for r in rows if r["queue_depth"] != ""]
+    breaker = Counter(s["circuit_breaker"] for s in timeline if s["circuit_breaker"])
+    return {
+        "devices": n_devices,
+        "offered_fps": round(n_devices * cfg["fps"], 2),
+        "duration_sec": round(duration_sec, 2),
+        "captured": captured,
+        **{o: counts.get(o, 0) for o in OUTCOMES},
+        "drop_rate": round((counts["dropped_buffer"] + counts["dropped_quality"])
+                           / captured, 4) if captured else 0,
+        "reject_rate": round(counts["rejected"] / sent, 4) if sent else 0,
+        "results_per_sec": round(counts["result"] / duration_sec, 2) if duration_sec > 0 else 0,
+        "e2e_p50_ms": percentile(e2e, 50),
+        "e2e_p95_ms": percentile(e2e, 95),
+        "e2e_p99_ms": percentile(e2e, 99),
+        "ack_p50_ms": percentile(acks, 50),
+        "ack_p99_ms": percentile(acks, 99),
+        "queue_depth_max": max(depths, default=0),
+        "breaker_samples": dict(breaker),
+    }
+
+
+def device_rows(n_devices: int, rows: list[dict]) -> list[dict]:
+    by_device = {}
+    for r in rows:
+        by_device.setdefault(r["device_id"], []).append(r)
+    out = []
+    for dev, dev_rows in sorted(by_device.items()):
+        counts = Counter(r["outcome"] for r in dev_rows)
+        e2e = latencies(dev_rows, "e2e_latency_ms")
+        out.append({
+            "devices": n_devices,
+            "device_id": dev,
+            "captured": len(dev_rows),
+            **{o: counts.get(o, 0) for o in OUTCOMES},
+            "e2e_p50_ms": percentile(e2e, 50),
+            "e2e_p99_ms": percentile(e2e, 99),
+            "ack_p50_ms": percentile(latencies(dev_rows, "ack_latency_ms"), 50),
+        })
+    return out
+
+
+async def run_stage(n_devices: int, fleet: list[dict], images: list[list[dict]], stubs,
+                    cfg: dict, session, waiting: dict, timeline: list) -> tuple[list[dict], float]:
+    """Run n_devices virtual cameras for cfg['duration'] s, then wait for late results."""
+    pb2, pb2_grpc = stubs
+    rows = []
+    stop = asyncio.Event()
+    stage_cfg = {**cfg, "devices": n_devices}
+    # One channel per device: real devices are separate hosts
+    channels = [grpc.aio.insecure_channel(cfg["target"]) for _ in range(n_devices)]
+    status_channel = grpc.aio.insecure_channel(cfg["target"])
+    status_stub = pb2_grpc.CaptureServiceStub(status_channel)
+    sampler = asyncio.create_task(sample_gateway(
+        session, cfg["gateway_url"], status_stub, pb2, n_devices, waiting, stop, timeline))
+    t_start = time.monotonic()
+    devices = [asyncio.create_task(run_device(
+        fleet[k], images[k], pb2, pb2_grpc.CaptureServiceStub(channels[k]), stage_cfg, stop,
+        rows, waiting)) for k in range(n_devices)]
+    await asyncio.sleep(cfg["duration"])
+    stop.set()
+    await asyncio.gather(*devices)
+    duration = time.monotonic() - t_start
+
+    deadline = time.monotonic() + cfg["result_timeout"]
+    while waiting and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    waiting.clear()  # whatever is left stays no_result
+    await sampler
+    for ch in channels + [status_channel]:
+        await ch.close()
+    return rows, duration
+
+
+# ---------------------------------------------------------------------------
+# Plot
+# ---------------------------------------------------------------------------
+
+def plot_scaling(stages: list[dict], path: Path) -> None:
+    devices = [s["devices"] for s in stages]
+    fig, (ax_lat, ax_loss) = plt.subplots(1, 2, figsize=(12, 4.5))
+    for key, label in (("e2e_p50_ms", "e2e p50"), ("e2e_p99_ms", "e2e p99"),
+                       ("ack_p99_ms", "ack p99")):
+        ax_lat.plot(devices, [s[key] if s[key] is not None else np.nan for s in stages],
+                    marker="o", label=label)
+    ax_lat.set_xlabel("Devices")
+    ax_lat.set_ylabel("Latency (ms)")
+    ax_lat.set_title("Latency vs. fleet size")
+    ax_lat.legend()
+    for key, label in (("drop_rate", "dropped (buffer + quality)"),
+                       ("reject_rate", "rejected (backpressure)")):
+        ax_loss.plot(devices, [s[key] * 100 for s in stages], marker="o", label=label)
+    no_result = [s["no_result"] / s["captured"] * 100 if s["captured"] else 0 for s in stages]
+    ax_loss.plot(devices, no_result, marker="o", label="no result")
+    ax_loss.set_xlabel("Devices")
+    ax_loss.set_ylabel("% of frames")
+    ax_loss.set_title("Frame loss vs. fleet size")
+    ax_loss.legend()
+    for ax in (ax_lat, ax_loss):
+        ax.set_xscale("log", base=2)
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+async def run_fleet(args: argparse.Namespace, stages: list[int], images: list[list[dict]],
+                    stubs, run_dir: Path) -> list[dict]:
+    gateway_url = args.gateway_url.rstrip("/")
+    cfg = {
+        "target": args.gateway_grpc,
+        "gateway_url": gateway_url,
+        "fps": args.fps,
+        "jitter_ms": args.jitter_ms,
+        "quality_threshold": args.quality_threshold,
+        "duration": args.duration,
+        "result_timeout": args.result_timeout,
+    }
+    fleet = [{"id": device_id(k), "next_frame": 0, "reconnects": 0}
+             for k in range(max(stages))]
+    waiting = {}
+    summaries = []
+    frames_file = open(run_dir / "frames.csv", "w", newline="")
+    devices_file = open(run_dir / "devices.csv", "w", newline="")
+    frames_writer = csv.DictWriter(frames_file, fieldnames=FRAME_FIELDS, extrasaction="ignore")
+    devices_writer = csv.DictWriter(devices_file, fieldnames=DEVICE_FIELDS)
+    frames_writer.writeheader()
+    devices_writer.writeheader()
+    timeline = []
+
+    async with aiohttp.ClientSession() as session:
+        connected = asyncio.Event()
+        watcher = asyncio.create_task(watch_results(
+            session, gateway_url.replace("http", "ws", 1) + "/ws/results", waiting, connected))
+        opened = asyncio.create_task(connected.wait())
+        done, _ = await asyncio.wait([watcher, opened], return_when=asyncio.FIRST_COMPLETED)
+        if watcher in done:
+            opened.cancel()
+            watcher.result()  # raises the connection error
+        try:
+            for n in stages:
+                print(f"\nStage: {n} device(s) x {args.fps:g} fps for {args.duration:g}s ...")
+                rows, duration = await run_stage(n, fleet, images, stubs, cfg, session,
+                                                 waiting, timeline)
+                stage = stage_summary(n, rows, cfg, duration,
+                                      [s for s in timeline if s["devices"] == n])
+                summaries.append(stage)
+                frames_writer.writerows(rows)
+                devices_writer.writerows(device_rows(n, rows))
+                print(f"  captured {stage['captured']}, results {stage['result']} "
+                      f"({stage['results_per_sec']}/s), no result {stage['no_result']}, "
+                      f"rejected {stage['rejected']}, dropped quality {stage['dropped_quality']} "
+                      f"/ buffer {stage['dropped_buffer']}, errors {stage['error']}")
+                print(f"  e2e p50 {stage['e2e_p50_ms']} ms, p99 {stage['e2e_p99_ms']} ms, "
+                      f"ack p99 {stage['ack_p99_ms']} ms, breaker {stage['breaker_samples']}")
+        finally:
+            watcher.cancel()
+            frames_file.close()
+            devices_file.close()
+            with open(run_dir / "timeline.csv", "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=TIMELINE_FIELDS)
+                writer.writeheader()
+                writer.writerows(timeline)
+    for dev in fleet:
+        if dev["reconnects"]:
+            print(f"  {dev['id']}: {dev['reconnects']} stream reconnect(s)")
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EyeD V&V Capture-Device Fleet Simulator")
+    parser.add_argument("--dataset",
+                        default=os.environ.get("VNV_DATASET", ""),
+                        help="Path to CASIA-Iris-Thousand dataset root (one subject per device)")
+    parser.add_argument("--output",
+                        default=os.environ.get("VNV_OUTPUT", "reports/vnv/"),
+                        help="Output directory root; runs go to <output>/fleet/<timestamp>")
+    parser.add_argument("--gateway-grpc",
+                        default=os.environ.get("VNV_GATEWAY_GRPC", "localhost:9503"),
+                        help="Gateway gRPC address (capture protocol)")
+    parser.add_argument("--gateway-url",
+                        default=os.environ.get("VNV_GATEWAY_URL", "http://localhost:9504"),
+                        help="Gateway HTTP base URL (health + /ws/results)")
+    parser.add_argument("--devices",
+                        default=os.environ.get("VNV_FLEET_DEVICES", "1,4,16"),
+                        help="Fleet sizes to run, one stage each, comma-separated (default: 1,4,16)")
+    parser.add_argument("--fps", type=float,
+                        default=float(os.environ.get("VNV_FLEET_FPS", "30")),
+                        help="Frames per second per device (default: 30, as capture.toml)")
+    parser.add_argument("--jitter-ms", type=float,
+                        default=float(os.environ.get("VNV_FLEET_JITTER_MS", "5")),
+                        help="Uniform +/- jitter on each frame interval (default: 5)")
+    parser.add_argument("--duration", type=float,
+                        default=float(os.environ.get("VNV_FLEET_DURATION", "30")),
+                        help="Seconds per stage (default: 30)")
+    parser.add_argument("--quality-threshold", type=float,
+                        default=float(os.environ.get("EYED_QUALITY_THRESHOLD", "0.05")),
+                        help="Quality gate: frames scoring below are dropped (default: 0.05)")
+    parser.add_argument("--result-timeout", type=float, default=10.0,
+                        help="Seconds to wait for outstanding results after a stage (default: 10)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed for start offsets and jitter (default: 0)")
+    parser.add_argument("--proto", default=DEFAULT_PROTO,
+                        help="capture.proto used to generate the gateway stubs")
+    args = parser.parse_args()
+
+    if grpc is None or aiohttp is None:
+        print("ERROR: fleet.py needs grpcio, grpcio-tools and aiohttp "
+              "(pip install grpcio grpcio-tools aiohttp)", file=sys.stderr)
+        sys.exit(1)
+    try:
+        stages = [int(n) for n in args.devices.split(",") if n.strip()]
+    except ValueError:
+        stages = []
+    if not stages or min(stages) < 1:
+        print(f"ERROR: --devices must be positive integers, got {args.devices!r}", file=sys.stderr)
+        sys.exit(1)
+    if args.fps <= 0:
+        print("ERROR: --fps must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    dataset = Path(args.dataset)
+    if not dataset.is_dir():
+        print(f"ERROR: Dataset directory not found: {dataset}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        stubs = load_capture_stubs(args.proto)
+    except (FileNotFoundError, RuntimeError, ImportError) as e:
+        print(f"ERROR: cannot generate capture stubs: {e}", file=sys.stderr)
+        sys.exit(1)
+    random.seed(args.seed)
+
+    print(f"Loading frames for {max(stages)} device(s) from {dataset} ...")
+    images = load_fleet_images(dataset, max(stages))
+    scores = [f["quality"] for imgs in images for f in imgs]
+    gated = sum(q < args.quality_threshold for q in scores)
+    print(f"  {len(scores)} frames, quality {min(scores):.3f}-{max(scores):.3f}, "
+          f"{gated} below threshold {args.quality_threshold}")
+
+    timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
+    fleet_root = Path(args.output) / "fleet"
+    run_dir = fleet_root / timestamp
+    plots_dir = run_dir / "plots"
+    plots_dir.mkdir(parents=True, exist_ok=True)
+    latest_link = fleet_root / "latest"
+    if latest_link.is_symlink() or latest_link.exists():
+        latest_link.unlink()
+    latest_link.symlink_to(timestamp)
+    print(f"Output directory: {run_dir}")
+
+    stage_summaries = asyncio.run(run_fleet(args, stages, images, stubs, run_dir))
+
+    summary = {
+        "timestamp": timestamp,
+        "gateway_grpc": args.gateway_grpc,
+        "gateway_url": args.gateway_url,
+        "dataset_path": str(dataset),
+        "fps": args.fps,
+        "jitter_ms": args.jitter_ms,
+        "duration_sec": args.duration,
+        "quality_threshold": args.quality_threshold,
+        "seed": args.seed,
+        "stages": stage_summaries,
+    }
+    with open(run_dir / "summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    plot_scaling(stage_summaries, plots_dir / "fleet_scaling.png")
+
+    print("\n" + "=" * 60)
+    print("FLEET SIMULATION COMPLETE")
+    print("=" * 60)
+    print(f"  Output: {run_dir}")
+    print(f"  {'devices':>7} {'fps in':>8} {'results/s':>10} {'e2e p50':>9} {'e2e p99':>9} "
+          f"{'drop %':>7} {'reject %':>8} {'no res':>7}")
+    for s in stage_summaries:
+        fmt = lambda v: f"{v:>9.1f}" if v is not None else f"{'-':>9}"
+        print(f"  {s['devices']:>7} {s['offered_fps']:>8.1f} {s['results_per_sec']:>10.2f} "
+              f"{fmt(s['e2e_p50_ms'])} {fmt(s['e2e_p99_ms'])} {s['drop_rate'] * 100:>7.2f} "
+              f"{s['reject_rate'] * 100:>8.2f} {s['no_result']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,25 @@
 EyeD V&V HTML Report Generator
 
 Reads summary.json, metadata.json, and plots from a benchmark run directory
-and produces a self-contained report.html with all images embedded as base64.
+and produces report.html in one of two modes:
+
+- inline (default): self-contained single file with all images embedded as
+  base64, suitable for archiving.
+- lazy: images are referenced from plots/ (PNG or SVG) and lazy-loaded, the
+  per-subject heatmap tile pyramid gets a pan/zoom viewer, and large tables
+  (per-subject accuracy, per-request cost) are paginated in the browser from
+  a gzip-compressed JSON data file (report_data.js). Small and fast to open
+  and diff for large runs; must stay next to plots/.
 
 Usage:
     python scripts/vnv/report.py --input reports/vnv/latest
+    python scripts/vnv/report.py --input reports/vnv/latest --mode lazy
 """
 
 import argparse
 import base64
+import csv
+import gzip
 import json
 import sys
 from datetime import datetime
@@ -29,10 +40,83 @@ def img_to_base64(path: Path) -> str:
     with open(path, "rb") as f:
         data = base64.b64encode(f.read()).decode("ascii")
     suffix = path.suffix.lstrip(".")
-    mime = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}.get(suffix, "image/png")
+    mime = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg",
+            "svg": "image/svg+xml"}.get(suffix, "image/png")
     return f"data:{mime};base64,{data}"
 
 
+def find_plot(plots_dir: Path, name: str, plots: dict | None = None) -> Path | None:
+    """
+    Plot file for name. plots is summary.json's {name: file} of the plots the
+    last analyze.py run produced (in its --plot-format); a plot missing from
+    it is stale and not shown. Summaries without it fall back to the newer of
+    the SVG and PNG files.
+    """
+    if plots is not None:
+        return plots_dir / plots[name] if name in plots else None
+    candidates = [p for p in (plots_dir / f"{name}.svg", plots_dir / f"{name}.png") if p.exists()]
+    if not candidates:
+        return plots_dir / f"{name}.png"
+    return max(candidates, key=lambda p: p.stat().st_mtime)
+
+
+def img_src(path: Path, run_dir: Path, mode: str) -> str:
+    """Image src: base64 data URI (inline mode) or a path relative to report.html (lazy mode)."""
+    if mode == "inline":
+        return img_to_base64(path)
+    if not path.exists():
+        return ""
+    return path.relative_to(run_dir).as_posix()
+
+
+def write_data_script(tables: dict, out_path: Path) -> int:
+    """
+    Write tables ({id: {"columns": [...], "rows": [[...], ...]}}) as gzip'd
+    JSON wrapped in a <script>-loadable file. A script tag (unlike fetch) also
+    works when the report is opened from file://. Returns the file size.
+    """
+    payload = gzip.compress(json.dumps(tables, separators=(",", ":")).encode(), 9)
+    with open(out_path, "w") as f:
+        f.write("window.VNV_DATA_GZ = \"")
+        f.write(base64.b64encode(payload).decode("ascii"))
+        f.write("\";\n")
+    return out_path.stat().st_size
+
+
+def tile_manifest(plots_dir: Path, run_dir: Path, plots: dict | None = None) -> dict | None:
+    """
+    The heatmap tile pyramid manifest from analyze.py, with "tiles" rewritten
+    relative to report.html for the lazy-mode viewer. None when there are no
+    tiles (or the last analyze.py run did not produce them).
+    """
+    name = "subject_heatmap_tiles"
+    if plots is not None:
+        if name not in plots:
+            return None
+        path = plots_dir / plots[name]
+    else:
+        path = plots_dir / f"{name}.json"
+    if not path.exists():
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest["tiles"] = (path.parent / manifest["tiles"]).relative_to(run_dir).as_posix()
+    return manifest
+
+
+def csv_table(path: Path) -> dict | None:
+    """Load a CSV produced by analyze.py as a {"columns", "rows"} table."""
+    if not path.exists():
+        return None
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        columns = next(reader, None)
+        if columns is None:
+            return None
+        rows = [row for row in reader]
+    return {"columns": columns, "rows": rows}
+
+
 def fmt_rate(value, digits=6):
     """Format a rate value with full precision."""
     if value is None:
@@ -106,6 +190,11 @@ HTML_TEMPLATE = r"""<!DOCTYPE html>
   .plot-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; }
   .plot-grid img { width: 100%; border-radius: 6px; border: 1px solid var(--border); }
   .plot-full img { width: 100%; border-radius: 6px; border: 1px solid var(--border); }
+  .tile-viewer { position: relative; height: 480px; border-radius: 6px; border: 1px solid var(--border);
+                 overflow: hidden; cursor: grab; background: #fff; }
+  .tile-viewer canvas { display: block; width: 100%; height: 100%; image-rendering: pixelated; }
+  .tile-viewer .tile-info { position: absolute; left: 0.5rem; bottom: 0.5rem; font-size: 0.8rem;
+                            background: rgba(255,255,255,0.85); padding: 0.1rem 0.4rem; border-radius: 4px; }
   .meta-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 0.5rem 2rem; }
   .meta-grid dt { color: var(--muted); font-size: 0.85rem; }
   .meta-grid dd { font-weight: 500; margin-bottom: 0.5rem; }
@@ -200,17 +289,48 @@ HTML_TEMPLATE = r"""<!DOCTYPE html>
 <h2>Accuracy Plots</h2>
 <div class="card">
 {% if img_hd_histogram %}
-<div class="plot-full"><img src="{{ img_hd_histogram }}" alt="HD Histogram"></div>
+<div class="plot-full"><img src="{{ img_hd_histogram }}" loading="lazy" alt="HD Histogram"></div>
 {% endif %}
 <div class="plot-grid">
-  {% if img_det_curve %}<img src="{{ img_det_curve }}" alt="DET Curve">{% endif %}
-  {% if img_roc_curve %}<img src="{{ img_roc_curve }}" alt="ROC Curve">{% endif %}
+  {% if img_det_curve %}<img src="{{ img_det_curve }}" loading="lazy" alt="DET Curve">{% endif %}
+  {% if img_roc_curve %}<img src="{{ img_roc_curve }}" loading="lazy" alt="ROC Curve">{% endif %}
 </div>
 {% if img_subject_heatmap %}
-<div class="plot-full" style="margin-top:1rem"><img src="{{ img_subject_heatmap }}" alt="Subject Accuracy Heatmap"></div>
+<div class="plot-full" style="margin-top:1rem"><img src="{{ img_subject_heatmap }}" loading="lazy" alt="Subject Accuracy Heatmap"></div>
+{% endif %}
+{% if heatmap_tiles %}
+<h3>Per-Subject FNMR (zoomable)</h3>
+<p style="color:var(--muted); font-size:0.85rem; margin-bottom:0.5rem">
+  One pixel per subject &times; device/eye group at full zoom ({{ heatmap_tiles.subjects_per_row }} subjects per row,
+  numeric subject order as in <code>subject_accuracy.csv</code>). Drag to pan, scroll to zoom, double-click to reset.
+</p>
+<div class="tile-viewer" id="tile-viewer"><canvas></canvas><span class="tile-info"></span></div>
 {% endif %}
 </div>
 
+<!-- Worst-performing subjects -->
+{% if worst_subjects %}
+<h3>Worst-Performing Subjects</h3>
+<div class="card">
+<p style="color:var(--muted); font-size:0.85rem; margin-bottom:0.5rem">
+  Top {{ worst_subjects|length }} subjects by FNMR. Full per-subject table: <code>subject_accuracy.csv</code>;
+  zoomable tiles: <code>plots/subject_heatmap_tiles.json</code>{% if heatmap_tiles %} (viewer above){% endif %}.
+</p>
+<table>
+  <tr><th>Subject</th><th>Probes</th><th>Failures</th><th>FNMR</th><th>Breakdown (device / eye: failed/total)</th></tr>
+  {% for w in worst_subjects %}
+  <tr>
+    <td><code>{{ w.subject_id }}</code></td>
+    <td class="num">{{ w.total }}</td>
+    <td class="num">{{ w.failures }}</td>
+    <td class="num">{{ fmt_rate(w.fnmr, 4) }}</td>
+    <td>{% for b in w.breakdown %}{{ b.device_id }} / {{ b.eye_side }}: {{ b.failures }}/{{ b.total }}{% if not loop.last %}; {% endif %}{% endfor %}</td>
+  </tr>
+  {% endfor %}
+</table>
+</div>
+{% endif %}
+
 <!-- Performance -->
 <h2>Performance (VNV-2)</h2>
 <div class="card">
@@ -241,18 +361,205 @@ HTML_TEMPLATE = r"""<!DOCTYPE html>
 <!-- Latency Plots -->
 <div class="card">
 <div class="plot-grid">
-  {% if img_enrollment_latency %}<img src="{{ img_enrollment_latency }}" alt="Enrollment Latency">{% endif %}
-  {% if img_verification_latency %}<img src="{{ img_verification_latency }}" alt="Verification Latency">{% endif %}
+  {% if img_enrollment_latency %}<img src="{{ img_enrollment_latency }}" loading="lazy" alt="Enrollment Latency">{% endif %}
+  {% if img_verification_latency %}<img src="{{ img_verification_latency }}" loading="lazy" alt="Verification Latency">{% endif %}
 </div>
 </div>
 
+<!-- Slowest requests -->
+{% if slowest_requests %}
+<h3>Slowest Requests</h3>
+<div class="card">
+<p style="color:var(--muted); font-size:0.85rem; margin-bottom:0.5rem">
+  Resource picture within &plusmn;1 s of each request. Snapshots are captured while the request was in flight
+  (profile.py <code>--spike-capture</code> with benchmark.py <code>--spike-threshold-ms</code>).
+</p>
+<table>
+  <tr><th>Phase</th><th>Frame</th><th>Latency (ms)</th><th>&times; median</th><th>Engine CPU %</th>
+      <th>Busiest service</th><th>Busiest thread</th><th>Snapshot</th></tr>
+  {% for r in slowest_requests %}
+  <tr>
+    <td>{{ r.phase }}</td>
+    <td><code>{{ r.frame_id }}</code></td>
+    <td class="num">{{ fmt_ms(r.latency_ms) }}</td>
+    <td class="num">{{ fmt_ms(r.x_phase_median) }}</td>
+    <td class="num">{{ fmt_ms(r.engine_cpu_peak_percent) }}</td>
+    <td>{% if r.top_service %}{{ r.top_service }} ({{ fmt_ms(r.top_service_cpu_percent, 0) }}%){% endif %}</td>
+    <td>{% if r.busiest_thread_group %}{{ r.busiest_thread_group }} ({{ fmt_ms(r.busiest_thread_cpu_percent, 0) }}%){% endif %}</td>
+    <td>{% if r.spike %}<code>{{ r.spike_snapshot }}</code><br>
+      {% if r.spike.burst_top_service %}burst: {{ r.spike.burst_top_service }} {{ fmt_ms(r.spike.burst_top_cpu_percent, 0) }}%{% endif %}
+      {% if r.spike.busiest_thread_group %}; thread {{ r.spike.busiest_thread_group }} {{ fmt_ms(r.spike.busiest_thread_cpu_percent, 0) }}%{% endif %}
+      {% if r.spike.nats_slow_consumers %}; NATS slow consumers {{ r.spike.nats_slow_consumers }}{% endif %}
+      {% if r.spike.pg_active_backends is defined %}; PG active {{ r.spike.pg_active_backends }}{% for w, n in r.spike.pg_wait_events.items() %} {{ w }}&times;{{ n }}{% endfor %}{% endif %}
+    {% endif %}</td>
+  </tr>
+  {% endfor %}
+</table>
+</div>
+{% endif %}
+
 <!-- Resource Profiling -->
-{% if img_cpu_timeline or img_memory_timeline %}
+{% if img_cpu_timeline or img_memory_timeline or resource_attribution or service_usage or thread_usage or nats_usage or postgres_usage %}
 <h2>Resource Profiling</h2>
+{% if resource_attribution %}
+<div class="card">
+<h3>Per-Request Resource Cost</h3>
+<table>
+  <tr><th>Phase</th><th>Requests</th><th>CPU ms / req</th><th>CPU ms / req P99</th>
+      <th>Throughput (req/s)</th><th>Cores busy</th><th>Req / core-second</th>
+      <th>Memory MB / req</th><th>Net in / out KiB / req</th></tr>
+  {% for phase, a in resource_attribution.items() %}
+  <tr>
+    <td>{{ phase }}</td>
+    <td class="num">{{ a.requests }}</td>
+    <td class="num">{{ fmt_ms(a.cpu_ms_per_request) }}</td>
+    <td class="num">{{ fmt_ms(a.cpu_ms_per_request_p99) }}</td>
+    <td class="num">{{ fmt_ms(a.throughput_rps, 2) }}</td>
+    <td class="num">{{ fmt_ms(a.avg_cores_busy, 2) }}</td>
+    <td class="num">{{ fmt_ms(a.requests_per_core_second, 2) }}</td>
+    <td class="num">{{ fmt_rate(a.mem_mb_per_request, 4) if a.mem_mb_per_request is defined else 'N/A' }}</td>
+    <td class="num">{{ fmt_ms((a.net_in_bytes_per_request or 0) / 1024) }} / {{ fmt_ms((a.net_out_bytes_per_request or 0) / 1024) }}</td>
+  </tr>
+  {% endfor %}
+</table>
+</div>
+{% endif %}
+{% if service_usage %}
+<div class="card">
+<h3>Stack Services</h3>
+<table>
+  <tr><th>Service</th><th>Mean CPU %</th><th>Peak CPU %</th><th>Mean memory (MB)</th><th>Peak memory (MB)</th>
+      {% for phase in service_usage.phases %}<th>{{ phase }} CPU %</th>{% endfor %}</tr>
+  {% for service, u in service_usage.services.items()|sort(attribute='1.cpu_mean_percent', reverse=True) %}
+  <tr>
+    <td>{{ service }}</td>
+    <td class="num">{{ fmt_ms(u.cpu_mean_percent) }}</td>
+    <td class="num">{{ fmt_ms(u.cpu_peak_percent) }}</td>
+    <td class="num">{{ fmt_ms(u.mem_mean_mb, 0) }}</td>
+    <td class="num">{{ fmt_ms(u.mem_peak_mb, 0) }}</td>
+    {% for phase, ph in service_usage.phases.items() %}
+    <td class="num">{% if ph.top_cpu_service == service %}<strong>{{ fmt_ms(ph.cpu_mean_percent.get(service)) }}</strong>{% else %}{{ fmt_ms(ph.cpu_mean_percent.get(service)) }}{% endif %}</td>
+    {% endfor %}
+  </tr>
+  {% endfor %}
+</table>
+{% if img_stack_cpu_timeline %}<div class="plot-full" style="margin-top:1rem"><img src="{{ img_stack_cpu_timeline }}" loading="lazy" alt="Per-Service CPU"></div>{% endif %}
+{% if img_stack_memory_timeline %}<div class="plot-full" style="margin-top:1rem"><img src="{{ img_stack_memory_timeline }}" loading="lazy" alt="Per-Service Memory"></div>{% endif %}
+</div>
+{% endif %}
+{% if nats_usage %}
+<div class="card">
+<h3>NATS Message Bus</h3>
+{% if nats_usage.slow_consumers_new %}<p><span class="badge fail">SLOW CONSUMERS</span> {{ nats_usage.slow_consumers_new }} new during the run</p>{% endif %}
+<table>
+  <tr><th>Window</th><th>Msgs in / s</th><th>Msgs out / s</th><th>Max pending (KiB)</th><th>NATS msgs / request</th></tr>
+  <tr><td>Whole run</td>
+    <td class="num">{{ fmt_ms(nats_usage.in_msgs_per_sec_mean, 0) }} (peak {{ fmt_ms(nats_usage.in_msgs_per_sec_peak, 0) }})</td>
+    <td class="num">{{ fmt_ms(nats_usage.out_msgs_per_sec_mean, 0) }} (peak {{ fmt_ms(nats_usage.out_msgs_per_sec_peak, 0) }})</td>
+    <td class="num">{{ fmt_ms(nats_usage.pending_bytes_max / 1024, 0) }}</td><td></td></tr>
+  {% for phase, ph in nats_usage.phases.items() %}
+  <tr><td>{{ phase }}</td>
+    <td class="num">{{ fmt_ms(ph.in_msgs_per_sec, 0) }}</td>
+    <td class="num">{{ fmt_ms(ph.out_msgs_per_sec, 0) }}</td>
+    <td class="num">{{ fmt_ms(ph.pending_bytes_max / 1024, 0) }}</td>
+    <td class="num">{{ fmt_ms(ph.msgs_per_request) }}</td></tr>
+  {% endfor %}
+</table>
+{% if nats_usage.connections %}
+<table style="margin-top:1rem">
+  <tr><th>Connection</th><th>Max pending (KiB)</th><th>Msgs in / s</th><th>Msgs out / s</th></tr>
+  {% for c in nats_usage.connections %}
+  <tr><td>{{ c.name or c.cid }}</td><td class="num">{{ fmt_ms(c.pending_bytes_max / 1024, 1) }}</td>
+    <td class="num">{{ fmt_ms(c.in_msgs_per_sec_mean, 0) }}</td><td class="num">{{ fmt_ms(c.out_msgs_per_sec_mean, 0) }}</td></tr>
+  {% endfor %}
+</table>
+{% endif %}
+{% if nats_usage.subjects %}
+<p style="color:var(--muted); font-size:0.85rem; margin-top:0.5rem">Subscriptions:
+  {% for subject, n in nats_usage.subjects.items() %}<code>{{ subject }}</code>&nbsp;&times;{{ n }}{% if not loop.last %}, {% endif %}{% endfor %}</p>
+{% endif %}
+{% if img_nats_timeline %}<div class="plot-full" style="margin-top:1rem"><img src="{{ img_nats_timeline }}" loading="lazy" alt="NATS Message Bus"></div>{% endif %}
+</div>
+{% endif %}
+{% if postgres_usage %}
+<div class="card">
+<h3>PostgreSQL</h3>
+{% if postgres_usage.slowing_statements %}<p><span class="badge fail">SLOWING</span> {{ postgres_usage.slowing_statements|length }} statement(s) got slower as the tables grew</p>{% endif %}
+{% if postgres_usage.checkpoints_req %}<p><span class="badge fail">CHECKPOINTS</span> {{ postgres_usage.checkpoints_req }} requested checkpoint(s): WAL exceeded max_wal_size</p>{% endif %}
+<table>
+  <tr><th>Window</th><th>DB ms / req</th><th>WAL KiB / req</th><th>Inserts / req (templates / match_log)</th>
+      <th>Waiting backends</th><th>Peak lock waits</th><th>Checkpoints</th><th>Top wait event</th></tr>
+  <tr><td>Whole run</td><td></td>
+    <td class="num">{{ fmt_ms(postgres_usage.wal_mb_per_sec_mean, 2) }} MB/s (peak {{ fmt_ms(postgres_usage.wal_mb_per_sec_peak, 2) }})</td><td></td>
+    <td class="num">{{ fmt_ms(postgres_usage.waiting_mean, 2) }}</td>
+    <td class="num">{{ postgres_usage.lock_waits_peak }}</td>
+    <td class="num">{{ postgres_usage.checkpoints_timed }} + {{ postgres_usage.checkpoints_req }} req</td>
+    <td>{% if postgres_usage.wait_events %}{{ postgres_usage.wait_events[0].wait_event_type }}:{{ postgres_usage.wait_events[0].wait_event }}{% endif %}</td></tr>
+  {% for phase, ph in postgres_usage.phases.items() %}
+  <tr><td>{{ phase }}</td>
+    <td class="num">{{ fmt_ms(ph.db_ms_per_request, 2) if ph.db_ms_per_request is defined else 'N/A' }}</td>
+    <td class="num">{{ fmt_ms(ph.wal_kb_per_request, 1) }}</td>
+    <td class="num">{{ fmt_ms(ph.inserts_per_request.get("templates"), 2) }} / {{ fmt_ms(ph.inserts_per_request.get("match_log"), 2) }}</td>
+    <td class="num">{{ fmt_ms(ph.waiting_mean, 2) }}</td>
+    <td class="num">{{ ph.lock_waits_peak }}</td>
+    <td class="num">{{ ph.checkpoints }}</td>
+    <td>{{ ph.top_wait_event or '' }}</td></tr>
+  {% endfor %}
+</table>
+{% if postgres_usage.tables %}
+<table style="margin-top:1rem">
+  <tr><th>Table</th><th>Rows</th><th>Rows added</th><th>Heap + TOAST (MB)</th><th>Indexes (MB)</th><th>Bytes / added row</th></tr>
+  {% for table, t in postgres_usage.tables.items() %}
+  <tr><td>{{ table }}</td><td class="num">{{ t.rows }}</td><td class="num">{{ t.rows_added }}</td>
+    <td class="num">{{ fmt_ms(t.mb, 1) }}</td><td class="num">{{ fmt_ms(t.index_mb, 1) }}</td>
+    <td class="num">{{ fmt_ms(t.bytes_per_row, 0) if t.bytes_per_row else 'N/A' }}</td></tr>
+  {% endfor %}
+</table>
+{% endif %}
+{% if postgres_usage.statements %}
+<table style="margin-top:1rem">
+  <tr><th>Statement</th><th>Calls</th><th>Total ms</th><th>Mean ms</th><th>First / last quarter mean ms</th><th>WAL KiB / call</th></tr>
+  {% for st in postgres_usage.statements %}
+  <tr><td>{% if st.queryid in postgres_usage.slowing_statements %}<strong>{{ st.operation }} {{ st.table }}</strong>{% else %}{{ st.operation }} {{ st.table }}{% endif %}
+      <br><code style="font-size:0.75rem">{{ st.query|truncate(120) }}</code></td>
+    <td class="num">{{ st.calls }}</td>
+    <td class="num">{{ fmt_ms(st.exec_ms, 0) }}</td>
+    <td class="num">{{ fmt_ms(st.mean_exec_ms, 3) }}</td>
+    <td class="num">{{ fmt_ms(st.first_quarter_mean_ms, 3) }} / {{ fmt_ms(st.last_quarter_mean_ms, 3) }}</td>
+    <td class="num">{{ fmt_ms(st.wal_kb_per_call, 2) }}</td></tr>
+  {% endfor %}
+</table>
+{% endif %}
+{% if img_postgres_timeline %}<div class="plot-full" style="margin-top:1rem"><img src="{{ img_postgres_timeline }}" loading="lazy" alt="PostgreSQL Load"></div>{% endif %}
+</div>
+{% endif %}
+{% if thread_usage %}
+<div class="card">
+<h3>Engine Thread Groups</h3>
+{% if thread_usage.saturated_groups %}<p><span class="badge fail">SERIAL</span> Single thread pinned near one core: {{ thread_usage.saturated_groups|join(", ") }}</p>{% endif %}
+<table>
+  <tr><th>Thread group</th><th>Threads</th><th>Mean CPU %</th><th>Peak CPU %</th><th>Busiest thread mean %</th>
+      <th>Busiest thread peak %</th><th>Run-queue delay (ms/s)</th><th>Involuntary ctx/s</th></tr>
+  {% for group, u in (thread_usage.groups.items()|sort(attribute='1.cpu_mean_percent', reverse=True))[:15] %}
+  <tr>
+    <td>{% if group in thread_usage.saturated_groups %}<strong>{{ group }}</strong>{% else %}{{ group }}{% endif %}</td>
+    <td class="num">{{ u.threads_max }}</td>
+    <td class="num">{{ fmt_ms(u.cpu_mean_percent) }}</td>
+    <td class="num">{{ fmt_ms(u.cpu_peak_percent) }}</td>
+    <td class="num">{{ fmt_ms(u.max_thread_cpu_mean_percent) }}</td>
+    <td class="num">{{ fmt_ms(u.max_thread_cpu_peak_percent) }}</td>
+    <td class="num">{{ fmt_ms(u.runqueue_delay_ms_per_sec) }}</td>
+    <td class="num">{{ fmt_ms(u.nonvoluntary_ctxsw_per_sec, 0) }}</td>
+  </tr>
+  {% endfor %}
+</table>
+{% if img_thread_cpu_timeline %}<div class="plot-full" style="margin-top:1rem"><img src="{{ img_thread_cpu_timeline }}" loading="lazy" alt="Engine CPU by Thread Group"></div>{% endif %}
+</div>
+{% endif %}
 <div class="card">
 <div class="plot-grid">
-  {% if img_cpu_timeline %}<img src="{{ img_cpu_timeline }}" alt="CPU Timeline">{% endif %}
-  {% if img_memory_timeline %}<img src="{{ img_memory_timeline }}" alt="Memory Timeline">{% endif %}
+  {% if img_cpu_timeline %}<img src="{{ img_cpu_timeline }}" loading="lazy" alt="CPU Timeline">{% endif %}
+  {% if img_memory_timeline %}<img src="{{ img_memory_timeline }}" loading="lazy" alt="Memory Timeline">{% endif %}
 </div>
 </div>
 {% endif %}
@@ -277,6 +584,44 @@ HTML_TEMPLATE = r"""<!DOCTYPE html>
 </div>
 {% endif %}
 
+<!-- Latency Distribution Comparison -->
+{% if latency_regression %}
+<h2>Latency Distribution vs Previous Run</h2>
+<div class="card">
+<table>
+  <tr><th>Phase</th><th>n (prev / cur)</th><th>P99 shift (ms)</th><th>P99 CI (ms)</th>
+      <th>KS p</th><th>Mann&ndash;Whitney p</th><th>Tail verdict</th></tr>
+  {% for phase, r in latency_regression.items() %}
+  <tr>
+    <td>{{ phase_labels.get(phase, phase) }}</td>
+    <td class="num">{{ r.n_previous }} / {{ r.n_current }}</td>
+    <td class="num">{{ '%+.1f' % r.p99_shift_ms }} ({{ '%+.1f' % r.p99_shift_pct }}%)</td>
+    <td class="num">[{{ '%+.1f' % r.p99_ci_ms[0] }}, {{ '%+.1f' % r.p99_ci_ms[1] }}]</td>
+    <td class="num">{{ '%.4f' % r.ks_p_value }}</td>
+    <td class="num">{{ '%.4f' % r.mann_whitney_p_greater }}</td>
+    <td>{% if r.tail_verdict == 'regression' %}<span class="badge fail">REGRESSION</span>
+        {% elif r.tail_verdict == 'improvement' %}<span class="badge pass">IMPROVEMENT</span>
+        {% else %}<span class="badge warn">NO CHANGE</span>{% endif %}</td>
+  </tr>
+  {% endfor %}
+</table>
+{% if img_latency_quantile_shift %}
+<div class="plot-full" style="margin-top:1rem"><img src="{{ img_latency_quantile_shift }}" loading="lazy" alt="Latency Quantile Shift"></div>
+{% endif %}
+</div>
+{% endif %}
+
+<!-- Paginated data tables (lazy mode) -->
+{% if data_tables %}
+<h2>Data Tables</h2>
+{% for table_id, title in data_tables %}
+<div class="card">
+<h3>{{ title }}</h3>
+<div class="pager" data-table="{{ table_id }}"><p style="color:var(--muted)">Loading&hellip;</p></div>
+</div>
+{% endfor %}
+{% endif %}
+
 <!-- Metadata -->
 <h2>Run Metadata</h2>
 <div class="card">
@@ -299,6 +644,103 @@ HTML_TEMPLATE = r"""<!DOCTYPE html>
 </p>
 
 </div>
+{% if heatmap_tiles %}
+<script>
+(function () {
+  const m = {{ heatmap_tiles_json }};
+  const el = document.getElementById("tile-viewer"), canvas = el.querySelector("canvas");
+  const info = el.querySelector(".tile-info"), ctx = canvas.getContext("2d");
+  const full = m.levels[m.levels.length - 1], cache = {};
+  let scale, ox, oy, drag = null;
+  // World units are full-resolution pixels (one subject x group cell).
+  function reset() {
+    scale = Math.min(canvas.width / full.width, canvas.height / full.height);
+    ox = (canvas.width - full.width * scale) / 2; oy = (canvas.height - full.height * scale) / 2;
+  }
+  function tile(z, x, y) {
+    const key = z + "/" + x + "/" + y;
+    if (!cache[key]) {
+      cache[key] = new Image();
+      cache[key].onload = draw;
+      cache[key].src = m.tiles.replace("{z}", z).replace("{x}", x).replace("{y}", y);
+    }
+    return cache[key];
+  }
+  function draw() {
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.imageSmoothingEnabled = false;
+    // coarsest level whose pixels are still at least one screen pixel wide
+    const z = Math.max(0, Math.min(m.max_zoom, Math.floor(m.max_zoom + Math.log2(scale))));
+    const level = m.levels.find(l => l.z === z), span = m.tile_size * 2 ** (m.max_zoom - z) * scale;
+    for (let x = 0; x < level.tiles_x; x++) {
+      for (let y = 0; y < level.tiles_y; y++) {
+        const sx = ox + x * span, sy = oy + y * span;
+        if (sx > canvas.width || sy > canvas.height || sx + span < 0 || sy + span < 0) continue;
+        const t = tile(z, x, y);
+        if (t.complete && t.naturalWidth) ctx.drawImage(t, sx, sy, span, span);
+      }
+    }
+  }
+  function resize() {
+    canvas.width = el.clientWidth; canvas.height = el.clientHeight; reset(); draw();
+  }
+  canvas.onmousedown = e => { drag = [e.clientX - ox, e.clientY - oy]; el.style.cursor = "grabbing"; };
+  window.addEventListener("mouseup", () => { drag = null; el.style.cursor = ""; });
+  canvas.onmousemove = e => {
+    if (drag) { ox = e.clientX - drag[0]; oy = e.clientY - drag[1]; draw(); }
+    const wx = Math.floor((e.offsetX - ox) / scale), wy = Math.floor((e.offsetY - oy) / scale);
+    const n = m.groups.length, subject = wy * m.subjects_per_row + Math.floor(wx / n);
+    const inside = wx >= 0 && wy >= 0 && wx < full.width && subject < m.n_subjects;
+    info.textContent = inside ? `subject #${subject} · ${m.groups[wx % n]}` : "";
+  };
+  canvas.onwheel = e => {
+    e.preventDefault();
+    const f = e.deltaY < 0 ? 1.25 : 0.8;
+    ox = e.offsetX - (e.offsetX - ox) * f; oy = e.offsetY - (e.offsetY - oy) * f; scale *= f; draw();
+  };
+  canvas.ondblclick = () => { reset(); draw(); };
+  window.addEventListener("resize", resize);
+  resize();
+})();
+</script>
+{% endif %}
+{% if data_script %}
+<script src="{{ data_script }}"></script>
+<script>
+(async function () {
+  if (!window.VNV_DATA_GZ) return;
+  const bytes = Uint8Array.from(atob(window.VNV_DATA_GZ), c => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+  const tables = JSON.parse(await new Response(stream).text());
+  const PAGE = 50;
+  document.querySelectorAll(".pager").forEach(el => {
+    const t = tables[el.dataset.table];
+    if (!t) { el.innerHTML = "<p>No data.</p>"; return; }
+    let page = 0, rows = t.rows;
+    el.innerHTML = '<input type="search" placeholder="Filter..." style="margin-bottom:0.5rem;padding:0.2rem">' +
+      '<table></table><p style="margin-top:0.5rem"><button data-d="-1">&larr;</button> ' +
+      '<span></span> <button data-d="1">&rarr;</button></p>';
+    const table = el.querySelector("table"), info = el.querySelector("span");
+    const esc = v => String(v).replace(/[&<>]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;"}[c]));
+    function render() {
+      const pages = Math.max(1, Math.ceil(rows.length / PAGE));
+      page = Math.min(Math.max(page, 0), pages - 1);
+      const slice = rows.slice(page * PAGE, (page + 1) * PAGE);
+      table.innerHTML = "<tr>" + t.columns.map(c => "<th>" + esc(c) + "</th>").join("") + "</tr>" +
+        slice.map(r => "<tr>" + r.map(v => "<td>" + esc(v) + "</td>").join("") + "</tr>").join("");
+      info.textContent = `page ${page + 1} / ${pages} (${rows.length} rows)`;
+    }
+    el.querySelectorAll("button").forEach(b => b.onclick = () => { page += +b.dataset.d; render(); });
+    el.querySelector("input").oninput = e => {
+      const q = e.target.value.toLowerCase();
+      rows = q ? t.rows.filter(r => r.some(v => String(v).toLowerCase().includes(q))) : t.rows;
+      page = 0; render();
+    };
+    render();
+  });
+})();
+</script>
+{% endif %}
 </body>
 </html>"""
 
@@ -311,6 +753,9 @@ def main():
     parser = argparse.ArgumentParser(description="EyeD V&V HTML Report Generator")
     parser.add_argument("--input", required=True,
                         help="Path to benchmark run directory (e.g. reports/vnv/latest)")
+    parser.add_argument("--mode", choices=["inline", "lazy"], default="inline",
+                        help="inline: self-contained single file (default, for archiving); "
+                             "lazy: external plots + paginated tables for large runs")
     args = parser.parse_args()
 
     run_dir = Path(args.input).resolve()
@@ -337,6 +782,32 @@ def main():
 
     plots_dir = run_dir / "plots"
 
+    def img(name: str) -> str:
+        path = find_plot(plots_dir, name, summary.get("plots"))
+        return img_src(path, run_dir, args.mode) if path is not None else ""
+
+    # Lazy mode: large tables go to a compressed data file, paginated client-side
+    data_script = None
+    data_tables = []
+    heatmap_tiles = None
+    data_path = run_dir / "report_data.js"
+    if args.mode == "lazy":
+        tables = {}
+        for table_id, filename, title in (
+            ("subject_accuracy", "subject_accuracy.csv", "Per-Subject Accuracy"),
+            ("request_costs", "request_costs.csv", "Per-Request Resource Cost"),
+        ):
+            table = csv_table(run_dir / filename)
+            if table is not None:
+                tables[table_id] = table
+                data_tables.append((table_id, title))
+        heatmap_tiles = tile_manifest(plots_dir, run_dir, summary.get("plots"))
+        size = write_data_script(tables, data_path)
+        data_script = data_path.name
+        print(f"Data tables written to: {data_path} ({size / 1024:.0f} KiB)")
+    elif data_path.exists():
+        data_path.unlink()
+
     # Build template context
     ctx = {
         # Metadata
@@ -370,16 +841,42 @@ def main():
 
         # Comparison
         "comparison": summary.get("comparison"),
-
-        # Plots as base64 data URIs
-        "img_hd_histogram": img_to_base64(plots_dir / "hd_histogram.png"),
-        "img_det_curve": img_to_base64(plots_dir / "det_curve.png"),
-        "img_roc_curve": img_to_base64(plots_dir / "roc_curve.png"),
-        "img_subject_heatmap": img_to_base64(plots_dir / "subject_accuracy_heatmap.png"),
-        "img_enrollment_latency": img_to_base64(plots_dir / "enrollment_latency.png"),
-        "img_verification_latency": img_to_base64(plots_dir / "verification_latency.png"),
-        "img_cpu_timeline": img_to_base64(plots_dir / "cpu_timeline.png"),
-        "img_memory_timeline": img_to_base64(plots_dir / "memory_timeline.png"),
+        "worst_subjects": summary.get("worst_subjects", []),
+        "resource_attribution": summary.get("resource_attribution"),
+        "service_usage": summary.get("service_usage"),
+        "thread_usage": summary.get("thread_usage"),
+        "nats_usage": summary.get("nats_usage"),
+        "postgres_usage": summary.get("postgres_usage"),
+        "slowest_requests": summary.get("slowest_requests", []),
+        "latency_regression": summary.get("latency_regression"),
+        "phase_labels": {
+            "enroll": "Enrollment",
+            "verify_client": "Genuine verify (client)",
+            "verify_server": "Genuine verify (server)",
+            "impostor_client": "Impostor probe (client)",
+        },
+
+        # Plots: base64 data URIs (inline) or relative paths (lazy)
+        "img_hd_histogram": img("hd_histogram"),
+        "img_det_curve": img("det_curve"),
+        "img_roc_curve": img("roc_curve"),
+        "img_subject_heatmap": img("subject_accuracy_heatmap"),
+        "img_enrollment_latency": img("enrollment_latency"),
+        "img_verification_latency": img("verification_latency"),
+        "img_cpu_timeline": img("cpu_timeline"),
+        "img_memory_timeline": img("memory_timeline"),
+        "img_latency_quantile_shift": img("latency_quantile_shift"),
+        "img_stack_cpu_timeline": img("stack_cpu_timeline"),
+        "img_stack_memory_timeline": img("stack_memory_timeline"),
+        "img_thread_cpu_timeline": img("thread_cpu_timeline"),
+        "img_nats_timeline": img("nats_timeline"),
+        "img_postgres_timeline": img("postgres_timeline"),
+
+        # Lazy mode data tables
+        "data_script": data_script,
+        "data_tables": data_tables,
+        "heatmap_tiles": heatmap_tiles,
+        "heatmap_tiles_json": json.dumps(heatmap_tiles).replace("</", "<\\/"),
 
         # Helper functions
         "fmt_rate": fmt_rate,
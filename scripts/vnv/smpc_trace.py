@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+EyeD V&V SMPC Message-Flow Tracer
+
+Subscribes to the SMPC subjects on NATS while a benchmark runs and reports
+what one request costs on the bus:
+
+- smpc.participant.<id>.{share_sync,match,batch_match}  (SMPC coordinator)
+- smpc2.party.<id>.{share_sync,match}                   (Shamir SMPC2)
+- _INBOX.> replies, matched to their request by reply subject
+
+Every message is recorded (receive time, subject, reply subject, payload
+size) to smpc_trace.jsonl. Messages are then grouped per benchmark request
+(by the start_ts/end_ts windows in the run's CSVs, or by idle gaps when no
+results are given or the benchmark overlapped requests, e.g. --engine async)
+and per protocol round (overlapping request/reply round
+trips). Outputs, in the run directory:
+
+- smpc_trace_requests.csv: per request: messages, round trips, rounds,
+  parties, fan-out, bytes out/in, round latencies
+- smpc_trace_summary.json: per-phase means/percentiles, tagged with the
+  coordinator variant, gallery size and shard count
+- plots/smpc_timeline_<coordinator>.png: swimlane timelines of the fastest,
+  median and slowest identification (one lane per subject)
+
+Timestamps are taken when the tracer receives each message, so run it on
+the same host as the stack. Compare runs across gallery sizes / shard counts
+with --compare.
+
+Usage:
+    python scripts/vnv/smpc_trace.py --nats nats://localhost:9502 --output reports/vnv/ \\
+        --coordinator pipelined --duration 120 &
+    python scripts/vnv/benchmark.py ...
+    python scripts/vnv/smpc_trace.py --replay reports/vnv/latest --coordinator pipelined
+    python scripts/vnv/smpc_trace.py --compare reports/vnv/run-a reports/vnv/run-b
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+try:
+    import nats
+except ImportError:
+    nats = None
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_PREFIXES = ["smpc", "smpc2"]
+TRACE_FILE = "smpc_trace.jsonl"
+REQUESTS_FILE = "smpc_trace_requests.csv"
+SUMMARY_FILE = "smpc_trace_summary.json"
+DEFAULT_GAP_MS = 50.0          # idle gap that separates requests without results CSVs
+RESULT_SOURCES = {"enroll": "enrollment.csv", "genuine": "genuine.csv", "impostor": "impostor.csv"}
+
+
+# ---------------------------------------------------------------------------
+# Capture
+# ---------------------------------------------------------------------------
+
+async def capture(nats_url: str, prefixes: list[str], trace_path: Path,
+                  duration: float, stop: asyncio.Event) -> int:
+    """
+    Record every message on <prefix>.> and every reply to one of them on
+    _INBOX.> until `duration` elapses (0 = until stopped). Returns the number
+    of messages written.
+    """
+    nc = await nats.connect(nats_url, name="vnv-smpc-trace")
+    pending_replies = set()
+    count = 0
+
+    with open(trace_path, "w") as out:
+        async def on_request(msg):
+            nonlocal count
+            if msg.reply:
+                pending_replies.add(msg.reply)
+            out.write(json.dumps({"t": round(time.time(), 6), "subject": msg.subject,
+                                  "reply": msg.reply or "", "bytes": len(msg.data)}) + "\n")
+            count += 1
+
+        async def on_inbox(msg):
+            nonlocal count
+            if msg.subject not in pending_replies:
+                return  # reply to something other than an SMPC request
+            pending_replies.discard(msg.subject)
+            out.write(json.dumps({"t": round(time.time(), 6), "subject": msg.subject,
+                                  "reply": "", "bytes": len(msg.data)}) + "\n")
+            count += 1
+
+        for prefix in prefixes:
+            await nc.subscribe(f"{prefix}.>", cb=on_request)
+        await nc.subscribe("_INBOX.>", cb=on_inbox)
+        print(f"Tracing {', '.join(p + '.>' for p in prefixes)} on {nats_url} -> {trace_path}")
+
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=duration or None)
+        except asyncio.TimeoutError:
+            pass
+        await nc.drain()
+    return count
+
+
+def load_trace(trace_path: Path) -> list[dict]:
+    """Messages from smpc_trace.jsonl, in receive order."""
+    messages = []
+    with open(trace_path) as f:
+        for line in f:
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                continue  # truncated last line if the tracer was killed
+    messages.sort(key=lambda m: m["t"])
+    return messages
+
+
+# ---------------------------------------------------------------------------
+# Correlation
+# ---------------------------------------------------------------------------
+
+def parse_subject(subject: str) -> tuple[str, str]:
+    """'smpc.participant.2.match' -> ('2', 'match'); unknown layouts -> ('?', subject)."""
+    parts = subject.split(".")
+    if len(parts) >= 4 and parts[1] in ("participant", "party"):
+        return parts[2], parts[3]
+    return "?", subject
+
+
+def build_round_trips(messages: list[dict]) -> pd.DataFrame:
+    """
+    One row per SMPC message: request/reply pairs joined on the reply
+    subject (latency = reply time - send time), one-way publishes
+    (share_sync) with no reply.
+    """
+    requests = {}
+    rows = []
+    for m in messages:
+        if m["subject"].startswith("_INBOX."):
+            req = requests.pop(m["subject"], None)
+            if req is not None:
+                req["t_reply"] = m["t"]
+                req["resp_bytes"] = m["bytes"]
+            continue
+        party, kind = parse_subject(m["subject"])
+        row = {"t_send": m["t"], "t_reply": np.nan, "subject": m["subject"], "party": party,
+               "kind": kind, "req_bytes": m["bytes"], "resp_bytes": 0}
+        rows.append(row)
+        if m["reply"]:
+            requests[m["reply"]] = row
+    df = pd.DataFrame(rows, columns=["t_send", "t_reply", "subject", "party", "kind",
+                                     "req_bytes", "resp_bytes"])
+    df["latency_ms"] = (df["t_reply"] - df["t_send"]) * 1000
+    return df
+
+
+def load_request_windows(run_dir: Path) -> pd.DataFrame | None:
+    """Benchmark requests (phase, frame_id, start/end epoch) from the run's CSVs."""
+    frames = []
+    for phase, name in RESULT_SOURCES.items():
+        path = run_dir / name
+        if not path.exists():
+            continue
+        df = pd.read_csv(path)
+        if "start_ts" not in df.columns:
+            return None
+        frames.append(pd.DataFrame({
+            "phase": phase,
+            "frame_id": df["frame_id"].astype(str) if "frame_id" in df.columns else df["image_file"],
+            "start_ts": pd.to_numeric(df["start_ts"], errors="coerce"),
+            "end_ts": pd.to_numeric(df["end_ts"], errors="coerce"),
+        }))
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True).dropna().sort_values("start_ts").reset_index(drop=True)
+
+
+def concurrent_client(metadata: dict, windows: pd.DataFrame) -> int:
+    """
+    Requests the benchmark had in flight at once: metadata.json's concurrency
+    for --engine async, or 2 if the CSV windows overlap anyway (0 = sequential).
+    """
+    if metadata.get("engine", "sync") != "sync" and int(metadata.get("concurrency", 1)) > 1:
+        return int(metadata["concurrency"])
+    ordered = windows.sort_values("start_ts")
+    overlaps = ordered["start_ts"].to_numpy()[1:] < ordered["end_ts"].cummax().to_numpy()[:-1]
+    return 2 if overlaps.any() else 0
+
+
+def assign_requests(trips: pd.DataFrame, windows: pd.DataFrame | None,
+                    gap_ms: float = DEFAULT_GAP_MS) -> pd.DataFrame:
+    """
+    Tag each message with the request it belongs to. With benchmark windows
+    (sequential client) a message belongs to the request in flight when it
+    was sent; otherwise requests are split at idle gaps > gap_ms with no
+    round trip outstanding.
+    """
+    trips = trips.sort_values("t_send").reset_index(drop=True)
+    if windows is not None and len(windows) > 0:
+        idx = np.searchsorted(windows["start_ts"].to_numpy(), trips["t_send"].to_numpy(), side="right") - 1
+        inside = (idx >= 0) & (trips["t_send"].to_numpy()
+                               <= windows["end_ts"].to_numpy()[np.clip(idx, 0, None)])
+        trips["request"] = np.where(inside, idx, -1)
+        trips["phase"] = np.where(inside, windows["phase"].to_numpy()[np.clip(idx, 0, None)], "")
+        trips["frame_id"] = np.where(inside, windows["frame_id"].to_numpy()[np.clip(idx, 0, None)], "")
+        return trips[trips["request"] >= 0]
+
+    request = np.zeros(len(trips), dtype=int)
+    current, busy_until = 0, np.inf
+    for i, (t, t_end) in enumerate(zip(trips["t_send"].to_numpy(),
+                                       trips["t_reply"].fillna(trips["t_send"]).to_numpy())):
+        if t - busy_until > gap_ms / 1000:
+            current += 1
+            busy_until = t_end
+        else:
+            busy_until = t_end if i == 0 else max(busy_until, t_end)
+        request[i] = current
+    trips["request"] = request
+    trips["phase"] = ""
+    trips["frame_id"] = [f"burst-{r}" for r in request]
+    return trips
+
+
+def split_rounds(trips: pd.DataFrame) -> list[tuple[float, float, int]]:
+    """
+    Protocol rounds of one request: maximal groups of overlapping round
+    trips (a coordinator fans a round out to every party, then waits).
+    Returns (start, end, round_trips) per round.
+    """
+    rt = trips.dropna(subset=["t_reply"]).sort_values("t_send")
+    rounds = []
+    for t0, t1 in zip(rt["t_send"], rt["t_reply"]):
+        if rounds and t0 <= rounds[-1][1]:
+            s, e, n = rounds[-1]
+            rounds[-1] = (s, max(e, t1), n + 1)
+        else:
+            rounds.append((t0, t1, 1))
+    return rounds
+
+
+def per_request_costs(trips: pd.DataFrame) -> pd.DataFrame:
+    """Fan-out, rounds, bytes and latencies for every traced request."""
+    rows = []
+    for request, g in trips.groupby("request", sort=True):
+        rounds = split_rounds(g)
+        round_ms = [(e - s) * 1000 for s, e, _ in rounds]
+        end = np.nanmax(np.concatenate([g["t_send"].to_numpy(), g["t_reply"].to_numpy()]))
+        rows.append({
+            "request": int(request),
+            "phase": g["phase"].iloc[0],
+            "frame_id": g["frame_id"].iloc[0],
+            "start": float(g["t_send"].min()),
+            "messages": int(len(g) + g["t_reply"].notna().sum()),
+            "round_trips": int(g["t_reply"].notna().sum()),
+            "one_way": int(g["t_reply"].isna().sum()),
+            "rounds": len(rounds),
+            "parties": int(g["party"].nunique()),
+            "fan_out": max((n for _, _, n in rounds), default=0),
+            "bytes_out": int(g["req_bytes"].sum()),
+            "bytes_in": int(g["resp_bytes"].sum()),
+            "smpc_ms": float((end - g["t_send"].min()) * 1000),
+            "round_ms_mean": float(np.mean(round_ms)) if round_ms else np.nan,
+            "round_ms_max": float(np.max(round_ms)) if round_ms else np.nan,
+            "kinds": "+".join(sorted(g["kind"].unique())),
+        })
+    return pd.DataFrame(rows)
+
+
+def summarize(costs: pd.DataFrame, trips: pd.DataFrame, meta: dict) -> dict:
+    """Per-phase (or overall) mean/percentile cost per request."""
+    summary = {**meta, "requests": int(len(costs)), "messages": int(costs["messages"].sum()) if len(costs) else 0,
+               "phases": {}}
+    groups = costs.groupby("phase") if costs["phase"].astype(bool).any() else [("all", costs)]
+    for phase, g in groups:
+        if not phase:
+            continue
+        lat = trips.loc[trips["request"].isin(g["request"]), "latency_ms"].dropna()
+        summary["phases"][phase] = {
+            "requests": int(len(g)),
+            "messages_per_request": float(g["messages"].mean()),
+            "round_trips_per_request": float(g["round_trips"].mean()),
+            "rounds_per_request": float(g["rounds"].mean()),
+            "fan_out_max": int(g["fan_out"].max()),
+            "bytes_out_per_request": float(g["bytes_out"].mean()),
+            "bytes_in_per_request": float(g["bytes_in"].mean()),
+            "smpc_ms_p50": float(g["smpc_ms"].median()),
+            "smpc_ms_p99": float(g["smpc_ms"].quantile(0.99)),
+            "round_trip_ms_p50": float(lat.median()) if len(lat) else None,
+            "round_trip_ms_p99": float(lat.quantile(0.99)) if len(lat) else None,
+        }
+    return summary
+
+
+# ---------------------------------------------------------------------------
+# Timelines
+# ---------------------------------------------------------------------------
+
+def plot_protocol_timeline(trips: pd.DataFrame, costs: pd.DataFrame, coordinator: str,
+                           out_path: Path):
+    """
+    Swimlanes for the fastest, median and slowest traced request with round
+    trips (identifications; enrollments only publish share_sync): one lane
+    per subject, a bar from send to reply for round trips and a tick for
+    one-way publishes; shaded spans are protocol rounds.
+    """
+    # Identification requests (with round trips) are the interesting ones
+    candidates = costs[costs["round_trips"] > 0] if (costs["round_trips"] > 0).any() else costs
+    if len(candidates) == 0:
+        return
+    ordered = candidates.sort_values("smpc_ms").reset_index(drop=True)
+    picks = {"fastest": ordered.iloc[0], "median": ordered.iloc[len(ordered) // 2],
+             "slowest": ordered.iloc[-1]}
+    fig, axes = plt.subplots(len(picks), 1, figsize=(12, 3 + 1.2 * len(picks) * 2), squeeze=False)
+    colors = {"match": "tab:blue", "batch_match": "tab:purple", "share_sync": "tab:green"}
+    for ax, (label, req) in zip(axes[:, 0], picks.items()):
+        g = trips[trips["request"] == req["request"]]
+        t0 = g["t_send"].min()
+        lanes = sorted(g["subject"].unique())
+        for s, e, _ in split_rounds(g):
+            ax.axvspan((s - t0) * 1000, (e - t0) * 1000, color="gray", alpha=0.12)
+        for r in g.itertuples():
+            y = lanes.index(r.subject)
+            c = colors.get(r.kind, "tab:orange")
+            if np.isnan(r.t_reply):
+                ax.plot((r.t_send - t0) * 1000, y, "|", color=c, markersize=12)
+            else:
+                ax.barh(y, (r.t_reply - r.t_send) * 1000, left=(r.t_send - t0) * 1000,
+                        height=0.6, color=c, alpha=0.8)
+        ax.set_yticks(range(len(lanes)))
+        ax.set_yticklabels(lanes, fontsize=7)
+        ax.set_title(f"{label}: {req['frame_id']} ({req['smpc_ms']:.1f} ms, {req['rounds']} rounds, "
+                     f"{req['messages']} msgs, {(req['bytes_out'] + req['bytes_in']) / 1024:.0f} KiB)",
+                     fontsize=9)
+        ax.grid(True, axis="x", alpha=0.3)
+    axes[-1, 0].set_xlabel("Time since first message (ms)")
+    fig.suptitle(f"SMPC protocol timeline — {coordinator} coordinator")
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def analyze_trace(run_dir: Path, coordinator: str, shards: int, gap_ms: float) -> dict | None:
+    """Correlate smpc_trace.jsonl in run_dir and write the CSV, summary and plot."""
+    messages = load_trace(run_dir / TRACE_FILE)
+    trips = build_round_trips(messages)
+    if len(trips) == 0:
+        print("  No SMPC messages in trace (is SMPC distributed mode enabled?)")
+        return None
+    meta_path = run_dir / "metadata.json"
+    metadata = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+    correlated_by = f"idle gaps > {gap_ms:g} ms"
+    windows = load_request_windows(run_dir)
+    if windows is not None:
+        concurrent = concurrent_client(metadata, windows)
+        if concurrent:
+            # Window correlation credits every message to the most recently
+            # started request once requests overlap
+            print(f"  WARNING: benchmark ran {concurrent} requests concurrently; "
+                  f"falling back to idle-gap correlation (overlapping requests merge into one burst)")
+            correlated_by += f" (benchmark concurrency {concurrent}: windows not attributable)"
+            windows = None
+        else:
+            correlated_by = "benchmark windows"
+    trips = assign_requests(trips, windows, gap_ms)
+    costs = per_request_costs(trips)
+    if len(costs) == 0:
+        print(f"  None of the {len(messages)} SMPC messages fall inside a benchmark request "
+              f"window (trace from other traffic, or published after the response?)")
+        return None
+
+    meta = {
+        "coordinator": coordinator,
+        "shards_per_participant": shards,
+        "gallery_size": metadata.get("gallery_size_before"),
+        "correlated_by": correlated_by,
+    }
+    summary = summarize(costs, trips, meta)
+
+    costs.to_csv(run_dir / REQUESTS_FILE, index=False, float_format="%.3f")
+    with open(run_dir / SUMMARY_FILE, "w") as f:
+        json.dump(summary, f, indent=2)
+    plots_dir = run_dir / "plots"
+    plots_dir.mkdir(exist_ok=True)
+    plot_protocol_timeline(trips, costs, coordinator, plots_dir / f"smpc_timeline_{coordinator}.png")
+
+    print(f"  {len(messages)} messages, {len(costs)} requests ({meta['correlated_by']})")
+    for phase, p in summary["phases"].items():
+        print(f"  {phase:<9} {p['messages_per_request']:6.1f} msgs/req  "
+              f"{p['rounds_per_request']:4.1f} rounds  fan-out {p['fan_out_max']:<3} "
+              f"{(p['bytes_out_per_request'] + p['bytes_in_per_request']) / 1024:8.1f} KiB/req  "
+              f"SMPC p50/p99 {p['smpc_ms_p50']:.1f}/{p['smpc_ms_p99']:.1f} ms")
+    print(f"  ✓ {REQUESTS_FILE}, {SUMMARY_FILE}, plots/smpc_timeline_{coordinator}.png")
+    return summary
+
+
+def compare_summaries(run_dirs: list[Path]):
+    """Print per-request cost across runs ordered by gallery size and shard count."""
+    rows = []
+    for run_dir in run_dirs:
+        path = run_dir / SUMMARY_FILE
+        if not path.exists():
+            print(f"  WARNING: {path} not found", file=sys.stderr)
+            continue
+        s = json.loads(path.read_text())
+        for phase, p in s["phases"].items():
+            rows.append((s.get("gallery_size") or 0, s.get("shards_per_participant") or 0,
+                         s.get("coordinator", "?"), phase, p, run_dir.name))
+    rows.sort(key=lambda r: (r[3], r[0], r[1]))
+    print(f"{'phase':<9} {'coordinator':<11} {'gallery':>8} {'shards':>6} {'msgs/req':>9} "
+          f"{'rounds':>6} {'KiB/req':>9} {'p50 ms':>8} {'p99 ms':>8}  run")
+    for gallery, shards, coordinator, phase, p, name in rows:
+        print(f"{phase:<9} {coordinator:<11} {gallery:>8} {shards:>6} {p['messages_per_request']:>9.1f} "
+              f"{p['rounds_per_request']:>6.1f} "
+              f"{(p['bytes_out_per_request'] + p['bytes_in_per_request']) / 1024:>9.1f} "
+              f"{p['smpc_ms_p50']:>8.1f} {p['smpc_ms_p99']:>8.1f}  {name}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="EyeD V&V SMPC Message-Flow Tracer")
+    parser.add_argument("--nats", default=os.environ.get("VNV_NATS_URL", "nats://localhost:9502"),
+                        help="NATS server URL (default: nats://localhost:9502)")
+    parser.add_argument("--output", default="reports/vnv/",
+                        help="Output directory root; the trace goes to its latest run (default: reports/vnv/)")
+    parser.add_argument("--prefix", action="append", default=None,
+                        help=f"Subject prefix to trace, repeatable (default: {' '.join(DEFAULT_PREFIXES)})")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="Stop after this many seconds (default: until Ctrl+C)")
+    parser.add_argument("--coordinator", choices=["plain", "pipelined", "sharded"], default="plain",
+                        help="Coordinator variant under test, used to label outputs (default: plain)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Shards per participant of the sharded coordinator (for --compare)")
+    parser.add_argument("--gap-ms", type=float, default=DEFAULT_GAP_MS,
+                        help="Idle gap separating requests when the run has no benchmark CSVs")
+    parser.add_argument("--replay", default=None,
+                        help="Re-analyze the smpc_trace.jsonl in this run directory without NATS")
+    parser.add_argument("--compare", nargs="+", default=None,
+                        help="Compare smpc_trace_summary.json across run directories")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_summaries([Path(p) for p in args.compare])
+        return
+
+    if args.replay:
+        run_dir = Path(args.replay).resolve()
+    else:
+        if nats is None:
+            print("Error: nats-py not installed. Run: pip install nats-py", file=sys.stderr)
+            sys.exit(1)
+        output_root = Path(args.output)
+        latest_link = output_root / "latest"
+        if latest_link.is_symlink() or latest_link.exists():
+            run_dir = latest_link.resolve()
+        else:
+            timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
+            run_dir = output_root / timestamp
+            run_dir.mkdir(parents=True, exist_ok=True)
+            latest_link.symlink_to(timestamp)
+
+        async def run():
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, stop.set)
+            return await capture(args.nats, args.prefix or DEFAULT_PREFIXES,
+                                 run_dir / TRACE_FILE, args.duration, stop)
+
+        count = asyncio.run(run())
+        # benchmark.py creates its run directory after the tracer starts;
+        # move the trace next to the results it belongs to.
+        final_dir = latest_link.resolve()
+        if final_dir != run_dir:
+            (run_dir / TRACE_FILE).replace(final_dir / TRACE_FILE)
+            run_dir = final_dir
+        print(f"\nTracer stopped. {count} messages written to {run_dir / TRACE_FILE}")
+
+    print(f"Analyzing {run_dir / TRACE_FILE} ...")
+    analyze_trace(run_dir, args.coordinator, args.shards, args.gap_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Engine parity check for benchmark.py: the sync and async engines must
+record the same CSV rows and summaries, including for malformed response
+bodies (which become failed rows instead of aborting the run).
+
+    python -m pytest scripts/vnv/test_benchmark.py
+"""
+
+import asyncio
+import csv
+import io
+import json
+import threading
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+import benchmark
+
+# Response body per probe image stem (genuine frame ids end in the stem)
+BODIES = {
+    "img0": {"match": {"is_match": True, "matched_identity_id": benchmark.subject_uuid(0),
+                       "hamming_distance": 0.21, "best_rotation": 2}, "latency_ms": 4.5},
+    "img1": {"latency_ms": None, "error": None, "match": {"is_match": False}},
+    "img2": ["not", "an", "object"],
+    "img3": {"match": "yes", "latency_ms": 3},
+    "img4": {"error": "segmentation failed", "latency_ms": "slow"},
+    "img5": "plain string",
+    "img6": {"error": "no iris found", "latency_ms": 1.25},
+}
+TIMING = {"client_latency_ms", "start_ts", "end_ts"}
+
+
+@pytest.fixture
+def engine_url():
+    """A stub /analyze/json on a background loop, answering from BODIES."""
+    async def analyze(request):
+        frame_id = (await request.json())["frame_id"]
+        stem = frame_id.rsplit("_", 1)[-1]
+        if stem == "img7":
+            return web.Response(text="<html>bad gateway</html>", status=502)
+        return web.Response(text=json.dumps(BODIES[stem]), content_type="application/json")
+
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.add_routes([web.post("/analyze/json", analyze)])
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{port}"
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.run_until_complete(runner.cleanup())
+    loop.close()
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    for eye in ("L", "R"):
+        eye_dir = tmp_path / "000" / eye
+        eye_dir.mkdir(parents=True)
+        # enrollment image first, then one probe per BODIES entry (+ a non-JSON reply)
+        for stem in ["enroll", *BODIES, "img7"]:
+            (eye_dir / f"{stem}.jpg").write_bytes(b"\xff\xd8fake\xff\xd9")
+    return tmp_path
+
+
+def run_engine(engine: str, dataset, api_url: str) -> tuple[list[dict], dict]:
+    phase = benchmark.genuine_phase(dataset, range(0, 1))
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=benchmark.verification_row(
+        "genuine", phase["items"][0], "", "", 0, 0).keys())
+    writer.writeheader()
+    if engine == "async":
+        stats = asyncio.run(benchmark.run_phase_async(phase, api_url, writer, progress=False,
+                                                      concurrency=4))
+    else:
+        stats = benchmark.run_phase(phase, api_url, writer, progress=False)
+    rows = [{k: v for k, v in r.items() if k not in TIMING}
+            for r in csv.DictReader(io.StringIO(out.getvalue()))]
+    return sorted(rows, key=lambda r: r["frame_id"]), stats
+
+
+def test_engines_record_malformed_bodies_identically(dataset, engine_url):
+    sync_rows, sync_stats = run_engine("sync", dataset, engine_url)
+    async_rows, async_stats = run_engine("async", dataset, engine_url)
+
+    assert sync_rows == async_rows
+    assert sync_stats == async_stats
+    assert sync_stats["total"] == 2 * (len(BODIES) + 1)
+    assert sync_stats["correct"] == 2
+    assert sync_stats["false_negative"] == 2  # img1: null latency_ms is 0, not an error
+
+    by_stem = {r["frame_id"].rsplit("_", 1)[-1]: r for r in sync_rows if r["eye_side"] == "left"}
+    assert by_stem["img1"]["server_latency_ms"] == "0.00"
+    for stem in ("img2", "img3", "img4", "img5", "img7"):
+        assert by_stem[stem]["error"], stem
+        assert by_stem[stem]["correct"] == "False"
+    assert "malformed" in by_stem["img2"]["error"]
+    assert by_stem["img6"]["error"] == "no iris found"
+    assert by_stem["img6"]["server_latency_ms"] == "1.25"